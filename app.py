@@ -1,3 +1,4 @@
+import click
 from flask import Flask, request
 from datetime import datetime
 from flask_restx import Api, Resource, fields
@@ -14,6 +15,7 @@ from blueprints.risk_classification import risk_classification_bp
 from blueprints.strategy_cards import strategy_cards_bp
 from blueprints.support_tools import support_tools_bp
 from blueprints.map_visualization import map_visualization_bp
+from services.traffic_series_store import traffic_series
 
 def create_app(config_object: type = Config) -> Flask:
     app = Flask(__name__)
@@ -743,4 +745,12 @@ def create_app(config_object: type = Config) -> Flask:
     app.register_blueprint(support_tools_bp, url_prefix="/api/v1/support-tools")
     app.register_blueprint(map_visualization_bp, url_prefix="/api/v1/map-visualization")
     
+    # 관리 명령
+    @app.cli.command("import-traffic-series")
+    @click.option("--area", "area_code", default=None, help="변환할 상권 코드 (생략 시 전체)")
+    def import_traffic_series(area_code):
+        """FootTrafficData를 유동인구 시계열 저장소로 변환"""
+        written = traffic_series.import_from_db(area_code)
+        click.echo(f"유동인구 시계열 {written}개 월 파일을 기록했습니다.")
+    
     return app
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+하버사인 거리 계산 벤치마크
+스칼라 math 구현과 numpy 벡터화 커널 비교 (1:N, N×M)
+
+실행: python benchmarks/haversine_benchmark.py [상권 수]
+"""
+import os
+import sys
+import math
+import time
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from services.geo_utils import distances_from_point, distance_matrix_km
+
+
+def scalar_haversine(lat1, lng1, lat2, lng2):
+    """기존 스칼라 구현 (MapVisualizationService._calculate_distance 이전 버전)"""
+    R = 6371
+    dlat = math.radians(lat2 - lat1)
+    dlng = math.radians(lng2 - lng1)
+    a = math.sin(dlat/2) * math.sin(dlat/2) + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlng/2) * math.sin(dlng/2)
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+    return R * c
+
+
+def timed(func, repeat=3):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    n_markets = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rng = np.random.default_rng(42)
+
+    # 대전광역시 범위 내 임의 좌표
+    lats = 36.20 + rng.random(n_markets) * 0.30
+    lngs = 127.25 + rng.random(n_markets) * 0.35
+    lat_list, lng_list = lats.tolist(), lngs.tolist()
+    center = (36.35, 127.38)
+
+    scalar_time, scalar_result = timed(lambda: [scalar_haversine(center[0], center[1], a, b) for a, b in zip(lat_list, lng_list)])
+    vector_time, vector_result = timed(lambda: distances_from_point(center[0], center[1], lats, lngs))
+    assert np.allclose(scalar_result, vector_result)
+
+    print(f"1:N 거리 ({n_markets:,}개 상권)")
+    print(f"  스칼라: {scalar_time * 1000:9.2f} ms")
+    print(f"  벡터화: {vector_time * 1000:9.2f} ms  ({scalar_time / vector_time:,.0f}배)")
+
+    # N×M 행렬은 스칼라 구현이 너무 느리므로 행 일부로 추정
+    sample_rows = 20
+    sample_time, _ = timed(lambda: [[scalar_haversine(lat_list[i], lng_list[i], a, b) for a, b in zip(lat_list, lng_list)] for i in range(sample_rows)], repeat=1)
+    scalar_matrix_estimate = sample_time / sample_rows * n_markets
+    matrix_time, _ = timed(lambda: distance_matrix_km(lats, lngs, dtype=np.float32), repeat=1)
+
+    print(f"N×N 거리 행렬 ({n_markets:,}×{n_markets:,})")
+    print(f"  스칼라(추정): {scalar_matrix_estimate:9.2f} s")
+    print(f"  벡터화:       {matrix_time:9.2f} s  ({scalar_matrix_estimate / matrix_time:,.0f}배)")
+
+
+if __name__ == "__main__":
+    main()
@@ -275,13 +275,15 @@ class ComprehensiveAnalysis(Resource):
             data = request.get_json() or {}
             industry = data.get('industry')
             
-            # 모든 지표 분석
-            foot_traffic = core_diagnosis_service.get_foot_traffic_analysis(market_code)
-            card_sales = core_diagnosis_service.get_card_sales_analysis(market_code)
-            same_industry = core_diagnosis_service.get_same_industry_analysis(market_code, industry)
-            business_rates = core_diagnosis_service.get_business_rates_analysis(market_code)
-            dwell_time = core_diagnosis_service.get_dwell_time_analysis(market_code)
-            health_score = core_diagnosis_service.calculate_health_score(market_code, industry)
+            # 모든 지표 병렬 조회 후 건강 점수에 재사용
+            fetched = core_diagnosis_service.fetch_indicators(market_code, industry)
+            indicators = fetched["indicators"]
+            foot_traffic = indicators["foot_traffic"]
+            card_sales = indicators["card_sales"]
+            same_industry = indicators["same_industry"]
+            business_rates = indicators["business_rates"]
+            dwell_time = indicators["dwell_time"]
+            health_score = core_diagnosis_service.calculate_health_score(market_code, industry, indicators)
             
             comprehensive_analysis = {
                 "market_code": market_code,
@@ -295,6 +297,7 @@ class ComprehensiveAnalysis(Resource):
                     "dwell_time": dwell_time
                 },
                 "health_score": health_score,
+                "unavailable_sources": fetched["unavailable_sources"],
                 "summary": {
                     "overall_grade": health_score.get("final_grade", "C"),
                     "health_status": health_score.get("health_status", "보통"),
@@ -1,5 +1,9 @@
-from flask import Blueprint, request, jsonify
-from services.map_visualization_service import MapVisualizationService
+from flask import Blueprint, request, jsonify, Response
+from services.map_visualization_service import MapVisualizationService, MAX_LOCATE_BATCH_POINTS
+from services.heatmap_tile_service import SUPPORTED_METRICS, MAX_ZOOM
+from services.vector_tile_service import MAX_ZOOM as MAX_VECTOR_ZOOM
+from services.geo_utils import parse_bbox, parse_point
+from services.clustering_engine import SUPPORTED_ALGORITHMS
 from datetime import datetime
 from typing import Dict, List, Any
 
@@ -7,6 +11,17 @@ map_visualization_bp = Blueprint('map_visualization', __name__, url_prefix='/api
 
 map_visualization_service = MapVisualizationService()
 
+def _parse_viewport_args():
+    """bbox, zoom 쿼리 파라미터 파싱 (형식 오류 시 ValueError)"""
+    bbox = request.args.get('bbox')
+    zoom = request.args.get('zoom')
+    if zoom is not None:
+        try:
+            zoom = int(zoom)
+        except ValueError:
+            raise ValueError("zoom은 정수여야 합니다.")
+    return (parse_bbox(bbox) if bbox else None), zoom
+
 @map_visualization_bp.route('/heatmap', methods=['GET'])
 def get_market_heatmap_data():
     """
@@ -17,6 +32,8 @@ def get_market_heatmap_data():
     ### 쿼리 파라미터
     - **region**: 지역 필터 (선택사항, 기본값: 전체)
     - **analysis_type**: 분석 유형 (기본값: health_score)
+    - **bbox**: 화면 범위 `minLng,minLat,maxLng,maxLat` (선택사항, 범위 내 상권만 반환)
+    - **zoom**: 지도 줌 레벨 (선택사항, 저배율에서는 건강 점수 상위 상권만 반환)
     
     ### 지원 분석 유형
     - **health_score**: 상권 건강 점수 (녹색=우수, 노란색=보통, 빨간색=주의)
@@ -80,7 +97,18 @@ def get_market_heatmap_data():
                 }
             }), 400
         
-        heatmap_data = map_visualization_service.get_market_heatmap_data(region, analysis_type)
+        try:
+            bbox, zoom = _parse_viewport_args()
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": str(e)
+                }
+            }), 400
+        
+        heatmap_data = map_visualization_service.get_market_heatmap_data(region, analysis_type, bbox, zoom)
         
         return jsonify({
             "success": True,
@@ -95,6 +123,135 @@ def get_market_heatmap_data():
             }
         }), 500
 
+@map_visualization_bp.route('/tiles/<int:z>/<int:x>/<int:y>', methods=['GET'])
+def get_heatmap_tile(z: int, x: int, y: int):
+    """
+    히트맵 타일 (PNG)
+    
+    상권 좌표에 지표 가중 커널 밀도를 적용한 256×256 웹 메르카토르 타일을 반환합니다.
+    타일은 데이터셋 버전별로 서버 디스크에 캐시됩니다.
+    
+    ### 쿼리 파라미터
+    - **metric**: health_score, foot_traffic, competition, growth_potential (기본값: health_score)
+    """
+    try:
+        metric = request.args.get('metric', 'health_score')
+        if metric not in SUPPORTED_METRICS:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": f"지원하지 않는 지표입니다. 지원 지표: {', '.join(SUPPORTED_METRICS)}"
+                }
+            }), 400
+        
+        if not 0 <= z <= MAX_ZOOM or not 0 <= x < (1 << z) or not 0 <= y < (1 << z):
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": f"잘못된 타일 좌표입니다. (z: 0-{MAX_ZOOM}, x/y: 0-2^z-1)"
+                }
+            }), 400
+        
+        tile = map_visualization_service.get_heatmap_tile(metric, z, x, y)
+        
+        response = Response(tile, mimetype='image/png')
+        response.headers['Cache-Control'] = 'public, max-age=3600'
+        response.headers['ETag'] = f'"{map_visualization_service.dataset_version}-{metric}-{z}-{x}-{y}"'
+        return response
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": str(e)
+            }
+        }), 500
+
+@map_visualization_bp.route('/vector-tiles/<int:z>/<int:x>/<int:y>.pbf', methods=['GET'])
+def get_vector_tile(z: int, x: int, y: int):
+    """
+    상권 폴리곤 벡터 타일 (Mapbox Vector Tile)
+    
+    타일 범위로 잘라내고 줌별로 단순화한 상권 폴리곤을 `markets` 레이어로 반환합니다.
+    속성: market_code, market_name, market_type, district_name, health_score, grade
+    """
+    try:
+        if not 0 <= z <= MAX_VECTOR_ZOOM or not 0 <= x < (1 << z) or not 0 <= y < (1 << z):
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": f"잘못된 타일 좌표입니다. (z: 0-{MAX_VECTOR_ZOOM}, x/y: 0-2^z-1)"
+                }
+            }), 400
+        
+        tile = map_visualization_service.get_vector_tile(z, x, y)
+        
+        response = Response(tile, mimetype='application/vnd.mapbox-vector-tile')
+        response.headers['Cache-Control'] = 'public, max-age=3600'
+        return response
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": str(e)
+            }
+        }), 500
+
+@map_visualization_bp.route('/points', methods=['GET'])
+def get_clustered_points():
+    """
+    줌별 상권 포인트 클러스터
+    
+    저배율에서 겹치는 상권을 격자 병합 클러스터로 묶어 반환합니다.
+    
+    ### 쿼리 파라미터
+    - **zoom**: 지도 줌 레벨 (필수, 0-20)
+    - **bbox**: 화면 범위 `minLng,minLat,maxLng,maxLat` (선택사항)
+    
+    ### 응답 항목
+    - **type=cluster**: count, mean_health_score, total_foot_traffic, expansion_zoom(클러스터가 나뉘는 줌)
+    - **type=market**: 개별 상권 정보
+    """
+    try:
+        try:
+            bbox, zoom = _parse_viewport_args()
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": str(e)
+                }
+            }), 400
+        
+        if zoom is None or not 0 <= zoom <= MAX_ZOOM:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": f"zoom(0-{MAX_ZOOM})이 필요합니다."
+                }
+            }), 400
+        
+        points = map_visualization_service.get_clustered_points(zoom, bbox)
+        
+        return jsonify({
+            "success": True,
+            "data": points
+        })
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": str(e)
+            }
+        }), 500
+
 @map_visualization_bp.route('/radius-analysis', methods=['POST'])
 def get_radius_analysis():
     """반경별 분석 결과"""
@@ -126,11 +283,22 @@ def get_radius_analysis():
                 }
             }), 400
         
+        mode = data.get('mode', 'straight')
+        if mode not in ('straight', 'walk'):
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": "지원하지 않는 거리 방식입니다. 지원 방식: straight, walk"
+                }
+            }), 400
+        
         radius_analysis = map_visualization_service.get_radius_analysis(
             data['center_lat'],
             data['center_lng'],
             data['radius_km'],
-            analysis_type
+            analysis_type,
+            mode
         )
         
         if "error" in radius_analysis:
@@ -157,10 +325,22 @@ def get_radius_analysis():
 
 @map_visualization_bp.route('/cluster-analysis', methods=['GET'])
 def get_market_cluster_analysis():
-    """상권 클러스터 분석"""
+    """
+    상권 클러스터 분석
+    
+    ### 쿼리 파라미터
+    - **region**: 지역 필터 (선택사항)
+    - **cluster_type**: performance, characteristics, growth_stage (기본값: performance)
+    - **algorithm**: kmeans, dbscan (기본값: kmeans)
+    - **k**: 클러스터 수 (kmeans, 기본값: 유형별 3~4)
+    - **seed**: 난수 시드 (kmeans, 같은 시드면 같은 결과, 기본값: 42)
+    - **eps**, **min_samples**: DBSCAN 이웃 반경(표준화 단위, 기본값: 0.8)과 핵심점 최소 이웃 수 (기본값: 3)
+    - **bbox**, **zoom**: 화면 범위 필터 (선택사항)
+    """
     try:
         region = request.args.get('region')
         cluster_type = request.args.get('cluster_type', 'performance')
+        algorithm = request.args.get('algorithm', 'kmeans')
         
         # 지원하는 클러스터 유형 검증
         supported_types = ['performance', 'characteristics', 'growth_stage']
@@ -173,7 +353,46 @@ def get_market_cluster_analysis():
                 }
             }), 400
         
-        cluster_analysis = map_visualization_service.get_market_cluster_analysis(region, cluster_type)
+        try:
+            bbox, zoom = _parse_viewport_args()
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": str(e)
+                }
+            }), 400
+        
+        if algorithm not in SUPPORTED_ALGORITHMS:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": f"지원하지 않는 알고리즘입니다. 지원 알고리즘: {', '.join(SUPPORTED_ALGORITHMS)}"
+                }
+            }), 400
+        
+        try:
+            k = int(request.args['k']) if request.args.get('k') else None
+            seed = int(request.args.get('seed', 42))
+            eps = float(request.args.get('eps', 0.8))
+            min_samples = int(request.args.get('min_samples', 3))
+            if (k is not None and not 1 <= k <= 20) or eps <= 0 or min_samples < 1:
+                raise ValueError
+        except ValueError:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": "k는 1-20 사이 정수, seed는 정수, eps는 양수, min_samples는 1 이상 정수여야 합니다."
+                }
+            }), 400
+        
+        cluster_analysis = map_visualization_service.get_market_cluster_analysis(
+            region, cluster_type, bbox, zoom, k=k, algorithm=algorithm, seed=seed,
+            eps=eps, min_samples=min_samples
+        )
         
         if "error" in cluster_analysis:
             return jsonify({
@@ -257,6 +476,139 @@ def get_accessibility_analysis(market_code: str):
             }
         }), 500
 
+@map_visualization_bp.route('/catchment/<string:market_code>', methods=['GET'])
+def get_walking_catchment(market_code: str):
+    """상권 도보 도달 범위 (5/10/15분)"""
+    try:
+        catchment = map_visualization_service.get_walking_catchment(market_code)
+        
+        if "error" in catchment:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "DATA_NOT_FOUND",
+                    "message": catchment["error"]
+                }
+            }), 404
+        
+        return jsonify({
+            "success": True,
+            "data": catchment
+        })
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": str(e)
+            }
+        }), 500
+
+@map_visualization_bp.route('/locate', methods=['GET'])
+def locate_market():
+    """좌표가 속한 상권 조회"""
+    try:
+        if 'lat' not in request.args or 'lng' not in request.args:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": "lat, lng 숫자 파라미터가 필요합니다."
+                }
+            }), 400
+        
+        try:
+            lat, lng = parse_point(request.args['lat'], request.args['lng'])
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": str(e)
+                }
+            }), 400
+        
+        location = map_visualization_service.locate_market(lat, lng)
+        
+        if "error" in location:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "DATA_NOT_FOUND",
+                    "message": location["error"]
+                }
+            }), 404
+        
+        return jsonify({
+            "success": True,
+            "data": location
+        })
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": str(e)
+            }
+        }), 500
+
+@map_visualization_bp.route('/locate/batch', methods=['POST'])
+def locate_markets_batch():
+    """좌표 목록 일괄 상권 조회"""
+    try:
+        data = request.get_json() or {}
+        points = data.get('points')
+        
+        if not isinstance(points, list) or not points:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": "points 목록이 필요합니다."
+                }
+            }), 400
+        
+        if len(points) > MAX_LOCATE_BATCH_POINTS:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": f"한 번에 최대 {MAX_LOCATE_BATCH_POINTS}개 좌표까지 조회할 수 있습니다."
+                }
+            }), 400
+        
+        parsed = []
+        for i, point in enumerate(points):
+            try:
+                if not isinstance(point, dict) or 'lat' not in point or 'lng' not in point:
+                    raise ValueError("lat, lng가 필요합니다.")
+                lat, lng = parse_point(point['lat'], point['lng'])
+            except ValueError as e:
+                return jsonify({
+                    "success": False,
+                    "error": {
+                        "code": "VALIDATION_ERROR",
+                        "message": f"points[{i}]: {e}"
+                    }
+                }), 400
+            parsed.append({"lat": lat, "lng": lng})
+        points = parsed
+        
+        locations = map_visualization_service.locate_markets(points)
+        
+        return jsonify({
+            "success": True,
+            "data": locations
+        })
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": str(e)
+            }
+        }), 500
+
 @map_visualization_bp.route('/analysis-types', methods=['GET'])
 def get_analysis_types():
     """지원하는 분석 유형 목록"""
@@ -4,6 +4,8 @@
 """
 from flask import Blueprint, request, jsonify
 from services.data_loader import DataLoader
+from services.geo_utils import parse_bbox
+from services.map_visualization_service import market_cap_for_zoom
 from datetime import datetime
 
 market_diagnosis_bp = Blueprint('market_diagnosis', __name__, url_prefix='/api/v1/market-diagnosis')
@@ -40,6 +42,8 @@ def get_markets():
     - **market_type**: 상권 유형 필터 (상업지구, 주거지구, 혼합지구)
     - **limit**: 페이지당 결과 수 (기본값: 50, 최대: 100)
     - **offset**: 페이지 오프셋 (기본값: 0)
+    - **bbox**: 화면 범위 `minLng,minLat,maxLng,maxLat` (선택사항, 상권 경계가 겹치는 상권만)
+    - **zoom**: 지도 줌 레벨 (선택사항, 저배율에서는 페이지 크기 상한 적용)
     
     ### 응답 예시
     ```json
@@ -79,6 +83,22 @@ def get_markets():
         limit = int(request.args.get('limit', 50))
         offset = int(request.args.get('offset', 0))
         
+        try:
+            bbox = parse_bbox(request.args['bbox']) if request.args.get('bbox') else None
+            zoom = int(request.args['zoom']) if request.args.get('zoom') else None
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": str(e)
+                }
+            }), 400
+        
+        cap = market_cap_for_zoom(zoom)
+        if cap is not None:
+            limit = min(limit, cap)
+        
         # 상권 데이터 로드
         df = data_loader.load_market_data()
         if df.empty:
@@ -90,8 +110,11 @@ def get_markets():
                 }
             }), 404
         
-        # 필터링
-        filtered_df = df.copy()
+        # 필터링 (bbox는 폴리곤 인덱스로 조회)
+        if bbox:
+            filtered_df = df.iloc[data_loader.get_polygon_index().query_bbox(*bbox)]
+        else:
+            filtered_df = df
         
         if district:
             filtered_df = filtered_df[filtered_df['district_name'] == district]
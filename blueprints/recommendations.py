@@ -5,8 +5,9 @@
 """
 from flask import Blueprint, request, jsonify
 from services.recommendation_service import RecommendationService
+from services.user_similarity_service import user_similarity, DEFAULT_SIMILAR_USERS
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
 recommendations_bp = Blueprint('recommendations', __name__, url_prefix='/api/v1/recommendations')
 
@@ -243,8 +244,28 @@ def get_similar_users_recommendations():
                 }
             }), 400
         
-        # 유사 사용자 시뮬레이션 (실제로는 데이터베이스에서 유사 사용자 찾기)
-        similar_users = _find_similar_users(user_profile)
+        profile_error = _validate_similarity_profile(user_profile)
+        if profile_error:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "INVALID_PARAMETERS",
+                    "message": profile_error
+                }
+            }), 400
+        
+        limit = data.get('limit', DEFAULT_SIMILAR_USERS)
+        if not isinstance(limit, int) or isinstance(limit, bool) or not 1 <= limit <= 10:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "INVALID_PARAMETERS",
+                    "message": "limit는 1 이상 10 이하의 정수여야 합니다."
+                }
+            }), 400
+        
+        # 전체 사용자 색인에서 프로필 코사인 유사도 상위 사용자 검색
+        similar_users = _find_similar_users(user_profile, limit)
         
         # 유사 사용자들의 성공 사례 기반 추천
         similar_recommendations = []
@@ -256,7 +277,7 @@ def get_similar_users_recommendations():
                     "similarity_score": similar_user["similarity_score"],
                     "user_type": similar_user["profile"]["userType"],
                     "business_stage": similar_user["profile"]["businessStage"],
-                    "success_story": similar_user["success_story"],
+                    "shared_interests": similar_user["shared_interests"],
                     "recommendations": user_result["comprehensive_recommendations"][:2]  # 상위 2개만
                 })
         
@@ -279,67 +300,36 @@ def get_similar_users_recommendations():
             }
         }), 500
 
-def _find_similar_users(user_profile: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """유사 사용자 찾기 (시뮬레이션)"""
-    # 실제로는 데이터베이스에서 유사한 프로필의 사용자들을 찾아야 함
-    similar_users = [
-        {
-            "similarity_score": 0.85,
-            "profile": {
-                "userType": user_profile.get("userType", "ENTREPRENEUR"),
-                "businessStage": user_profile.get("businessStage", "PLANNING"),
-                "preferences": {
-                    "interestedBusinessTypes": ["식음료업", "쇼핑업"],
-                    "preferredAreas": ["유성구", "서구"]
-                }
-            },
-            "success_story": {
-                "industry": "식음료업",
-                "region": "유성구",
-                "business_name": "카페 드림",
-                "success_factors": ["차별화된 메뉴", "고객 서비스", "위치 선정"],
-                "revenue": "월 500만원",
-                "period": "6개월"
-            }
-        },
-        {
-            "similarity_score": 0.78,
-            "profile": {
-                "userType": user_profile.get("userType", "ENTREPRENEUR"),
-                "businessStage": "STARTUP",
-                "preferences": {
-                    "interestedBusinessTypes": ["여가서비스업"],
-                    "preferredAreas": ["서구"]
-                }
-            },
-            "success_story": {
-                "industry": "여가서비스업",
-                "region": "서구",
-                "business_name": "헬스클럽 피트니스",
-                "success_factors": ["전문성", "고객 관리", "마케팅"],
-                "revenue": "월 800만원",
-                "period": "1년"
-            }
-        },
-        {
-            "similarity_score": 0.72,
-            "profile": {
-                "userType": "BUSINESS_OWNER",
-                "businessStage": "OPERATING",
-                "preferences": {
-                    "interestedBusinessTypes": ["운송업"],
-                    "preferredAreas": ["대덕구"]
-                }
-            },
-            "success_story": {
-                "industry": "운송업",
-                "region": "대덕구",
-                "business_name": "대덕택시",
-                "success_factors": ["서비스 품질", "고객 만족도", "운영 효율성"],
-                "revenue": "월 1200만원",
-                "period": "2년"
-            }
+def _validate_similarity_profile(user_profile: Any) -> Optional[str]:
+    """유사 사용자 검색용 프로필 형식 검사 - 오류 메시지 반환 (정상이면 None)"""
+    if not isinstance(user_profile, dict):
+        return "user_profile은 객체여야 합니다."
+    
+    preferences = user_profile.get("preferences")
+    if preferences is None:
+        return None
+    if not isinstance(preferences, dict):
+        return "preferences는 객체여야 합니다."
+    
+    for field in ("interestedBusinessTypes", "preferredAreas"):
+        values = preferences.get(field)
+        if values is None:
+            continue
+        if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+            return f"preferences.{field}는 문자열 목록이어야 합니다."
+    return None
+
+def _find_similar_users(user_profile: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    """유사 사용자 찾기 (요청 프로필에 id가 있으면 본인 제외)"""
+    similar_users = user_similarity.find_similar(user_profile, limit, exclude_user_id=user_profile.get("id"))
+    
+    # 요청 프로필과 공통된 관심 업종/선호 지역
+    preferences = user_profile.get("preferences") or {}
+    for similar_user in similar_users:
+        other = similar_user["profile"]["preferences"]
+        similar_user["shared_interests"] = {
+            "industries": [i for i in other["interestedBusinessTypes"] if i in (preferences.get("interestedBusinessTypes") or [])],
+            "areas": [a for a in other["preferredAreas"] if a in (preferences.get("preferredAreas") or [])]
         }
-    ]
     
     return similar_users
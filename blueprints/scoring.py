@@ -4,7 +4,8 @@
 상권, 업종, 지역 데이터를 종합하여 점수 계산
 """
 from flask import Blueprint, request, jsonify
-from services.scoring_service import ScoringService
+from services.scoring_service import ScoringService, MAX_TOP_MARKETS
+from services.score_distribution import DEFAULT_HISTOGRAM_BINS
 from datetime import datetime
 
 scoring_bp = Blueprint('scoring', __name__, url_prefix='/api/v1/scoring')
@@ -21,6 +22,12 @@ def scoring():
         "endpoints": {
             "calculate_score": "/api/v1/scoring/calculate",
             "compare_locations": "/api/v1/scoring/compare",
+            "score_matrix": "/api/v1/scoring/matrix",
+            "cache_stats": "/api/v1/scoring/cache/stats",
+            "what_if": "/api/v1/scoring/what-if",
+            "top_markets": "/api/v1/scoring/top-markets",
+            "score_distribution": "/api/v1/scoring/distribution",
+            "change_log": "/api/v1/scoring/changes",
             "get_recommendations": "/api/v1/scoring/recommendations"
         },
         "timestamp": datetime.utcnow().isoformat()
@@ -79,6 +86,273 @@ def calculate_score():
             }
         }), 500
 
+@scoring_bp.route('/matrix', methods=['POST'])
+def calculate_score_matrix():
+    """상권 × 업종 × 지역 점수 행렬"""
+    try:
+        data = request.get_json() or {}
+        
+        # 축 파라미터 검증 (생략하면 전체 목록)
+        axes = {}
+        for field in ('market_codes', 'industries', 'regions'):
+            values = data.get(field)
+            if values is None:
+                axes[field] = None
+                continue
+            if not isinstance(values, list) or not values or not all(isinstance(v, (str, int)) for v in values):
+                return jsonify({
+                    "success": False,
+                    "error": {
+                        "code": "INVALID_PARAMETERS",
+                        "message": f"{field}는 비어 있지 않은 문자열 목록이어야 합니다."
+                    }
+                }), 400
+            # 중복 제거 (요청 순서 유지)
+            axes[field] = list(dict.fromkeys(str(v) for v in values))
+        
+        result = scoring_service.calculate_score_matrix(
+            axes['market_codes'], axes['industries'], axes['regions']
+        )
+        
+        if "error" in result:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "INVALID_PARAMETERS",
+                    "message": result["error"]
+                }
+            }), 400
+        
+        return jsonify({
+            "success": True,
+            "data": result,
+            "message": "점수 행렬을 성공적으로 계산했습니다.",
+            "timestamp": datetime.utcnow().isoformat()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": f"점수 행렬 계산 중 오류가 발생했습니다: {str(e)}"
+            }
+        }), 500
+
+@scoring_bp.route('/what-if', methods=['POST'])
+def what_if():
+    """가중치 what-if 분석"""
+    try:
+        data = request.get_json() or {}
+        
+        # 필수 파라미터 검증
+        market_code = data.get('market_code')
+        industry = data.get('industry')
+        region = data.get('region')
+        weight_sets = data.get('weight_sets')
+        
+        if not all([market_code, industry, region]) or not isinstance(weight_sets, list) or not weight_sets:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "MISSING_PARAMETERS",
+                    "message": "market_code, industry, region, weight_sets 파라미터가 필요합니다."
+                }
+            }), 400
+        
+        result = scoring_service.what_if(market_code, industry, region, weight_sets)
+        
+        if "error" in result:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "INVALID_PARAMETERS",
+                    "message": result["error"]
+                }
+            }), 400
+        
+        return jsonify({
+            "success": True,
+            "data": result,
+            "message": "가중치 what-if 분석을 성공적으로 완료했습니다.",
+            "timestamp": datetime.utcnow().isoformat()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": f"what-if 분석 중 오류가 발생했습니다: {str(e)}"
+            }
+        }), 500
+
+@scoring_bp.route('/top-markets', methods=['POST'])
+def search_top_markets():
+    """업종별 상위 상권 검색"""
+    try:
+        data = request.get_json() or {}
+        
+        # 필수 파라미터 검증
+        industry = data.get('industry')
+        if not industry:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "MISSING_PARAMETERS",
+                    "message": "industry 파라미터가 필요합니다."
+                }
+            }), 400
+        
+        k = data.get('k', 20)
+        min_score = data.get('min_score')
+        weights = data.get('weights')
+        error = None
+        if not isinstance(k, int) or isinstance(k, bool) or not 1 <= k <= MAX_TOP_MARKETS:
+            error = f"k는 1 이상 {MAX_TOP_MARKETS} 이하의 정수여야 합니다."
+        elif min_score is not None and (isinstance(min_score, bool) or not isinstance(min_score, (int, float))):
+            error = "min_score는 숫자여야 합니다."
+        elif weights is not None and not isinstance(weights, dict):
+            error = "weights는 객체여야 합니다."
+        if error:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "INVALID_PARAMETERS",
+                    "message": error
+                }
+            }), 400
+        
+        result = scoring_service.search_top_markets(
+            industry, k, data.get('district'), data.get('market_type'), min_score, weights
+        )
+        
+        if "error" in result:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "INVALID_PARAMETERS",
+                    "message": result["error"]
+                }
+            }), 400
+        
+        return jsonify({
+            "success": True,
+            "data": result,
+            "message": "상위 상권 검색을 성공적으로 완료했습니다.",
+            "timestamp": datetime.utcnow().isoformat()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": f"상위 상권 검색 중 오류가 발생했습니다: {str(e)}"
+            }
+        }), 500
+
+@scoring_bp.route('/distribution', methods=['GET'])
+def get_score_distribution():
+    """업종 × 지역 점수 분포 히스토그램"""
+    try:
+        industry = request.args.get('industry')
+        region = request.args.get('region')
+        market_code = request.args.get('market_code')
+        
+        if not industry or not region:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "MISSING_PARAMETERS",
+                    "message": "industry, region 파라미터가 필요합니다."
+                }
+            }), 400
+        
+        bins = request.args.get('bins', DEFAULT_HISTOGRAM_BINS, type=int)
+        if not 1 <= bins <= 100:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "INVALID_PARAMETERS",
+                    "message": "bins는 1 이상 100 이하의 정수여야 합니다."
+                }
+            }), 400
+        
+        result = scoring_service.get_distribution_summary(industry, region, bins, market_code)
+        
+        if "error" in result:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "DATA_NOT_FOUND",
+                    "message": result["error"]
+                }
+            }), 404
+        
+        return jsonify({
+            "success": True,
+            "data": result,
+            "message": "점수 분포를 성공적으로 조회했습니다.",
+            "timestamp": datetime.utcnow().isoformat()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": f"점수 분포 조회 중 오류가 발생했습니다: {str(e)}"
+            }
+        }), 500
+
+@scoring_bp.route('/changes', methods=['GET'])
+def get_change_log():
+    """원천 데이터 변경 및 캐시 무효화 이력"""
+    try:
+        limit = request.args.get('limit', 50, type=int)
+        if not 1 <= limit <= 500:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "INVALID_PARAMETERS",
+                    "message": "limit는 1 이상 500 이하의 정수여야 합니다."
+                }
+            }), 400
+        
+        return jsonify({
+            "success": True,
+            "data": scoring_service.get_change_log(limit),
+            "timestamp": datetime.utcnow().isoformat()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": f"변경 이력 조회 중 오류가 발생했습니다: {str(e)}"
+            }
+        }), 500
+
+@scoring_bp.route('/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """점수 캐시 통계"""
+    try:
+        return jsonify({
+            "success": True,
+            "data": scoring_service.get_cache_stats(),
+            "timestamp": datetime.utcnow().isoformat()
+        })
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": f"캐시 통계 조회 중 오류가 발생했습니다: {str(e)}"
+            }
+        }), 500
+
 @scoring_bp.route('/compare', methods=['POST'])
 def compare_locations():
     """여러 지역 비교 분석"""
@@ -89,7 +363,7 @@ def compare_locations():
         industry = data.get('industry')
         regions = data.get('regions', [])
         
-        if not industry or not regions:
+        if not industry or not regions or not isinstance(regions, list):
             return jsonify({
                 "success": False,
                 "error": {
@@ -107,27 +381,46 @@ def compare_locations():
                 }
             }), 400
         
-        # 각 지역별 점수 계산
-        comparison_results = []
-        for region in regions:
-            # 각 지역의 대표 상권 코드 사용 (실제로는 더 정교한 로직 필요)
-            market_code = f"1000{len(comparison_results)}"  # 임시 상권 코드
-            
-            result = scoring_service.calculate_market_score(market_code, industry, region)
-            
-            if "error" not in result:
-                comparison_results.append({
-                    "region": region,
-                    "market_code": market_code,
-                    "score_analysis": result
-                })
-        
-        # 점수 순으로 정렬
-        comparison_results.sort(key=lambda x: x["score_analysis"]["total_score"], reverse=True)
-        
-        # 순위 추가
-        for i, result in enumerate(comparison_results):
-            result["rank"] = i + 1
+        top_k = data.get('top_k')
+        if top_k is not None and (not isinstance(top_k, int) or isinstance(top_k, bool) or top_k < 1):
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "INVALID_PARAMETERS",
+                    "message": "top_k는 1 이상의 정수여야 합니다."
+                }
+            }), 400
+        
+        # 후보 구성: 문자열은 지역명(중복 제거 후 순서대로 임시 상권 코드), 객체는 지역/상권 지정
+        locations = []
+        region_names = list(dict.fromkeys(r for r in regions if isinstance(r, str)))
+        placeholder_codes = {region: f"1000{i}" for i, region in enumerate(region_names)}  # 임시 상권 코드
+        for entry in regions:
+            if isinstance(entry, str):
+                locations.append((entry, placeholder_codes[entry]))
+            elif isinstance(entry, dict) and entry.get('region') and entry.get('market_code'):
+                locations.append((str(entry['region']), str(entry['market_code'])))
+            else:
+                return jsonify({
+                    "success": False,
+                    "error": {
+                        "code": "INVALID_PARAMETERS",
+                        "message": "regions 항목은 지역명 또는 {region, market_code} 객체여야 합니다."
+                    }
+                }), 400
+        
+        comparison = scoring_service.compare_locations(industry, locations, top_k)
+        
+        if "error" in comparison:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "INVALID_PARAMETERS",
+                    "message": comparison["error"]
+                }
+            }), 400
+        
+        comparison_results = comparison["comparison_results"]
         
         return jsonify({
             "success": True,
@@ -136,11 +429,12 @@ def compare_locations():
                 "comparison_results": comparison_results,
                 "best_location": comparison_results[0] if comparison_results else None,
                 "summary": {
-                    "total_regions": len(comparison_results),
-                    "average_score": round(sum(r["score_analysis"]["total_score"] for r in comparison_results) / len(comparison_results), 1) if comparison_results else 0,
+                    "total_regions": comparison["total_candidates"],
+                    "duplicates_removed": len(regions) - comparison["total_candidates"],
+                    "average_score": comparison["average_score"],
                     "score_range": {
-                        "highest": comparison_results[0]["score_analysis"]["total_score"] if comparison_results else 0,
-                        "lowest": comparison_results[-1]["score_analysis"]["total_score"] if comparison_results else 0
+                        "highest": comparison["highest_score"],
+                        "lowest": comparison["lowest_score"]
                     }
                 }
             },
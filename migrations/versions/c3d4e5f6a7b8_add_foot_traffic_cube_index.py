@@ -0,0 +1,50 @@
+"""Add foot traffic cube covering index
+
+Revision ID: c3d4e5f6a7b8
+Revises: b2c3d4e5f6a7
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d4e5f6a7b8'
+down_revision = 'b2c3d4e5f6a7'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'ix_foot_traffic_cube'
+TABLE_NAME = 'foot_traffic_data'
+
+
+def _existing_indexes():
+    """foot_traffic_data 테이블의 인덱스 이름 (테이블이 없으면 None)
+
+    상권 진단 테이블은 이전 리비전에서 생성되지 않으므로 테이블이 있는 DB에만 적용
+    """
+    inspector = sa.inspect(op.get_bind())
+    if TABLE_NAME not in inspector.get_table_names():
+        return None
+    return {index['name'] for index in inspector.get_indexes(TABLE_NAME)}
+
+
+def upgrade():
+    indexes = _existing_indexes()
+    if indexes is None or INDEX_NAME in indexes:
+        return
+    with op.batch_alter_table(TABLE_NAME, schema=None) as batch_op:
+        batch_op.create_index(INDEX_NAME, [
+            'area_id', 'day_of_week', 'hour',
+            'foot_traffic_count', 'age_20s', 'age_30s', 'age_40s', 'age_50s', 'age_60s',
+            'male_count', 'female_count', 'dwell_time_avg'
+        ], unique=False)
+
+
+def downgrade():
+    indexes = _existing_indexes()
+    if not indexes or INDEX_NAME not in indexes:
+        return
+    with op.batch_alter_table(TABLE_NAME, schema=None) as batch_op:
+        batch_op.drop_index(INDEX_NAME)
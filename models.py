@@ -72,6 +72,16 @@ class CommercialArea(db.Model):
 
 class FootTrafficData(db.Model):
     """유동인구 데이터"""
+    __table_args__ = (
+        # 요일×시간 큐브 집계용 커버링 인덱스 (GROUP BY 컬럼 + 집계 대상 컬럼)
+        db.Index(
+            'ix_foot_traffic_cube',
+            'area_id', 'day_of_week', 'hour',
+            'foot_traffic_count', 'age_20s', 'age_30s', 'age_40s', 'age_50s', 'age_60s',
+            'male_count', 'female_count', 'dwell_time_avg'
+        ),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     area_id = db.Column(db.Integer, db.ForeignKey('commercial_area.id'), nullable=False)
     date = db.Column(db.Date, nullable=False)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+접근성 엔진
+csv/transit_stops.csv의 지하철역/버스정류장/주차장을 유형별 공간 인덱스로 적재하고
+상권별 최근접 시설, 반경 내 시설 수, 거리 가중 점수를 데이터셋 버전마다 일괄 사전 계산
+(동봉 데이터는 대전 1호선 역(근사 좌표)뿐이며, 버스/주차장 행이 없는 유형은 결과에서 빠지고
+지도 서비스 응답에서 샘플 값으로 표시됨)
+"""
+import os
+import threading
+from typing import Dict, List, Any, Optional
+import numpy as np
+import pandas as pd
+from services.spatial_index import GridSpatialIndex
+
+FACILITY_TYPES = ["subway", "bus", "parking"]
+
+# 유형별 반경 내 시설 수 집계 기준 (km)
+COUNT_RADII_KM = [0.5, 1.0]
+
+# 유형별 거리 감쇠 (km) 및 점수 계산 최대 탐색 반경
+DISTANCE_DECAY_KM = {"subway": 0.5, "bus": 0.25, "parking": 0.3}
+SEARCH_RADIUS_KM = {"subway": 2.0, "bus": 1.0, "parking": 1.0}
+
+# 해당 거리 이내에 시설이 있어야 이용 가능으로 판단 (km)
+AVAILABLE_WITHIN_KM = {"subway": 1.0, "bus": 0.5, "parking": 0.5}
+
+WALKING_SPEED_M_PER_MIN = 80
+
+
+class AccessibilityService:
+    """교통/주차 시설 기반 상권 접근성 사전 계산"""
+
+    def __init__(self, data_dir: str = None):
+        self.data_dir = data_dir or os.path.join(os.path.dirname(__file__), '..', 'csv')
+        self._facilities: Optional[Dict[str, pd.DataFrame]] = None
+        self._indexes: Dict[str, GridSpatialIndex] = {}
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    def load_facilities(self) -> Dict[str, pd.DataFrame]:
+        """시설 데이터 로드 (유형별 DataFrame, 파일이 없으면 빈 dict)"""
+        if self._facilities is not None:
+            return self._facilities
+
+        file_path = os.path.join(self.data_dir, 'transit_stops.csv')
+        facilities = {}
+        try:
+            df = pd.read_csv(file_path, encoding='utf-8-sig', dtype={'facility_id': str, 'routes': str})
+            df['lat'] = pd.to_numeric(df['lat'], errors='coerce')
+            df['lng'] = pd.to_numeric(df['lng'], errors='coerce')
+            df = df.dropna(subset=['lat', 'lng'])
+            for facility_type in FACILITY_TYPES:
+                subset = df[df['facility_type'] == facility_type].reset_index(drop=True)
+                if not subset.empty:
+                    facilities[facility_type] = subset
+                    self._indexes[facility_type] = GridSpatialIndex(subset['lat'].values, subset['lng'].values)
+        except Exception as e:
+            print(f"교통 시설 데이터 로드 실패: {e}")
+
+        self._facilities = facilities
+        return facilities
+
+    def get_market_accessibility(self, market_code: str) -> Optional[Dict[str, Any]]:
+        """사전 계산된 상권 접근성 (시설 유형별, 데이터 없는 유형은 제외)"""
+        return self._results.get(str(market_code))
+
+    def precompute(self, markets: List[Dict[str, Any]], version: str) -> int:
+        """데이터셋 버전이 바뀌었으면 전체 상권 재계산 - 계산된 상권 수 반환"""
+        with self._lock:
+            if self._version == version:
+                return len(self._results)
+
+            facilities = self.load_facilities()
+            results = {}
+            for market in markets:
+                results[str(market["market_code"])] = {
+                    facility_type: self._analyze_facility_type(facility_type, market["lat"], market["lng"])
+                    for facility_type in facilities
+                }
+
+            self._results = results
+            self._version = version
+            return len(results)
+
+    def _analyze_facility_type(self, facility_type: str, lat: float, lng: float) -> Dict[str, Any]:
+        """한 상권의 유형별 최근접 시설, 반경 내 시설 수, 거리 가중 점수"""
+        facilities = self._facilities[facility_type]
+        index = self._indexes[facility_type]
+
+        nearest_idx, nearest_dist = index.query_nearest(lat, lng, 1)
+        nearby_idx, nearby_dist = index.query_radius(lat, lng, SEARCH_RADIUS_KM[facility_type])
+
+        # 거리 지수 감쇠 가중합을 0~100 점수로 변환 (가까운 시설이 많을수록 100에 수렴)
+        weight = float(np.exp(-nearby_dist / DISTANCE_DECAY_KM[facility_type]).sum())
+        score = round(100 * (1 - np.exp(-weight)), 1)
+
+        nearest = facilities.iloc[int(nearest_idx[0])]
+        distance_m = int(round(float(nearest_dist[0]) * 1000))
+        within = nearby_idx[nearby_dist <= AVAILABLE_WITHIN_KM[facility_type]]
+
+        result = {
+            "available": bool(len(within)),
+            "nearest": {
+                "name": nearest['name'],
+                "distance_m": distance_m,
+                "walking_minutes": max(1, int(round(distance_m / WALKING_SPEED_M_PER_MIN)))
+            },
+            "counts_within": {
+                f"{int(radius * 1000)}m": int(np.count_nonzero(nearby_dist <= radius))
+                for radius in COUNT_RADII_KM
+            },
+            "facilities": [facilities.iloc[int(i)]['name'] for i in within],
+            "score": score
+        }
+        if facility_type == "parking" and 'capacity' in facilities:
+            capacities = pd.to_numeric(facilities['capacity'].iloc[within], errors='coerce').fillna(0)
+            result["total_capacity"] = int(capacities.sum())
+        return result
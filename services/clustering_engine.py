@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+클러스터링 엔진
+표준화된 상권 특성 행렬에 대한 numpy 기반 k-means(k-means++ 초기화)와 DBSCAN
+"""
+import threading
+from typing import Dict, List, Any, Tuple
+import numpy as np
+
+COMPETITION_LEVEL_VALUES = {"low": 0.0, "medium": 1.0, "high": 2.0}
+
+# 특성 행렬 컬럼 (데이터셋 버전당 1회 생성)
+FEATURE_COLUMNS = ["health_score", "log_foot_traffic", "competition", "growth_potential"]
+
+# 클러스터 유형별 사용 특성과 기본 k
+FEATURE_SETS = {
+    "performance": ["health_score", "log_foot_traffic"],
+    "characteristics": ["log_foot_traffic", "competition", "growth_potential", "health_score"],
+    "growth_stage": ["growth_potential", "health_score", "competition"]
+}
+DEFAULT_K = {"performance": 3, "characteristics": 4, "growth_stage": 4}
+
+SUPPORTED_ALGORITHMS = ["kmeans", "dbscan"]
+
+
+def standardize(features: np.ndarray) -> np.ndarray:
+    """컬럼별 z-점수 (분산이 0인 컬럼은 0)"""
+    mean = features.mean(axis=0)
+    std = features.std(axis=0)
+    std[std == 0] = 1.0
+    return (features - mean) / std
+
+
+def _squared_distances(points: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    """N×K 제곱 유클리드 거리"""
+    distances = (
+        (points * points).sum(axis=1)[:, None]
+        - 2 * points @ centers.T
+        + (centers * centers).sum(axis=1)[None, :]
+    )
+    return np.maximum(distances, 0.0)
+
+
+def kmeans_plus_plus(points: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """k-means++ 초기 중심점"""
+    centers = np.empty((k, points.shape[1]))
+    centers[0] = points[rng.integers(len(points))]
+    closest = _squared_distances(points, centers[:1])[:, 0]
+    for i in range(1, k):
+        total = closest.sum()
+        if total == 0:
+            index = rng.integers(len(points))
+        else:
+            index = int(np.searchsorted(np.cumsum(closest), rng.random() * total))
+            index = min(index, len(points) - 1)
+        centers[i] = points[index]
+        closest = np.minimum(closest, _squared_distances(points, centers[i:i + 1])[:, 0])
+    return centers
+
+
+def kmeans(points: np.ndarray, k: int, seed: int = 42, n_init: int = 4,
+           max_iter: int = 100, tol: float = 1e-6) -> Tuple[np.ndarray, np.ndarray, float]:
+    """k-means - (레이블, 중심점, 관성), 같은 seed면 같은 결과"""
+    k = max(1, min(k, len(points)))
+    rng = np.random.default_rng(seed)
+    best = None
+
+    for _ in range(n_init):
+        centers = kmeans_plus_plus(points, k, rng)
+        for _ in range(max_iter):
+            distances = _squared_distances(points, centers)
+            labels = distances.argmin(axis=1)
+            counts = np.bincount(labels, minlength=k)
+
+            new_centers = np.zeros_like(centers)
+            np.add.at(new_centers, labels, points)
+            filled = counts > 0
+            new_centers[filled] /= counts[filled, None]
+            # 빈 클러스터는 현재 중심에서 가장 먼 점으로 재배치
+            for empty in np.flatnonzero(~filled):
+                farthest = int(distances[np.arange(len(points)), labels].argmax())
+                new_centers[empty] = points[farthest]
+                distances[farthest] = 0
+
+            shift = float(((new_centers - centers) ** 2).sum())
+            centers = new_centers
+            if shift <= tol:
+                break
+
+        distances = _squared_distances(points, centers)
+        labels = distances.argmin(axis=1)
+        inertia = float(distances[np.arange(len(points)), labels].sum())
+        if best is None or inertia < best[2]:
+            best = (labels, centers, inertia)
+
+    return best
+
+
+def dbscan(points: np.ndarray, eps: float = 0.8, min_samples: int = 3, block_rows: int = 1024) -> np.ndarray:
+    """DBSCAN - 레이블 (잡음은 -1)"""
+    size = len(points)
+    # 블록 단위 거리 계산으로 이웃 목록 생성 (N×N 행렬을 한 번에 만들지 않음)
+    neighbors: List[np.ndarray] = []
+    eps_sq = eps * eps
+    for start in range(0, size, block_rows):
+        distances = _squared_distances(points[start:start + block_rows], points)
+        neighbors.extend(np.flatnonzero(row <= eps_sq) for row in distances)
+
+    is_core = np.array([len(n) >= min_samples for n in neighbors], dtype=bool)
+    labels = np.full(size, -1, dtype=np.int64)
+    cluster = 0
+    for seed_point in np.flatnonzero(is_core):
+        if labels[seed_point] != -1:
+            continue
+        labels[seed_point] = cluster
+        frontier = [seed_point]
+        while frontier:
+            point = frontier.pop()
+            if not is_core[point]:
+                continue
+            for neighbor in neighbors[point]:
+                if labels[neighbor] == -1:
+                    labels[neighbor] = cluster
+                    frontier.append(neighbor)
+        cluster += 1
+    return labels
+
+
+class ClusteringEngine:
+    """데이터셋 버전별 특성 행렬 보관 및 클러스터링 실행"""
+
+    def __init__(self):
+        self._features: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def feature_matrix(self, version: str, markets: List[Dict[str, Any]]) -> np.ndarray:
+        """전체 상권 특성 행렬 (N × FEATURE_COLUMNS)"""
+        with self._lock:
+            matrix = self._features.get(version)
+            if matrix is None:
+                matrix = np.array([
+                    [
+                        m["health_score"],
+                        np.log1p(m["foot_traffic"]),
+                        COMPETITION_LEVEL_VALUES.get(m["competition_level"], 1.0),
+                        m["growth_potential"]
+                    ]
+                    for m in markets
+                ], dtype=np.float64).reshape(-1, len(FEATURE_COLUMNS))
+                # 이전 버전 행렬은 더 이상 쓰이지 않으므로 교체
+                self._features = {version: matrix}
+            return matrix
+
+    def cluster(self, version: str, markets: List[Dict[str, Any]], indices: np.ndarray,
+                cluster_type: str, algorithm: str = "kmeans", k: int = None, seed: int = 42,
+                eps: float = 0.8, min_samples: int = 3) -> Dict[str, Any]:
+        """선택 상권 클러스터링 - 레이블과 클러스터별 원 단위/표준화 중심점"""
+        columns = [FEATURE_COLUMNS.index(name) for name in FEATURE_SETS[cluster_type]]
+        raw = self.feature_matrix(version, markets)[np.asarray(indices, dtype=np.int64)][:, columns]
+        if not len(raw):
+            return {"labels": np.array([], dtype=np.int64), "centroids": {}, "scaled_centroids": {}}
+
+        scaled = standardize(raw)
+        if algorithm == "dbscan":
+            labels = dbscan(scaled, eps=eps, min_samples=min_samples)
+        else:
+            labels, _, _ = kmeans(scaled, k or DEFAULT_K[cluster_type], seed=seed)
+
+        centroids, scaled_centroids = {}, {}
+        for label in np.unique(labels[labels >= 0]):
+            mask = labels == label
+            centroids[int(label)] = raw[mask].mean(axis=0)
+            scaled_centroids[int(label)] = scaled[mask].mean(axis=0)
+        return {"labels": labels, "centroids": centroids, "scaled_centroids": scaled_centroids}
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+경쟁 밀도 서비스
+영업 중인 BusinessData를 격자 공간 인덱스로 CommercialArea 분석 반경에 공간 조인하여
+상권 × 업종별 사업체 수와 밀도(개/km²)를 사전 집계하고,
+사업체 창업/폐업(추가·수정·삭제)은 커밋 시점에 해당 상권 카운트만 증감하고
+영향 받은 (상권, 업종)을 점수 의존성 그래프에 전달
+"""
+import math
+import threading
+from collections import Counter
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+from flask import has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from extensions import db
+from models import CommercialArea, BusinessData
+from services.spatial_index import GridSpatialIndex
+from services.score_dependency_graph import score_dependencies
+
+# 영업 중으로 보는 사업체 상태
+ACTIVE_STATUSES = ("active", "new")
+
+DEFAULT_RADIUS_M = 500
+
+# 사업체 스냅샷 (위도, 경도, 업종) - 활성 상태가 아니면 None
+BusinessSnapshot = Optional[Tuple[float, float, str]]
+
+
+class CompetitionDensityService:
+    """상권 × 업종 사업체 수/밀도 집계 (조회는 dict 조회 1회)"""
+
+    def __init__(self):
+        self._counts: Dict[str, Counter] = {}
+        self._areas: Dict[str, Dict[str, Any]] = {}
+        self._area_codes: List[str] = []
+        self._area_radii_km = np.array([], dtype=np.float64)
+        self._area_index: Optional[GridSpatialIndex] = None
+        self._max_radius_km = 0.0
+        self._loaded = False
+        self._lock = threading.Lock()
+        # 최초/전체 재집계가 동시에 여러 번 실행되지 않도록 직렬화
+        self._load_lock = threading.RLock()
+        # 재집계 중 커밋된 변경이 있으면 집계 후 다시 만료 (조회 결과에 포함됐는지 알 수 없으므로)
+        self._loading = False
+        self._changed_during_load = False
+        # 커밋 전 세션별 변경분 (세션 id → [(이전 스냅샷, 이후 스냅샷)])
+        self._pending: Dict[int, List[Tuple[BusinessSnapshot, BusinessSnapshot]]] = {}
+        # 재집계/증분 반영마다 증가 (파생 캐시 무효화용)
+        self.version = 0
+
+    def refresh(self) -> int:
+        """전체 재집계 - 집계된 상권 수 반환
+
+        커밋된 데이터만 집계하도록 요청 세션과 별도의 세션으로 조회
+        """
+        with self._load_lock:
+            with self._lock:
+                self._loading = True
+                self._changed_during_load = False
+            try:
+                return self._refresh()
+            finally:
+                with self._lock:
+                    self._loading = False
+
+    def _refresh(self) -> int:
+        with Session(db.engine) as session:
+            areas = session.query(
+                CommercialArea.area_code, CommercialArea.latitude, CommercialArea.longitude, CommercialArea.radius
+            ).all()
+            businesses = session.query(
+                BusinessData.latitude, BusinessData.longitude, BusinessData.business_type
+            ).filter(BusinessData.status.in_(ACTIVE_STATUSES)).all()
+
+        area_codes = [str(code) for code, _, _, _ in areas]
+        area_lats = np.array([lat for _, lat, _, _ in areas], dtype=np.float64)
+        area_lngs = np.array([lng for _, _, lng, _ in areas], dtype=np.float64)
+        radii_km = np.array([(radius or DEFAULT_RADIUS_M) / 1000 for _, _, _, radius in areas], dtype=np.float64)
+
+        # 업종을 정수 코드로 바꿔 상권별 bincount로 집계
+        types = sorted({business_type for _, _, business_type in businesses})
+        type_codes = {business_type: i for i, business_type in enumerate(types)}
+        business_index = GridSpatialIndex(
+            [lat for lat, _, _ in businesses], [lng for _, lng, _ in businesses]
+        )
+        business_types = np.array([type_codes[t] for _, _, t in businesses], dtype=np.int64)
+
+        counts: Dict[str, Counter] = {}
+        for code, lat, lng, radius_km in zip(area_codes, area_lats, area_lngs, radii_km):
+            indices, _ = business_index.query_radius(lat, lng, radius_km)
+            per_type = np.bincount(business_types[indices], minlength=len(types))
+            counts[code] = Counter({types[i]: int(per_type[i]) for i in np.flatnonzero(per_type)})
+
+        with self._lock:
+            self._counts = counts
+            self._areas = {
+                code: {"radius_m": int(round(radius_km * 1000)), "area_km2": math.pi * float(radius_km) ** 2}
+                for code, radius_km in zip(area_codes, radii_km)
+            }
+            self._area_codes = area_codes
+            self._area_radii_km = radii_km
+            self._area_index = GridSpatialIndex(area_lats, area_lngs)
+            self._max_radius_km = float(radii_km.max()) if len(radii_km) else 0.0
+            self._loaded = not self._changed_during_load
+            self.version += 1
+
+        score_dependencies.notify("business_data", {"all": True})
+        return len(counts)
+
+    def has_area(self, area_code: str) -> bool:
+        """집계 대상 상권 여부"""
+        self._ensure_loaded()
+        return str(area_code) in self._areas
+
+    def get_counts(self, area_code: str) -> Optional[Dict[str, int]]:
+        """상권 반경 내 업종별 영업 사업체 수"""
+        self._ensure_loaded()
+        counts = self._counts.get(str(area_code))
+        if counts is None:
+            return None
+        return {business_type: count for business_type, count in counts.items() if count > 0}
+
+    def get_competition(self, area_code: str, business_type: str) -> Optional[Dict[str, Any]]:
+        """상권 × 업종 경쟁 지표 (사업체 수, 전체 대비 비율, 밀도)"""
+        self._ensure_loaded()
+        area = self._areas.get(str(area_code))
+        if area is None:
+            return None
+
+        counts = self._counts[str(area_code)]
+        count = counts.get(business_type, 0)
+        total = sum(counts.values())
+        return {
+            "business_count": count,
+            "total_businesses": total,
+            "industry_ratio": round(count / total * 100, 2) if total else 0.0,
+            "density_per_km2": round(count / area["area_km2"], 2) if area["area_km2"] else 0.0,
+            "radius_m": area["radius_m"]
+        }
+
+    def clear_cache(self):
+        """캐시 초기화"""
+        with self._lock:
+            self._counts = {}
+            self._areas = {}
+            self._area_index = None
+            self._loaded = False
+            self.version += 1
+        score_dependencies.notify("business_data", {"all": True})
+
+    def record_change(self, session: Session, before: BusinessSnapshot, after: BusinessSnapshot):
+        """플러시된 사업체 변경을 커밋 전까지 보관"""
+        if before == after or not (self._loaded or self._loading):
+            return
+        with self._lock:
+            self._pending.setdefault(id(session), []).append((before, after))
+
+    def apply_pending(self, session: Session):
+        """커밋된 변경분을 영향 받는 상권 카운트에만 반영"""
+        affected = set()
+        with self._lock:
+            changes = self._pending.pop(id(session), None)
+            if not changes:
+                return
+            if self._loading:
+                self._changed_during_load = True
+                return
+            if not self._loaded:
+                return
+            for before, after in changes:
+                if before is not None:
+                    affected.update(self._adjust(before, -1))
+                if after is not None:
+                    affected.update(self._adjust(after, 1))
+            self.version += 1
+
+        if affected:
+            score_dependencies.notify("business_data", {"market_industry": sorted(affected)})
+
+    def discard_pending(self, session: Session):
+        """롤백된 세션의 변경분 폐기"""
+        with self._lock:
+            self._pending.pop(id(session), None)
+
+    def _adjust(self, snapshot: Tuple[float, float, str], delta: int) -> List[Tuple[str, str]]:
+        """사업체 1건을 포함하는 모든 상권의 업종 카운트 증감 - 변경된 (상권, 업종) 반환"""
+        lat, lng, business_type = snapshot
+        indices, distances = self._area_index.query_radius(lat, lng, self._max_radius_km)
+        affected = []
+        for i in indices[distances <= self._area_radii_km[indices]]:
+            area_code = self._area_codes[int(i)]
+            counts = self._counts[area_code]
+            counts[business_type] = max(0, counts.get(business_type, 0) + delta)
+            affected.append((area_code, business_type))
+        return affected
+
+    def _ensure_loaded(self):
+        """최초 조회 시 집계 (실패하면 다음 조회 때 재시도)"""
+        if self._loaded or not has_app_context():
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"경쟁 밀도 집계 실패: {e}")
+
+
+# 사업체 변경 이벤트를 받는 공용 인스턴스
+competition_density = CompetitionDensityService()
+
+
+# 스냅샷 대상 컬럼
+SNAPSHOT_ATTRIBUTES = ("latitude", "longitude", "business_type", "status")
+
+
+def _snapshot(business: BusinessData, use_history: bool = False) -> BusinessSnapshot:
+    """사업체 위치/업종 스냅샷 (use_history면 플러시 직전 값)"""
+    values = {}
+    state = inspect(business)
+    for name in SNAPSHOT_ATTRIBUTES:
+        value = getattr(business, name)
+        if use_history:
+            history = state.attrs[name].history
+            if history.deleted:
+                value = history.deleted[0]
+        values[name] = value
+
+    if values["status"] not in ACTIVE_STATUSES or values["latitude"] is None or values["longitude"] is None:
+        return None
+    return (float(values["latitude"]), float(values["longitude"]), values["business_type"])
+
+
+def _load_previous_value(target, value, oldvalue, initiator):
+    """active_history 설정용 빈 리스너"""
+
+
+# 만료된(이전 커밋 후 다시 읽지 않은) 속성도 변경 시 이전 값을 읽어 history에 남기도록 설정
+for _name in SNAPSHOT_ATTRIBUTES:
+    event.listen(getattr(BusinessData, _name), "set", _load_previous_value, active_history=True)
+
+
+@event.listens_for(BusinessData, "after_insert")
+def _on_business_insert(mapper, connection, target):
+    competition_density.record_change(object_session(target), None, _snapshot(target))
+
+
+@event.listens_for(BusinessData, "after_update")
+def _on_business_update(mapper, connection, target):
+    competition_density.record_change(
+        object_session(target), _snapshot(target, use_history=True), _snapshot(target)
+    )
+
+
+@event.listens_for(BusinessData, "after_delete")
+def _on_business_delete(mapper, connection, target):
+    competition_density.record_change(object_session(target), _snapshot(target), None)
+
+
+@event.listens_for(Session, "after_commit")
+def _on_commit(session):
+    competition_density.apply_pending(session)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _on_rollback(session, previous_transaction):
+    competition_density.discard_pending(session)
@@ -3,14 +3,57 @@ import pandas as pd
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 import numpy as np
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from flask import current_app, has_app_context
+from services.traffic_cube_service import traffic_cube
+from services.competition_density_service import competition_density
+from services.traffic_series_store import traffic_series
+from services.score_cache import ScoreCache
+from services.score_dependency_graph import score_dependencies, ChangeKeys
+
+# 지표 소스 병렬 조회 설정
+# 소스별 동시 실행 한도 - 멈춘 소스가 공용 풀을 차지해 다른 소스가 밀리지 않도록 제한
+MAX_IN_FLIGHT_PER_SOURCE = 2
+INDICATOR_FETCH_WORKERS = 5 * MAX_IN_FLIGHT_PER_SOURCE  # 지표 소스 5개 × 소스별 한도
+DEFAULT_SOURCE_TIMEOUT = 3.0  # 초
 
 class CoreDiagnosisService:
     """상권 진단 핵심 지표 분석 서비스"""
     
+    # 지표 소스별 최대 대기 시간 (초)
+    source_timeouts = {
+        "foot_traffic": 3.0,
+        "card_sales": 3.0,
+        "same_industry": 2.0,
+        "business_rates": 3.0,
+        "dwell_time": 2.0
+    }
+    
+    # 건강 점수 가중치
+    health_weights = {
+        "foot_traffic": 0.25,
+        "card_sales": 0.25,
+        "business_rates": 0.25,
+        "dwell_time": 0.15,
+        "competition": 0.10
+    }
+    
     def __init__(self):
         self.data_loader = None
+        self.traffic_cube = traffic_cube
+        self.traffic_series = traffic_series
+        self.competition = competition_density
+        self._executor = ThreadPoolExecutor(max_workers=INDICATOR_FETCH_WORKERS, thread_name_prefix="indicator-fetch")
+        # 소스 → 동시 실행 슬롯
+        self._source_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._slots_lock = threading.Lock()
         # 임시로 하드코딩된 샘플 데이터 (실제로는 외부 API나 데이터베이스에서 가져와야 함)
         self.sample_data = self._init_sample_data()
+        # (상권, 업종) → 건강 점수 (사업체/유동인구 변경 시 해당 상권만 무효화)
+        self.health_cache = ScoreCache()
+        score_dependencies.register("health_scores", self._invalidate_health_scores)
     
     def _init_sample_data(self) -> Dict[str, Any]:
         """샘플 데이터 초기화"""
@@ -79,11 +122,10 @@ class CoreDiagnosisService:
     
     def get_foot_traffic_analysis(self, market_code: str, period_months: int = 12) -> Dict[str, Any]:
         """유동인구 변화량 분석"""
-        if market_code not in self.sample_data["foot_traffic"]:
+        traffic_data = self._get_monthly_traffic(market_code)
+        if not traffic_data:
             return {"error": "해당 상권의 유동인구 데이터가 없습니다."}
         
-        traffic_data = self.sample_data["foot_traffic"][market_code]
-        
         # 최근 N개월 데이터 추출
         months = list(traffic_data.keys())[-period_months:]
         values = [traffic_data[month] for month in months]
@@ -127,6 +169,14 @@ class CoreDiagnosisService:
             "analysis": self._get_foot_traffic_analysis_text(avg_monthly_change, grade)
         }
     
+    def _get_monthly_traffic(self, market_code: str) -> Optional[Dict[str, int]]:
+        """월별 유동인구 조회 (시계열 저장소 우선, 없으면 샘플 데이터)"""
+        monthly_totals = self.traffic_series.monthly_totals(market_code)
+        if monthly_totals:
+            return monthly_totals
+        
+        return self.sample_data["foot_traffic"].get(market_code)
+    
     def get_card_sales_analysis(self, market_code: str, period_months: int = 12) -> Dict[str, Any]:
         """카드매출 추이 분석"""
         if market_code not in self.sample_data["card_sales"]:
@@ -179,11 +229,10 @@ class CoreDiagnosisService:
     
     def get_same_industry_analysis(self, market_code: str, industry: str = None) -> Dict[str, Any]:
         """동일업종 수 분석"""
-        if market_code not in self.sample_data["same_industry_count"]:
+        industry_data = self._get_industry_counts(market_code)
+        if not industry_data:
             return {"error": "해당 상권의 업종별 사업체 데이터가 없습니다."}
         
-        industry_data = self.sample_data["same_industry_count"][market_code]
-        
         if industry and industry in industry_data:
             # 특정 업종 분석
             count = industry_data[industry]
@@ -204,7 +253,7 @@ class CoreDiagnosisService:
                 competition_level = "낮음"
                 grade = "A"
             
-            return {
+            result = {
                 "market_code": market_code,
                 "industry": industry,
                 "business_count": count,
@@ -214,6 +263,11 @@ class CoreDiagnosisService:
                 "grade": grade,
                 "analysis": self._get_competition_analysis_text(ratio, competition_level)
             }
+            competition = self.competition.get_competition(market_code, industry)
+            if competition:
+                result["density_per_km2"] = competition["density_per_km2"]
+                result["radius_m"] = competition["radius_m"]
+            return result
         else:
             # 전체 업종 분석
             return {
@@ -223,6 +277,14 @@ class CoreDiagnosisService:
                 "analysis": "전체 업종별 사업체 현황입니다."
             }
     
+    def _get_industry_counts(self, market_code: str) -> Optional[Dict[str, int]]:
+        """업종별 사업체 수 조회 (사업체 공간 집계 우선, 없으면 샘플 데이터)"""
+        counts = self.competition.get_counts(market_code)
+        if counts:
+            return counts
+        
+        return self.sample_data["same_industry_count"].get(market_code)
+    
     def get_business_rates_analysis(self, market_code: str) -> Dict[str, Any]:
         """창업·폐업 비율 분석"""
         if market_code not in self.sample_data["business_rates"]:
@@ -263,11 +325,10 @@ class CoreDiagnosisService:
     
     def get_dwell_time_analysis(self, market_code: str) -> Dict[str, Any]:
         """체류시간 분석"""
-        if market_code not in self.sample_data["dwell_time"]:
+        dwell_data = self._get_dwell_data(market_code)
+        if not dwell_data:
             return {"error": "해당 상권의 체류시간 데이터가 없습니다."}
         
-        dwell_data = self.sample_data["dwell_time"][market_code]
-        
         # 체류시간 등급 산정
         avg_time = dwell_data["average_dwell_time"]
         if avg_time >= 60:
@@ -288,60 +349,173 @@ class CoreDiagnosisService:
             "average_dwell_time": avg_time,
             "peak_hours": dwell_data["peak_hours"],
             "weekend_ratio": dwell_data["weekend_ratio"],
+            "demographics": dwell_data.get("demographics"),
             "grade": grade,
             "time_quality": time_quality,
             "analysis": self._get_dwell_time_analysis_text(avg_time, time_quality)
         }
     
-    def calculate_health_score(self, market_code: str, industry: str = None) -> Dict[str, Any]:
-        """상권 건강 점수 종합 산정"""
-        # 각 지표별 점수 계산
-        foot_traffic = self.get_foot_traffic_analysis(market_code)
-        card_sales = self.get_card_sales_analysis(market_code)
-        business_rates = self.get_business_rates_analysis(market_code)
-        dwell_time = self.get_dwell_time_analysis(market_code)
-        
-        # 에러 체크
-        if "error" in foot_traffic or "error" in card_sales or "error" in business_rates or "error" in dwell_time:
-            return {"error": "일부 데이터를 가져올 수 없습니다."}
+    def _get_dwell_data(self, market_code: str) -> Optional[Dict[str, Any]]:
+        """체류시간 데이터 조회 (유동인구 큐브 우선, 없으면 샘플 데이터)"""
+        if self.traffic_cube.has_area(market_code):
+            return {
+                "average_dwell_time": self.traffic_cube.average_dwell_time(market_code),
+                "peak_hours": self.traffic_cube.peak_windows(market_code),
+                "weekend_ratio": self.traffic_cube.weekend_ratio(market_code),
+                "demographics": self.traffic_cube.demographic_mix(market_code)
+            }
+        
+        return self.sample_data["dwell_time"].get(market_code)
+    
+    def fetch_indicators(self, market_code: str, industry: str = None, sources: List[str] = None) -> Dict[str, Any]:
+        """독립 지표 소스 병렬 조회
+        
+        각 소스는 제한된 스레드 풀에서 동시에 조회되며, 실행 시작부터 소스별 제한 시간을 넘기면
+        해당 지표만 누락 처리하고 나머지 결과를 반환합니다.
+        실행 중인 조회는 중단할 수 없어 시간 초과 후에도 끝날 때까지 슬롯을 차지하므로,
+        소스별 동시 실행 한도에 도달한 소스는 대기하지 않고 바로 누락 처리합니다.
+        """
+        readers = {
+            "foot_traffic": lambda: self.get_foot_traffic_analysis(market_code),
+            "card_sales": lambda: self.get_card_sales_analysis(market_code),
+            "same_industry": lambda: self.get_same_industry_analysis(market_code, industry),
+            "business_rates": lambda: self.get_business_rates_analysis(market_code),
+            "dwell_time": lambda: self.get_dwell_time_analysis(market_code)
+        }
+        if sources:
+            readers = {name: reader for name, reader in readers.items() if name in sources}
+        
+        # 워커 스레드에서도 DB 세션을 쓸 수 있도록 앱 컨텍스트 전달
+        app = current_app._get_current_object() if has_app_context() else None
+        
+        task_started = {}
+        
+        def run(name, reader):
+            task_started[name] = time.monotonic()
+            try:
+                if app is None:
+                    return reader()
+                with app.app_context():
+                    return reader()
+            finally:
+                self._source_slot(name).release()
+        
+        started_at = time.monotonic()
+        indicators = {}
+        unavailable_sources = []
+        futures = {}
+        for name, reader in readers.items():
+            if not self._source_slot(name).acquire(blocking=False):
+                indicators[name] = {"error": "지표 소스가 응답하지 않아 조회를 건너뛰었습니다.", "unavailable": True}
+                unavailable_sources.append(name)
+                continue
+            futures[name] = self._executor.submit(run, name, reader)
+        
+        for name, future in futures.items():
+            timeout = self.source_timeouts.get(name, DEFAULT_SOURCE_TIMEOUT)
+            try:
+                # 제출 후 아직 시작하지 않았으면 제출 시각 기준, 시작했으면 시작 시각 기준으로 대기
+                while True:
+                    deadline = task_started.get(name, started_at) + timeout
+                    try:
+                        indicators[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                        break
+                    except FutureTimeoutError:
+                        if task_started.get(name, started_at) + timeout <= time.monotonic():
+                            raise
+            except FutureTimeoutError:
+                # 시작 전이면 취소하고 슬롯 반환 (실행 중인 조회는 끝날 때까지 계속 실행됨)
+                if future.cancel():
+                    self._source_slot(name).release()
+                indicators[name] = {"error": "지표 조회 시간이 초과되었습니다.", "unavailable": True}
+                unavailable_sources.append(name)
+            except Exception as e:
+                indicators[name] = {"error": f"지표 조회 중 오류가 발생했습니다: {str(e)}", "unavailable": True}
+                unavailable_sources.append(name)
+        
+        return {
+            "indicators": indicators,
+            "unavailable_sources": unavailable_sources,
+            "elapsed_ms": round((time.monotonic() - started_at) * 1000, 1)
+        }
+    
+    def _source_slot(self, name: str) -> threading.BoundedSemaphore:
+        """소스별 동시 실행 슬롯"""
+        with self._slots_lock:
+            slot = self._source_slots.get(name)
+            if slot is None:
+                slot = self._source_slots[name] = threading.BoundedSemaphore(MAX_IN_FLIGHT_PER_SOURCE)
+            return slot
+    
+    def calculate_health_score(self, market_code: str, industry: str = None,
+                               indicators: Dict[str, Any] = None) -> Dict[str, Any]:
+        """상권 건강 점수 종합 산정
+        
+        indicators가 주어지면 이미 조회한 지표를 재사용합니다.
+        조회 시간 초과 등으로 누락된 지표는 제외하고 가중치를 재조정합니다.
+        지표를 직접 조회한 결과 중 누락 지표가 없는 것만 캐시하며, 결과는 수정하지 않아야 합니다.
+        """
+        if indicators is not None:
+            return self._calculate_health_score(market_code, industry, indicators)
+        
+        key = (str(market_code), industry)
+        cached = self.health_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        result = self._calculate_health_score(market_code, industry, None)
+        if "error" not in result and not result["missing_indicators"]:
+            self.health_cache.put(key, result, tags=(("market", str(market_code)),))
+        return result
+    
+    def _calculate_health_score(self, market_code: str, industry: Optional[str],
+                                indicators: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """상권 건강 점수 산정"""
+        core_indicators = ["foot_traffic", "card_sales", "business_rates", "dwell_time"]
+        
+        if indicators is None:
+            sources = core_indicators + (["same_industry"] if industry else [])
+            indicators = self.fetch_indicators(market_code, industry, sources)["indicators"]
+        
+        # 데이터 자체가 없는 경우는 에러, 조회 실패한 지표는 제외
+        available = {}
+        missing_indicators = []
+        for name in core_indicators:
+            result = indicators.get(name) or {"error": "지표가 조회되지 않았습니다.", "unavailable": True}
+            if "error" not in result:
+                available[name] = result
+            elif result.get("unavailable"):
+                missing_indicators.append(name)
+            else:
+                return {"error": "일부 데이터를 가져올 수 없습니다."}
+        
+        if not available:
+            return {"error": "지표 데이터를 조회할 수 없습니다."}
         
         # 동일업종 분석 (업종이 지정된 경우)
         same_industry = None
         if industry:
-            same_industry = self.get_same_industry_analysis(market_code, industry)
-            if "error" in same_industry:
+            same_industry = indicators.get("same_industry")
+            if not same_industry or "error" in same_industry:
                 same_industry = None
         
         # 점수 변환 (A=100, B=80, C=60, D=40)
         grade_scores = {"A": 100, "B": 80, "C": 60, "D": 40}
+        weights = self.health_weights
         
-        foot_traffic_score = grade_scores.get(foot_traffic["grade"], 60)
-        card_sales_score = grade_scores.get(card_sales["grade"], 60)
-        business_rates_score = business_rates["total_score"]
-        dwell_time_score = grade_scores.get(dwell_time["grade"], 60)
-        
-        # 가중치 적용
-        weights = {
-            "foot_traffic": 0.25,
-            "card_sales": 0.25,
-            "business_rates": 0.25,
-            "dwell_time": 0.15,
-            "competition": 0.10
-        }
-        
-        total_score = (
-            foot_traffic_score * weights["foot_traffic"] +
-            card_sales_score * weights["card_sales"] +
-            business_rates_score * weights["business_rates"] +
-            dwell_time_score * weights["dwell_time"]
-        )
+        scores = {}
+        for name, result in available.items():
+            if name == "business_rates":
+                scores[name] = result["total_score"]
+            else:
+                scores[name] = grade_scores.get(result["grade"], 60)
         
         # 경쟁도 점수 추가 (업종이 지정된 경우)
         if same_industry:
-            competition_score = grade_scores.get(same_industry["grade"], 60)
-            total_score += competition_score * weights["competition"]
-        else:
-            total_score = total_score / (1 - weights["competition"])  # 가중치 재조정
+            scores["competition"] = grade_scores.get(same_industry["grade"], 60)
+        
+        # 조회된 지표의 가중치 합으로 재조정
+        total_score = sum(scores[name] * weights[name] for name in scores) / sum(weights[name] for name in scores)
         
         # 최종 등급 산정
         if total_score >= 90:
@@ -367,37 +541,31 @@ class CoreDiagnosisService:
             "final_grade": final_grade,
             "health_status": health_status,
             "score_breakdown": {
-                "foot_traffic": {
-                    "score": foot_traffic_score,
-                    "grade": foot_traffic["grade"],
-                    "weight": weights["foot_traffic"]
-                },
-                "card_sales": {
-                    "score": card_sales_score,
-                    "grade": card_sales["grade"],
-                    "weight": weights["card_sales"]
-                },
-                "business_rates": {
-                    "score": business_rates_score,
-                    "grade": business_rates["grade"],
-                    "weight": weights["business_rates"]
-                },
-                "dwell_time": {
-                    "score": dwell_time_score,
-                    "grade": dwell_time["grade"],
-                    "weight": weights["dwell_time"]
+                name: {
+                    "score": scores[name],
+                    "grade": available[name]["grade"],
+                    "weight": weights[name]
                 }
+                for name in core_indicators if name in available
             },
+            "missing_indicators": missing_indicators,
             "detailed_analysis": {
-                "foot_traffic": foot_traffic,
-                "card_sales": card_sales,
-                "business_rates": business_rates,
-                "dwell_time": dwell_time,
+                "foot_traffic": indicators.get("foot_traffic"),
+                "card_sales": indicators.get("card_sales"),
+                "business_rates": indicators.get("business_rates"),
+                "dwell_time": indicators.get("dwell_time"),
                 "same_industry": same_industry
             },
             "recommendations": self._get_health_score_recommendations(total_score, final_grade)
         }
     
+    def _invalidate_health_scores(self, keys: ChangeKeys) -> int:
+        """변경된 상권의 건강 점수 캐시 무효화"""
+        if keys.get("all"):
+            return self.health_cache.clear()
+        markets = set(keys.get("market", ())) | {market_code for market_code, _ in keys.get("market_industry", ())}
+        return self.health_cache.invalidate([("market", str(market_code)) for market_code in markets])
+    
     def _get_foot_traffic_analysis_text(self, change_rate: float, grade: str) -> str:
         """유동인구 분석 텍스트 생성"""
         if grade == "A":
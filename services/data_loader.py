@@ -7,6 +7,7 @@ import pandas as pd
 import os
 import json
 from typing import Dict, List, Any, Optional
+from services.polygon_index import PolygonIndex
 
 class DataLoader:
     def __init__(self):
@@ -37,6 +38,19 @@ class DataLoader:
             print(f"상권 데이터 로드 실패: {e}")
             return pd.DataFrame()
     
+    def get_polygon_index(self) -> PolygonIndex:
+        """상권 폴리곤 인덱스 (상권 데이터 행 순서와 동일한 인덱스)"""
+        if 'polygon_index' in self._cache:
+            return self._cache['polygon_index']
+        
+        df = self.load_market_data()
+        if df.empty:
+            return PolygonIndex([])
+        
+        index = PolygonIndex([[(c['lng'], c['lat']) for c in coords] for coords in df['coordinates']])
+        self._cache['polygon_index'] = index
+        return index
+    
     def load_tourism_consumption(self) -> pd.DataFrame:
         """관광 소비 데이터 로드"""
         if 'tourism_consumption' in self._cache:
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+지리 계산 유틸리티
+numpy 벡터화 하버사인 거리 커널 (1:N 거리, N×M 거리 행렬), 웹 메르카토르 투영
+"""
+import math
+from typing import Tuple
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """대원 거리 (km) - 입력은 스칼라 또는 브로드캐스트 가능한 배열"""
+    lat1 = np.radians(lat1)
+    lat2 = np.radians(lat2)
+    dlat = lat2 - lat1
+    dlng = np.radians(lng2) - np.radians(lng1)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def distances_from_point(lat: float, lng: float, lats, lngs) -> np.ndarray:
+    """한 지점에서 N개 지점까지의 거리 (km)"""
+    return haversine_km(lat, lng, np.asarray(lats, dtype=np.float64), np.asarray(lngs, dtype=np.float64))
+
+
+def distance_matrix_km(lats_a, lngs_a, lats_b=None, lngs_b=None, dtype=np.float64,
+                       block_rows: int = 512) -> np.ndarray:
+    """N×M 거리 행렬 (km) - b를 생략하면 a의 전체 쌍 거리
+
+    중간 배열 메모리를 제한하기 위해 행 블록 단위로 계산
+    """
+    lats_a = np.asarray(lats_a, dtype=np.float64)
+    lngs_a = np.asarray(lngs_a, dtype=np.float64)
+    if lats_b is None:
+        lats_b, lngs_b = lats_a, lngs_a
+    else:
+        lats_b = np.asarray(lats_b, dtype=np.float64)
+        lngs_b = np.asarray(lngs_b, dtype=np.float64)
+
+    # 위도 코사인과 라디안 값을 미리 계산해 N×M 연산량 축소
+    rlat_a, rlng_a = np.radians(lats_a), np.radians(lngs_a)
+    rlat_b, rlng_b = np.radians(lats_b), np.radians(lngs_b)
+    cos_a, cos_b = np.cos(rlat_a), np.cos(rlat_b)
+
+    result = np.empty((len(lats_a), len(lats_b)), dtype=dtype)
+    for start in range(0, len(lats_a), block_rows):
+        stop = min(start + block_rows, len(lats_a))
+        sin_dlat = np.sin((rlat_b[None, :] - rlat_a[start:stop, None]) / 2)
+        sin_dlng = np.sin((rlng_b[None, :] - rlng_a[start:stop, None]) / 2)
+        a = sin_dlat * sin_dlat + cos_a[start:stop, None] * cos_b[None, :] * (sin_dlng * sin_dlng)
+        np.clip(a, 0.0, 1.0, out=a)
+        np.sqrt(a, out=a)
+        np.arcsin(a, out=a)
+        result[start:stop] = 2 * EARTH_RADIUS_KM * a
+    return result
+
+
+def lnglat_to_world(lats, lngs):
+    """위경도 → 웹 메르카토르 정규 좌표 (0~1, y는 북쪽이 0)"""
+    lats = np.clip(np.asarray(lats, dtype=np.float64), -85.05112878, 85.05112878)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    x = (lngs + 180.0) / 360.0
+    sin_lat = np.sin(np.radians(lats))
+    y = 0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return x, y
+
+
+def parse_bbox(value: str) -> Tuple[float, float, float, float]:
+    """'minLng,minLat,maxLng,maxLat' 문자열 파싱 (형식 오류 시 ValueError)"""
+    parts = str(value).split(',')
+    if len(parts) != 4:
+        raise ValueError("bbox는 minLng,minLat,maxLng,maxLat 형식이어야 합니다.")
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(part) for part in parts)
+    except ValueError:
+        raise ValueError("bbox 값은 숫자여야 합니다.")
+    if not (-180 <= min_lng <= max_lng <= 180 and -90 <= min_lat <= max_lat <= 90):
+        raise ValueError("bbox 범위가 올바르지 않습니다. (min ≤ max, 경도 ±180, 위도 ±90)")
+    return min_lng, min_lat, max_lng, max_lat
+
+
+def parse_point(lat, lng) -> Tuple[float, float]:
+    """위도, 경도 값 파싱 (숫자가 아니거나 NaN/무한대/범위 밖이면 ValueError)"""
+    try:
+        lat, lng = float(lat), float(lng)
+    except (TypeError, ValueError):
+        raise ValueError("lat, lng는 숫자여야 합니다.")
+    # NaN은 비교가 항상 거짓이므로 범위 검사에서 함께 걸러짐
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError("lat은 -90~90, lng는 -180~180 범위의 유한한 숫자여야 합니다.")
+    return lat, lng
+
+
+def world_to_lnglat(x, y):
+    """웹 메르카토르 정규 좌표 → (위도, 경도)"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    lngs = x * 360.0 - 180.0
+    lats = np.degrees(np.arctan(np.sinh(math.pi * (1 - 2 * y))))
+    return lats, lngs
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+히트맵 타일 서비스
+상권 좌표에 지표 가중 가우시안 커널 밀도를 적용해 웹 메르카토르 타일(PNG)로 렌더링하고
+현재 데이터셋 버전의 타일만 instance/ 아래 디스크에 캐시 (버전이 바뀌면 이전 버전 삭제)
+"""
+import os
+import math
+import shutil
+import zlib
+import struct
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+from services.geo_utils import lnglat_to_world
+
+TILE_SIZE = 256
+MAX_ZOOM = 20
+
+# 커널 대역폭 (지상 거리) 및 저배율에서의 최소 픽셀 반경
+KDE_BANDWIDTH_KM = 0.8
+MIN_SIGMA_PX = 2.0
+
+EARTH_CIRCUMFERENCE_KM = 40075.016686
+
+# 최대 밀도 추정용 격자 - σ당 셀 수와 축별 최대 셀 수
+PEAK_GRID_CELLS_PER_SIGMA = 4
+MAX_PEAK_GRID_CELLS = 1024
+
+SUPPORTED_METRICS = ["health_score", "foot_traffic", "competition", "growth_potential"]
+
+# 기존 히트맵과 동일한 경쟁도 강도
+COMPETITION_INTENSITY = {"high": 1.0, "medium": 0.6, "low": 0.3}
+
+# 강도 → 색상 (파랑 → 초록 → 노랑 → 빨강)
+COLOR_STOPS = np.array([0.0, 0.35, 0.65, 1.0])
+COLOR_RAMP = np.array([
+    [0, 0, 255],
+    [0, 255, 0],
+    [255, 255, 0],
+    [255, 0, 0]
+], dtype=np.float64)
+
+
+def encode_png_rgba(pixels: np.ndarray) -> bytes:
+    """H×W×4 uint8 배열을 PNG 바이트로 인코딩"""
+    height, width = pixels.shape[:2]
+    # 행마다 필터 타입 0(None) 바이트를 붙임
+    raw = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    raw[:, 1:] = pixels.reshape(height, width * 4)
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(raw.tobytes(), 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+class HeatmapTileService:
+    """지표별 커널 밀도 히트맵 타일 렌더링 및 디스크 캐시"""
+
+    def __init__(self, base_dir: str = None):
+        self.base_dir = base_dir or os.path.join(os.path.dirname(__file__), '..', 'instance', 'tiles')
+        self._layers: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+        self._empty_tile = encode_png_rgba(np.zeros((TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8))
+
+    def get_tile(self, markets: List[Dict[str, Any]], version: str, metric: str, z: int, x: int, y: int) -> bytes:
+        """타일 PNG 조회 (디스크 캐시 우선)"""
+        self._activate_version(version)
+        path = self._tile_path(version, metric, z, x, y)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                return f.read()
+
+        density = self.render_density(markets, version, metric, z, x, y)
+        if density is None:
+            return self._empty_tile
+
+        tile = encode_png_rgba(self._colorize(density))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(tile)
+        os.replace(tmp_path, path)
+        return tile
+
+    def render_density(self, markets: List[Dict[str, Any]], version: str, metric: str,
+                       z: int, x: int, y: int) -> Optional[np.ndarray]:
+        """타일 범위의 정규화 밀도 격자 (256×256, 0~1) - 영향 상권이 없으면 None"""
+        layer = self._get_layer(markets, version, metric)
+        scale = TILE_SIZE * (1 << z)
+        sigma = self._sigma_px(layer["mean_lat"], z)
+
+        # 타일 밖 3σ 이내 상권만 사용
+        px = layer["world_x"] * scale - x * TILE_SIZE
+        py = layer["world_y"] * scale - y * TILE_SIZE
+        margin = 3 * sigma
+        near = (px > -margin) & (px < TILE_SIZE + margin) & (py > -margin) & (py < TILE_SIZE + margin)
+        if not near.any():
+            return None
+
+        # 2차원 가우시안을 축별로 분리해 (256×N)·(N×256) 행렬곱으로 계산
+        centers = np.arange(TILE_SIZE) + 0.5
+        kernel_x = np.exp(-((centers[None, :] - px[near, None]) ** 2) / (2 * sigma ** 2))
+        kernel_y = np.exp(-((centers[:, None] - py[None, near]) ** 2) / (2 * sigma ** 2))
+        density = kernel_y @ (layer["weights"][near, None] * kernel_x)
+
+        return np.clip(density / self._peak_density(layer, z, sigma), 0.0, 1.0)
+
+    def clear_cache(self):
+        """메모리 캐시 초기화 (현재 버전의 디스크 타일은 유지)"""
+        with self._lock:
+            self._layers.clear()
+
+    def _activate_version(self, version: str):
+        """데이터셋 버전이 바뀌면 이전 버전의 레이어와 디스크 타일 삭제"""
+        with self._lock:
+            if version == self._version:
+                return
+            self._version = version
+            for key in [key for key in self._layers if key[0] != version]:
+                del self._layers[key]
+
+        if os.path.isdir(self.base_dir):
+            for name in os.listdir(self.base_dir):
+                if name != version:
+                    shutil.rmtree(os.path.join(self.base_dir, name), ignore_errors=True)
+
+    def _get_layer(self, markets: List[Dict[str, Any]], version: str, metric: str) -> Dict[str, Any]:
+        """데이터셋 버전 × 지표별 좌표/가중치 배열 (1회 계산)"""
+        key = (version, metric)
+        with self._lock:
+            layer = self._layers.get(key)
+            if layer is None:
+                lats = np.array([m["lat"] for m in markets], dtype=np.float64)
+                lngs = np.array([m["lng"] for m in markets], dtype=np.float64)
+                world_x, world_y = lnglat_to_world(lats, lngs)
+                layer = {
+                    "world_x": world_x,
+                    "world_y": world_y,
+                    "weights": self._metric_weights(markets, metric),
+                    "mean_lat": float(lats.mean()) if len(lats) else 0.0,
+                    "peaks": {}
+                }
+                self._layers[key] = layer
+            return layer
+
+    def _metric_weights(self, markets: List[Dict[str, Any]], metric: str) -> np.ndarray:
+        """지표 값을 0~1 가중치로 변환"""
+        if metric == "competition":
+            return np.array([COMPETITION_INTENSITY.get(m["competition_level"], 0.3) for m in markets])
+        values = np.array([m[metric] for m in markets], dtype=np.float64)
+        if metric == "foot_traffic":
+            max_value = values.max() if len(values) else 0
+            return values / max_value if max_value else values
+        return values / 100.0
+
+    def _peak_density(self, layer: Dict[str, Any], z: int, sigma: float) -> float:
+        """줌별 정규화 기준 - 최대 밀도 (타일 간 색상 일관성 유지)
+
+        상권 가중치를 σ/4 크기 격자에 모은 뒤 분리형 가우시안으로 합성곱해 근사 (O(격자 크기))
+        """
+        peak = layer["peaks"].get(z)
+        if peak is None:
+            weights = layer["weights"]
+            peak = 0.0
+            if len(weights):
+                scale = TILE_SIZE * (1 << z)
+                px = layer["world_x"] * scale
+                py = layer["world_y"] * scale
+                px = px - px.min()
+                py = py - py.min()
+                cell = max(sigma / PEAK_GRID_CELLS_PER_SIGMA,
+                           px.max() / MAX_PEAK_GRID_CELLS, py.max() / MAX_PEAK_GRID_CELLS)
+                ix = np.minimum((px / cell).astype(np.int64), MAX_PEAK_GRID_CELLS - 1)
+                iy = np.minimum((py / cell).astype(np.int64), MAX_PEAK_GRID_CELLS - 1)
+                width = int(ix.max()) + 1
+                grid = np.bincount(iy * width + ix, weights=weights,
+                                   minlength=(int(iy.max()) + 1) * width).reshape(-1, width)
+
+                radius = int(math.ceil(3 * sigma / cell))
+                offsets = np.arange(-radius, radius + 1) * cell
+                kernel = np.exp(-(offsets ** 2) / (2 * sigma ** 2))
+                density = self._convolve_axis(self._convolve_axis(grid, kernel, 0), kernel, 1)
+                peak = float(density.max())
+            peak = peak or 1.0
+            layer["peaks"][z] = peak
+        return peak
+
+    @staticmethod
+    def _convolve_axis(grid: np.ndarray, kernel: np.ndarray, axis: int) -> np.ndarray:
+        """1차원 커널을 한 축으로 합성곱 (출력 크기 유지, 경계 밖은 0)"""
+        radius = len(kernel) // 2
+        pad = [(0, 0), (0, 0)]
+        pad[axis] = (radius, radius)
+        padded = np.pad(grid, pad)
+        result = np.zeros_like(grid)
+        length = grid.shape[axis]
+        for offset, weight in enumerate(kernel):
+            result += weight * padded.take(np.arange(offset, offset + length), axis=axis)
+        return result
+
+    def _sigma_px(self, lat: float, z: int) -> float:
+        """커널 대역폭 (km) → 해당 줌의 픽셀 단위"""
+        px_per_km = TILE_SIZE * (1 << z) / (EARTH_CIRCUMFERENCE_KM * math.cos(math.radians(lat)))
+        return max(KDE_BANDWIDTH_KM * px_per_km, MIN_SIGMA_PX)
+
+    def _colorize(self, density: np.ndarray) -> np.ndarray:
+        """밀도 → RGBA (강도가 낮을수록 투명)"""
+        rgba = np.empty(density.shape + (4,), dtype=np.uint8)
+        for channel in range(3):
+            rgba[..., channel] = np.interp(density, COLOR_STOPS, COLOR_RAMP[:, channel]).astype(np.uint8)
+        rgba[..., 3] = np.rint(np.sqrt(density) * 200).astype(np.uint8)
+        return rgba
+
+    def _tile_path(self, version: str, metric: str, z: int, x: int, y: int) -> str:
+        return os.path.join(self.base_dir, version, metric, str(z), str(x), f"{y}.png")
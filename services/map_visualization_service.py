@@ -1,108 +1,320 @@
 import os
+import json
+import hashlib
+import threading
 import pandas as pd
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import numpy as np
-import math
+from services.traffic_cube_service import traffic_cube
+from services.traffic_flow_service import TrafficFlowService
+from services.spatial_index import GridSpatialIndex
+from services.point_cluster_index import PointClusterIndex
+from services.accessibility_service import AccessibilityService
+from services.walking_catchment_service import WalkingCatchmentService
+from services.clustering_engine import ClusteringEngine, FEATURE_SETS, DEFAULT_K
+from services.geo_utils import haversine_km, distance_matrix_km
+from services.data_loader import DataLoader
+from services.heatmap_tile_service import HeatmapTileService
+from services.vector_tile_service import VectorTileService
+
+# 전체 쌍 거리 행렬을 캐시할 최대 상권 수 (float32 기준 약 64MB)
+MAX_CACHED_MATRIX_MARKETS = 4000
+
+# 일괄 위치 조회 최대 좌표 수
+MAX_LOCATE_BATCH_POINTS = 10000
+
+# 분석 결과 캐시 최대 항목 수 (초과 시 가장 오래된 항목부터 제거)
+MAX_ANALYSIS_CACHE_ENTRIES = 256
+
+# 줌별 최대 반환 상권 수 (해당 줌 이하에서 적용, 그 이상은 제한 없음)
+ZOOM_MARKET_CAPS = [(10, 200), (12, 500), (14, 2000)]
+
+
+def market_cap_for_zoom(zoom: Optional[int]) -> Optional[int]:
+    """줌 레벨별 최대 상권 수 (제한 없으면 None)"""
+    if zoom is None:
+        return None
+    for max_zoom, cap in ZOOM_MARKET_CAPS:
+        if zoom <= max_zoom:
+            return cap
+    return None
 
 class MapVisualizationService:
     """지도 기반 시각화 서비스"""
     
     def __init__(self):
-        self.data_loader = None
+        self.data_loader = DataLoader()
+        self.traffic_cube = traffic_cube
+        self.traffic_flow = TrafficFlowService(self.traffic_cube)
+        self.heatmap_tiles = HeatmapTileService()
+        self.vector_tiles = VectorTileService()
+        self.clustering = ClusteringEngine()
+        self.accessibility = AccessibilityService()
+        self.walking = WalkingCatchmentService()
+        self._accessibility_table = {}
+        self._accessibility_version = None
         self.sample_market_data = self._init_sample_market_data()
         self.analysis_cache = {}
+        self.dataset_version = self._compute_dataset_version(self.sample_market_data)
+        self._spatial_index = None
+        self._spatial_index_version = None
+        self._index_lock = threading.Lock()
+        self._distance_matrix = None
+        self._distance_matrix_version = None
+        self._point_clusters = None
+        self._point_clusters_version = None
+        self._polygon_index = None
+        self._polygon_source = None
+        self._polygon_markets = []
+        self._polygons = []
+        self._polygon_version = None
+    
+    def refresh_market_data(self, markets: List[Dict[str, Any]]) -> str:
+        """상권 데이터 교체 - 새 데이터셋 버전 반환"""
+        self.sample_market_data = markets
+        self.dataset_version = self._compute_dataset_version(markets)
+        self.analysis_cache = {}
+        return self.dataset_version
+    
+    def find_nearest_markets(self, lat: float, lng: float, k: int = 5) -> List[Dict[str, Any]]:
+        """최근접 상권 k개 조회"""
+        markets = self.sample_market_data
+        indices, distances = self._get_spatial_index().query_nearest(lat, lng, k)
+        return [
+            dict(markets[i], distance_km=round(float(distance), 2))
+            for i, distance in zip(indices, distances)
+        ]
+    
+    def locate_market(self, lat: float, lng: float) -> Dict[str, Any]:
+        """좌표가 속한 상권 조회"""
+        index, markets = self._get_polygon_index()
+        matches = [markets[i] for i in index.locate(lat, lng)]
+        if not matches:
+            return {"error": "해당 위치를 포함하는 상권이 없습니다."}
+        
+        return {
+            "lat": lat,
+            "lng": lng,
+            "market": matches[0],
+            "overlapping_markets": matches[1:]
+        }
+    
+    def locate_markets(self, points: List[Dict[str, float]]) -> Dict[str, Any]:
+        """좌표 목록 일괄 상권 조회 (좌표별 가장 좁은 상권)"""
+        index, markets = self._get_polygon_index()
+        lats = np.array([p["lat"] for p in points], dtype=np.float64)
+        lngs = np.array([p["lng"] for p in points], dtype=np.float64)
+        located = index.locate_many(lats, lngs)
+        
+        results = [
+            {
+                "lat": float(lat),
+                "lng": float(lng),
+                "market": markets[i] if i >= 0 else None
+            }
+            for lat, lng, i in zip(lats, lngs, located)
+        ]
+        return {
+            "total_points": len(results),
+            "located_points": int(np.count_nonzero(located >= 0)),
+            "results": results
+        }
     
-    def get_market_heatmap_data(self, region: str = None, analysis_type: str = "health_score") -> Dict[str, Any]:
-        """상권 히트맵 데이터 생성"""
+    def get_market_heatmap_data(self, region: str = None, analysis_type: str = "health_score",
+                                bbox: Tuple[float, float, float, float] = None, zoom: int = None) -> Dict[str, Any]:
+        """상권 히트맵 데이터 생성 (bbox 지정 시 화면 범위 내 상권만)"""
         
         # 분석 유형별 데이터 생성
         if analysis_type == "health_score":
-            return self._generate_health_score_heatmap(region)
+            heatmap = self._generate_health_score_heatmap(region, bbox, zoom)
         elif analysis_type == "foot_traffic":
-            return self._generate_foot_traffic_heatmap(region)
+            heatmap = self._generate_foot_traffic_heatmap(region, bbox, zoom)
         elif analysis_type == "competition":
-            return self._generate_competition_heatmap(region)
+            heatmap = self._generate_competition_heatmap(region, bbox, zoom)
         elif analysis_type == "growth_potential":
-            return self._generate_growth_potential_heatmap(region)
+            heatmap = self._generate_growth_potential_heatmap(region, bbox, zoom)
         else:
             return {"error": "지원하지 않는 분석 유형입니다."}
+        
+        if bbox:
+            heatmap["bbox"] = list(bbox)
+        return heatmap
     
-    def get_radius_analysis(self, center_lat: float, center_lng: float, radius_km: float, analysis_type: str = "comprehensive") -> Dict[str, Any]:
-        """반경별 분석 결과"""
+    def get_clustered_points(self, zoom: int, bbox: Tuple[float, float, float, float] = None) -> Dict[str, Any]:
+        """줌별 상권 포인트 클러스터 (사전 생성 계층에서 조회)"""
+        markets = self.sample_market_data
+        points = []
+        for cluster in self._get_point_clusters().get_clusters(zoom, bbox):
+            member = cluster.pop("member")
+            if member >= 0:
+                market = markets[member]
+                points.append({
+                    "type": "market",
+                    "market_code": market["market_code"],
+                    "market_name": market["market_name"],
+                    "lat": market["lat"],
+                    "lng": market["lng"],
+                    "health_score": market["health_score"],
+                    "foot_traffic": market["foot_traffic"]
+                })
+            else:
+                points.append(dict(cluster, type="cluster"))
+        
+        return {
+            "zoom": zoom,
+            "bbox": list(bbox) if bbox else None,
+            "total_points": len(points),
+            "total_markets": sum(p.get("count", 1) for p in points),
+            "points": points
+        }
+    
+    def get_heatmap_tile(self, metric: str, z: int, x: int, y: int) -> bytes:
+        """지표별 히트맵 타일 PNG (데이터셋 버전별 디스크 캐시)"""
+        return self.heatmap_tiles.get_tile(self.sample_market_data, self.dataset_version, metric, z, x, y)
+    
+    def get_vector_tile(self, z: int, x: int, y: int) -> bytes:
+        """상권 폴리곤 벡터 타일 (MVT)"""
+        self._get_polygon_index()
+        # 폴리곤과 건강 점수 데이터 중 하나라도 바뀌면 새 피라미드
+        version = f"{self._polygon_version}-{self.dataset_version}"
+        if not self.vector_tiles.has_layer(version):
+            self.vector_tiles.prepare(version, self._polygons, self._vector_tile_properties())
+        self.vector_tiles.ensure_pyramid(version)
+        return self.vector_tiles.get_tile(version, z, x, y)
+    
+    def get_radius_analysis(self, center_lat: float, center_lng: float, radius_km: float, analysis_type: str = "comprehensive",
+                            mode: str = "straight") -> Dict[str, Any]:
+        """반경별 분석 결과 (mode=walk면 radius_km를 도로망 도보 거리로 해석)"""
         
         # 반경 내 상권 찾기
-        nearby_markets = self._find_markets_in_radius(center_lat, center_lng, radius_km)
+        if mode == "walk":
+            nearby_markets = self._find_markets_in_walking_distance(center_lat, center_lng, radius_km)
+        else:
+            nearby_markets = self._find_markets_in_radius(center_lat, center_lng, radius_km)
         
         if not nearby_markets:
             return {"error": "반경 내 상권이 없습니다."}
         
         # 분석 유형별 결과 생성
         if analysis_type == "comprehensive":
-            return self._generate_comprehensive_radius_analysis(nearby_markets, center_lat, center_lng, radius_km)
+            result = self._generate_comprehensive_radius_analysis(nearby_markets, center_lat, center_lng, radius_km)
         elif analysis_type == "competition":
-            return self._generate_competition_radius_analysis(nearby_markets, center_lat, center_lng, radius_km)
+            result = self._generate_competition_radius_analysis(nearby_markets, center_lat, center_lng, radius_km)
         elif analysis_type == "opportunity":
-            return self._generate_opportunity_radius_analysis(nearby_markets, center_lat, center_lng, radius_km)
+            result = self._generate_opportunity_radius_analysis(nearby_markets, center_lat, center_lng, radius_km)
         else:
             return {"error": "지원하지 않는 분석 유형입니다."}
+        
+        result["mode"] = mode
+        return result
+    
+    def get_walking_catchment(self, market_code: str) -> Dict[str, Any]:
+        """상권 중심 5/10/15분 도보 도달 범위 (데이터셋 버전별 사전 계산)"""
+        self.walking.precompute(self.sample_market_data, self.dataset_version)
+        catchment = self.walking.get_catchment(market_code)
+        if catchment is None:
+            return {"error": "상권 정보를 찾을 수 없습니다."}
+        return dict(catchment, market_code=market_code)
     
-    def get_market_cluster_analysis(self, region: str = None, cluster_type: str = "performance") -> Dict[str, Any]:
-        """상권 클러스터 분석"""
+    def get_market_cluster_analysis(self, region: str = None, cluster_type: str = "performance",
+                                    bbox: Tuple[float, float, float, float] = None, zoom: int = None,
+                                    k: int = None, algorithm: str = "kmeans", seed: int = 42,
+                                    eps: float = 0.8, min_samples: int = 3) -> Dict[str, Any]:
+        """상권 클러스터 분석 (표준화 특성 기반 k-means/DBSCAN, bbox 지정 시 화면 범위 내 상권만)"""
+        if cluster_type not in FEATURE_SETS:
+            return {"error": "지원하지 않는 클러스터 유형입니다."}
+        
+        k = k or DEFAULT_K[cluster_type]
+        cache_key = ("cluster", self.dataset_version, region, bbox, zoom, cluster_type, algorithm, k, seed, eps, min_samples)
+        cached = self.analysis_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
-        markets = self._get_markets_by_region(region)
+        indices = self._select_market_indices(region, bbox, zoom)
+        markets = [self.sample_market_data[i] for i in indices]
+        result = self.clustering.cluster(self.dataset_version, self.sample_market_data, indices,
+                                         cluster_type, algorithm=algorithm, k=k, seed=seed,
+                                         eps=eps, min_samples=min_samples)
         
         if cluster_type == "performance":
-            return self._cluster_by_performance(markets)
+            analysis = self._cluster_by_performance(markets, result)
         elif cluster_type == "characteristics":
-            return self._cluster_by_characteristics(markets)
-        elif cluster_type == "growth_stage":
-            return self._cluster_by_growth_stage(markets)
+            analysis = self._cluster_by_characteristics(markets, result)
         else:
-            return {"error": "지원하지 않는 클러스터 유형입니다."}
+            analysis = self._cluster_by_growth_stage(markets, result)
+        
+        analysis.update({
+            "algorithm": algorithm,
+            "k": len(result["centroids"]),
+            "seed": seed if algorithm == "kmeans" else None,
+            "features": FEATURE_SETS[cluster_type],
+            "noise_markets": [m["market_code"] for m, label in zip(markets, result["labels"]) if label < 0]
+        })
+        
+        if len(self.analysis_cache) >= MAX_ANALYSIS_CACHE_ENTRIES:
+            self.analysis_cache.pop(next(iter(self.analysis_cache)))
+        self.analysis_cache[cache_key] = analysis
+        return analysis
     
     def get_traffic_flow_analysis(self, market_code: str, time_period: str = "daily") -> Dict[str, Any]:
-        """유동인구 흐름 분석"""
+        """유동인구 흐름 분석 (사전 계산된 프로필 조회)"""
         
-        # 시간대별 유동인구 데이터 생성
-        traffic_data = self._generate_traffic_flow_data(market_code, time_period)
+        profile = self.traffic_flow.get_profile(market_code, time_period)
         
         return {
             "market_code": market_code,
             "time_period": time_period,
-            "traffic_flow": traffic_data,
-            "peak_hours": self._identify_peak_hours(traffic_data),
-            "flow_patterns": self._analyze_flow_patterns(traffic_data),
-            "recommendations": self._get_traffic_recommendations(traffic_data)
+            **profile
         }
     
     def get_accessibility_analysis(self, market_code: str) -> Dict[str, Any]:
-        """접근성 분석"""
+        """접근성 분석 (데이터셋 버전별 사전 계산 결과 조회)"""
         
-        market_info = self._get_market_info(market_code)
-        if not market_info:
+        analysis = self._get_accessibility_table().get(str(market_code))
+        if not analysis:
             return {"error": "상권 정보를 찾을 수 없습니다."}
+        return analysis
+    
+    def _get_accessibility_table(self) -> Dict[str, Dict[str, Any]]:
+        """전체 상권 접근성 분석 (버전이 바뀔 때만 재계산)"""
+        with self._index_lock:
+            if self._accessibility_version == self.dataset_version:
+                return self._accessibility_table
+        
+        markets = self.sample_market_data
+        version = self.dataset_version
+        self.accessibility.precompute(markets, version)
+        table = {}
+        for market_info in markets:
+            facilities = self.accessibility.get_market_accessibility(market_info["market_code"]) or {}
+            
+            # 교통편 분석
+            transportation = self._analyze_transportation(market_info, facilities)
+            
+            # 주차 시설 분석
+            parking = self._analyze_parking(market_info, facilities)
+            
+            # 보행자 접근성 분석
+            pedestrian = self._analyze_pedestrian_access(market_info)
+            
+            # 종합 접근성 점수 계산
+            accessibility_score = self._calculate_accessibility_score(transportation, parking, pedestrian)
+            
+            table[str(market_info["market_code"])] = {
+                "market_code": market_info["market_code"],
+                "accessibility_score": accessibility_score,
+                "transportation": transportation,
+                "parking": parking,
+                "pedestrian": pedestrian,
+                "data_sources": self._accessibility_data_sources(facilities),
+                "improvement_suggestions": self._get_accessibility_improvements(accessibility_score, transportation, parking, pedestrian)
+            }
         
-        # 교통편 분석
-        transportation = self._analyze_transportation(market_info)
-        
-        # 주차 시설 분석
-        parking = self._analyze_parking(market_info)
-        
-        # 보행자 접근성 분석
-        pedestrian = self._analyze_pedestrian_access(market_info)
-        
-        # 종합 접근성 점수 계산
-        accessibility_score = self._calculate_accessibility_score(transportation, parking, pedestrian)
-        
-        return {
-            "market_code": market_code,
-            "accessibility_score": accessibility_score,
-            "transportation": transportation,
-            "parking": parking,
-            "pedestrian": pedestrian,
-            "improvement_suggestions": self._get_accessibility_improvements(accessibility_score, transportation, parking, pedestrian)
-        }
+        with self._index_lock:
+            self._accessibility_table = table
+            self._accessibility_version = version
+        return table
     
     def _init_sample_market_data(self) -> List[Dict[str, Any]]:
         """샘플 상권 데이터 초기화"""
@@ -169,9 +381,10 @@ class MapVisualizationService:
             }
         ]
     
-    def _generate_health_score_heatmap(self, region: str = None) -> Dict[str, Any]:
+    def _generate_health_score_heatmap(self, region: str = None, bbox: Tuple[float, float, float, float] = None,
+                                       zoom: int = None) -> Dict[str, Any]:
         """건강 점수 히트맵 데이터 생성"""
-        markets = self._get_markets_by_region(region)
+        markets = self._get_markets_by_region(region, bbox, zoom)
         
         heatmap_data = []
         for market in markets:
@@ -214,17 +427,18 @@ class MapVisualizationService:
             }
         }
     
-    def _generate_foot_traffic_heatmap(self, region: str = None) -> Dict[str, Any]:
+    def _generate_foot_traffic_heatmap(self, region: str = None, bbox: Tuple[float, float, float, float] = None,
+                                       zoom: int = None) -> Dict[str, Any]:
         """유동인구 히트맵 데이터 생성"""
-        markets = self._get_markets_by_region(region)
+        markets = self._get_markets_by_region(region, bbox, zoom)
         
         # 유동인구 최대값으로 정규화
-        max_traffic = max(market["foot_traffic"] for market in markets)
+        max_traffic = max((market["foot_traffic"] for market in markets), default=0)
         
         heatmap_data = []
         for market in markets:
             # 유동인구에 따른 강도 계산
-            intensity = market["foot_traffic"] / max_traffic
+            intensity = market["foot_traffic"] / max_traffic if max_traffic else 0.0
             
             heatmap_data.append({
                 "lat": market["lat"],
@@ -244,9 +458,10 @@ class MapVisualizationService:
             "max_traffic": max_traffic
         }
     
-    def _generate_competition_heatmap(self, region: str = None) -> Dict[str, Any]:
+    def _generate_competition_heatmap(self, region: str = None, bbox: Tuple[float, float, float, float] = None,
+                                      zoom: int = None) -> Dict[str, Any]:
         """경쟁도 히트맵 데이터 생성"""
-        markets = self._get_markets_by_region(region)
+        markets = self._get_markets_by_region(region, bbox, zoom)
         
         heatmap_data = []
         for market in markets:
@@ -279,9 +494,10 @@ class MapVisualizationService:
             "heatmap_data": heatmap_data
         }
     
-    def _generate_growth_potential_heatmap(self, region: str = None) -> Dict[str, Any]:
+    def _generate_growth_potential_heatmap(self, region: str = None, bbox: Tuple[float, float, float, float] = None,
+                                           zoom: int = None) -> Dict[str, Any]:
         """성장 잠재력 히트맵 데이터 생성"""
-        markets = self._get_markets_by_region(region)
+        markets = self._get_markets_by_region(region, bbox, zoom)
         
         heatmap_data = []
         for market in markets:
@@ -307,16 +523,96 @@ class MapVisualizationService:
         }
     
     def _find_markets_in_radius(self, center_lat: float, center_lng: float, radius_km: float) -> List[Dict[str, Any]]:
-        """반경 내 상권 찾기"""
-        nearby_markets = []
+        """반경 내 상권 찾기 (공유 데이터는 수정하지 않고 복사본에 거리 추가)"""
+        markets = self.sample_market_data
+        indices, distances = self._get_spatial_index().query_radius(center_lat, center_lng, radius_km)
         
-        for market in self.sample_market_data:
-            distance = self._calculate_distance(center_lat, center_lng, market["lat"], market["lng"])
-            if distance <= radius_km:
-                market["distance_km"] = round(distance, 2)
-                nearby_markets.append(market)
+        return [
+            dict(markets[i], distance_km=round(float(distance), 2))
+            for i, distance in zip(indices, distances)
+        ]
+    
+    def _find_markets_in_walking_distance(self, center_lat: float, center_lng: float, max_km: float) -> List[Dict[str, Any]]:
+        """도보 거리 내 상권 찾기 (distance_km는 도보 거리)"""
+        markets = self.sample_market_data
+        self.walking.precompute(markets, self.dataset_version)
         
-        return nearby_markets
+        return [
+            dict(markets[i], distance_km=round(distance, 2))
+            for i, distance in self.walking.walk_distances(center_lat, center_lng, markets, max_km)
+        ]
+    
+    def _get_spatial_index(self) -> GridSpatialIndex:
+        """데이터셋 버전별 공간 인덱스 (버전이 바뀔 때만 재생성)"""
+        with self._index_lock:
+            if self._spatial_index is None or self._spatial_index_version != self.dataset_version:
+                markets = self.sample_market_data
+                self._spatial_index = GridSpatialIndex(
+                    [m["lat"] for m in markets],
+                    [m["lng"] for m in markets]
+                )
+                self._spatial_index_version = self.dataset_version
+            return self._spatial_index
+    
+    def _get_polygon_index(self):
+        """상권 폴리곤 인덱스 (DataLoader 데이터가 다시 로드될 때만 재생성)"""
+        df = self.data_loader.load_market_data()
+        with self._index_lock:
+            # 데이터 파일이 없으면 매번 새 빈 DataFrame이 반환되므로 빈 인덱스를 유지
+            stale = self._polygon_source is not df and not (df.empty and not self._polygon_markets)
+            if self._polygon_index is None or stale:
+                polygons, markets = [], []
+                if not df.empty:
+                    for row in df.itertuples(index=False):
+                        polygons.append([(c['lng'], c['lat']) for c in row.coordinates])
+                        markets.append({
+                            "market_code": str(row.market_code),
+                            "market_name": row.market_name,
+                            "market_type": row.market_type,
+                            "city_name": row.city_name,
+                            "district_name": row.district_name
+                        })
+                self._polygon_index = self.data_loader.get_polygon_index()
+                self._polygon_markets = markets
+                self._polygons = polygons
+                self._polygon_version = self._compute_dataset_version([markets, polygons])
+                self._polygon_source = df
+            return self._polygon_index, self._polygon_markets
+    
+    def _vector_tile_properties(self) -> List[Dict[str, Any]]:
+        """벡터 타일 속성 (상권 코드가 일치하면 건강 점수/등급 포함)"""
+        scores = {str(m["market_code"]): m["health_score"] for m in self.sample_market_data}
+        properties = []
+        for market in self._polygon_markets:
+            score = scores.get(market["market_code"])
+            properties.append({
+                "market_code": market["market_code"],
+                "market_name": market["market_name"],
+                "market_type": market["market_type"],
+                "district_name": market["district_name"],
+                "health_score": float(score) if score is not None else None,
+                "grade": self._get_grade_from_score(score) if score is not None else None
+            })
+        return properties
+    
+    def _get_point_clusters(self) -> PointClusterIndex:
+        """데이터셋 버전별 클러스터 계층 (버전이 바뀔 때만 재생성)"""
+        with self._index_lock:
+            if self._point_clusters is None or self._point_clusters_version != self.dataset_version:
+                markets = self.sample_market_data
+                self._point_clusters = PointClusterIndex(
+                    [m["lat"] for m in markets],
+                    [m["lng"] for m in markets],
+                    [m["health_score"] for m in markets],
+                    [m["foot_traffic"] for m in markets]
+                )
+                self._point_clusters_version = self.dataset_version
+            return self._point_clusters
+    
+    def _compute_dataset_version(self, markets: List[Dict[str, Any]]) -> str:
+        """상권 데이터 내용 기반 버전 해시"""
+        payload = json.dumps(markets, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
     
     def _generate_comprehensive_radius_analysis(self, markets: List[Dict[str, Any]], center_lat: float, center_lng: float, radius_km: float) -> Dict[str, Any]:
         """종합 반경 분석"""
@@ -372,6 +668,10 @@ class MapVisualizationService:
     def _generate_competition_radius_analysis(self, markets: List[Dict[str, Any]], center_lat: float, center_lng: float, radius_km: float) -> Dict[str, Any]:
         """경쟁도 반경 분석"""
         
+        # 상권별 반경 내 경쟁 상권 수 (거리 행렬 기반)
+        competitor_counts = self._count_competitors_within(markets, radius_km)
+        markets = [dict(m, competitors_within_radius=count) for m, count in zip(markets, competitor_counts)]
+        
         # 경쟁도별 상권 분류
         high_competition = [m for m in markets if m["competition_level"] == "high"]
         medium_competition = [m for m in markets if m["competition_level"] == "medium"]
@@ -383,17 +683,18 @@ class MapVisualizationService:
             "competition_analysis": {
                 "high_competition": {
                     "count": len(high_competition),
-                    "markets": [{"name": m["market_name"], "score": m["health_score"]} for m in high_competition]
+                    "markets": [{"name": m["market_name"], "score": m["health_score"], "competitors_within_radius": m["competitors_within_radius"]} for m in high_competition]
                 },
                 "medium_competition": {
                     "count": len(medium_competition),
-                    "markets": [{"name": m["market_name"], "score": m["health_score"]} for m in medium_competition]
+                    "markets": [{"name": m["market_name"], "score": m["health_score"], "competitors_within_radius": m["competitors_within_radius"]} for m in medium_competition]
                 },
                 "low_competition": {
                     "count": len(low_competition),
-                    "markets": [{"name": m["market_name"], "score": m["health_score"]} for m in low_competition]
+                    "markets": [{"name": m["market_name"], "score": m["health_score"], "competitors_within_radius": m["competitors_within_radius"]} for m in low_competition]
                 }
             },
+            "average_competitors_within_radius": round(sum(competitor_counts) / len(competitor_counts), 2),
             "recommendations": self._get_competition_recommendations(high_competition, medium_competition, low_competition)
         }
     
@@ -437,199 +738,135 @@ class MapVisualizationService:
             "opportunity_recommendations": self._get_opportunity_recommendations(opportunities)
         }
     
-    def _cluster_by_performance(self, markets: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """성과별 클러스터링"""
-        
-        # 성과 점수 계산 (건강 점수 + 유동인구 정규화)
-        max_traffic = max(m["foot_traffic"] for m in markets)
+    def _cluster_by_performance(self, markets: List[Dict[str, Any]], result: Dict[str, Any]) -> Dict[str, Any]:
+        """성과별 클러스터링 - 중심점 성과 점수 순으로 등급 부여"""
+        
+        # 성과 점수 계산 (건강 점수 + 유동인구 정규화) - 공유 데이터 대신 복사본에 기록
+        max_traffic = max((m["foot_traffic"] for m in markets), default=0) or 1
+        scored = [
+            dict(m, performance_score=round(m["health_score"] * 0.7 + (m["foot_traffic"] / max_traffic) * 100 * 0.3, 2))
+            for m in markets
+        ]
         
-        for market in markets:
-            performance_score = market["health_score"] * 0.7 + (market["foot_traffic"] / max_traffic) * 100 * 0.3
-            market["performance_score"] = round(performance_score, 2)
+        members = self._group_by_label(scored, result["labels"])
+        order = sorted(members, key=lambda label: -np.mean([m["performance_score"] for m in members[label]]))
+        if len(order) == 3:
+            names = ["high_performance", "medium_performance", "low_performance"]
+        else:
+            names = [f"performance_tier_{rank + 1}" for rank in range(len(order))]
+        descriptions = {
+            "high_performance": "높은 건강 점수와 유동인구를 보유한 우수 상권",
+            "medium_performance": "보통 수준의 성과를 보이는 상권",
+            "low_performance": "개선이 필요한 상권"
+        }
         
-        # 클러스터 분류
-        high_performance = [m for m in markets if m["performance_score"] >= 80]
-        medium_performance = [m for m in markets if 60 <= m["performance_score"] < 80]
-        low_performance = [m for m in markets if m["performance_score"] < 60]
+        clusters = {}
+        for name, label in zip(names, order):
+            clusters[name] = {
+                "count": len(members[label]),
+                "markets": members[label],
+                "centroid": self._describe_centroid("performance", result["centroids"][label]),
+                "characteristics": descriptions.get(name, f"성과 {names.index(name) + 1}순위 그룹")
+            }
         
+        top = members[order[0]] if order else []
+        bottom = members[order[-1]] if len(order) > 1 else []
         return {
             "cluster_type": "performance",
             "total_markets": len(markets),
-            "clusters": {
-                "high_performance": {
-                    "count": len(high_performance),
-                    "markets": high_performance,
-                    "characteristics": "높은 건강 점수와 유동인구를 보유한 우수 상권"
-                },
-                "medium_performance": {
-                    "count": len(medium_performance),
-                    "markets": medium_performance,
-                    "characteristics": "보통 수준의 성과를 보이는 상권"
-                },
-                "low_performance": {
-                    "count": len(low_performance),
-                    "markets": low_performance,
-                    "characteristics": "개선이 필요한 상권"
-                }
-            },
-            "cluster_insights": self._get_performance_cluster_insights(high_performance, medium_performance, low_performance)
+            "clusters": clusters,
+            "cluster_insights": self._get_performance_cluster_insights(top, [], bottom)
         }
     
-    def _cluster_by_characteristics(self, markets: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """특성별 클러스터링"""
-        
-        # 특성별 클러스터
-        clusters = {
-            "high_traffic_low_competition": [],
-            "high_growth_potential": [],
-            "stable_markets": [],
-            "emerging_markets": []
-        }
-        
-        for market in markets:
-            # 높은 유동인구 + 낮은 경쟁도
-            if market["foot_traffic"] > 150000 and market["competition_level"] == "low":
-                clusters["high_traffic_low_competition"].append(market)
-            
-            # 높은 성장 잠재력
-            if market["growth_potential"] > 80:
-                clusters["high_growth_potential"].append(market)
-            
-            # 안정적인 상권 (건강 점수 70-80)
-            if 70 <= market["health_score"] <= 80:
-                clusters["stable_markets"].append(market)
-            
-            # 신흥 상권 (낮은 경쟁도 + 중간 성장 잠재력)
-            if market["competition_level"] == "low" and 60 <= market["growth_potential"] <= 80:
-                clusters["emerging_markets"].append(market)
+    def _cluster_by_characteristics(self, markets: List[Dict[str, Any]], result: Dict[str, Any]) -> Dict[str, Any]:
+        """특성별 클러스터링 - 표준화 중심점으로 클러스터 이름 결정"""
+        
+        members = self._group_by_label(markets, result["labels"])
+        clusters, profiles = {}, {}
+        for label, scaled in result["scaled_centroids"].items():
+            traffic, competition, growth, health = scaled
+            if traffic > 0 and competition < 0:
+                name = "high_traffic_low_competition"
+            elif growth > 0 and growth >= max(traffic, health):
+                name = "high_growth_potential"
+            elif competition <= 0 and growth >= 0:
+                name = "emerging_markets"
+            else:
+                name = "stable_markets"
+            name = self._unique_cluster_name(name, clusters)
+            clusters[name] = members[label]
+            profiles[name] = {
+                "count": len(members[label]),
+                "centroid": self._describe_centroid("characteristics", result["centroids"][label])
+            }
         
         return {
             "cluster_type": "characteristics",
             "total_markets": len(markets),
             "clusters": clusters,
+            "cluster_profiles": profiles,
             "cluster_analysis": self._analyze_characteristic_clusters(clusters)
         }
     
-    def _cluster_by_growth_stage(self, markets: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """성장 단계별 클러스터링"""
-        
-        clusters = {
-            "growth": [],      # 성장기
-            "mature": [],      # 성숙기
-            "decline": [],     # 쇠퇴기
-            "emerging": []     # 신흥기
-        }
-        
-        for market in markets:
-            if market["growth_potential"] > 80 and market["health_score"] > 75:
-                clusters["growth"].append(market)
-            elif market["health_score"] > 70 and market["competition_level"] in ["medium", "high"]:
-                clusters["mature"].append(market)
-            elif market["health_score"] < 60:
-                clusters["decline"].append(market)
+    def _cluster_by_growth_stage(self, markets: List[Dict[str, Any]], result: Dict[str, Any]) -> Dict[str, Any]:
+        """성장 단계별 클러스터링 - 표준화 중심점으로 성장 단계 결정"""
+        
+        members = self._group_by_label(markets, result["labels"])
+        clusters, profiles = {}, {}
+        for label, scaled in result["scaled_centroids"].items():
+            growth, health, competition = scaled
+            if growth > 0 and health > 0:
+                name = "growth"       # 성장기
+            elif health > 0:
+                name = "mature"       # 성숙기
+            elif growth <= 0:
+                name = "decline"      # 쇠퇴기
             else:
-                clusters["emerging"].append(market)
+                name = "emerging"     # 신흥기
+            name = self._unique_cluster_name(name, clusters)
+            clusters[name] = members[label]
+            profiles[name] = {
+                "count": len(members[label]),
+                "centroid": self._describe_centroid("growth_stage", result["centroids"][label])
+            }
         
         return {
             "cluster_type": "growth_stage",
             "total_markets": len(markets),
             "clusters": clusters,
+            "cluster_profiles": profiles,
             "growth_recommendations": self._get_growth_stage_recommendations(clusters)
         }
     
-    def _generate_traffic_flow_data(self, market_code: str, time_period: str) -> List[Dict[str, Any]]:
-        """유동인구 흐름 데이터 생성"""
-        
-        # 시간대별 샘플 데이터 생성
-        if time_period == "daily":
-            hours = list(range(24))
-            base_traffic = 1000
-        elif time_period == "weekly":
-            hours = ["월", "화", "수", "목", "금", "토", "일"]
-            base_traffic = 5000
-        else:
-            hours = list(range(24))
-            base_traffic = 1000
-        
-        traffic_data = []
-        for i, hour in enumerate(hours):
-            # 시간대별 패턴 생성
-            if time_period == "daily":
-                if 7 <= hour <= 9:  # 출근 시간
-                    traffic = base_traffic * 1.5
-                elif 12 <= hour <= 14:  # 점심 시간
-                    traffic = base_traffic * 2.0
-                elif 18 <= hour <= 20:  # 퇴근 시간
-                    traffic = base_traffic * 1.8
-                elif 21 <= hour <= 23:  # 저녁 시간
-                    traffic = base_traffic * 1.2
-                else:
-                    traffic = base_traffic * 0.5
-            else:  # 주간 패턴
-                if hour in ["월", "화", "수", "목", "금"]:
-                    traffic = base_traffic * 1.0
-                elif hour == "토":
-                    traffic = base_traffic * 1.3
-                else:  # 일요일
-                    traffic = base_traffic * 0.8
-            
-            traffic_data.append({
-                "time": hour,
-                "traffic": int(traffic),
-                "direction": "inbound" if i % 2 == 0 else "outbound"
-            })
-        
-        return traffic_data
-    
-    def _identify_peak_hours(self, traffic_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """피크 시간 식별"""
-        
-        # 유동인구가 높은 시간대 찾기
-        sorted_traffic = sorted(traffic_data, key=lambda x: x["traffic"], reverse=True)
-        peak_hours = sorted_traffic[:3]
-        
-        return [
-            {
-                "time": hour["time"],
-                "traffic": hour["traffic"],
-                "peak_type": "morning" if isinstance(hour["time"], int) and 6 <= hour["time"] <= 10 else "afternoon" if isinstance(hour["time"], int) and 12 <= hour["time"] <= 16 else "evening"
-            }
-            for hour in peak_hours
-        ]
+    def _group_by_label(self, markets: List[Dict[str, Any]], labels: np.ndarray) -> Dict[int, List[Dict[str, Any]]]:
+        """클러스터 레이블별 상권 목록 (잡음 레이블 -1 제외)"""
+        members: Dict[int, List[Dict[str, Any]]] = {}
+        for market, label in zip(markets, labels):
+            if label >= 0:
+                members.setdefault(int(label), []).append(market)
+        return members
     
-    def _analyze_flow_patterns(self, traffic_data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """흐름 패턴 분석"""
-        
-        inbound_traffic = sum(h["traffic"] for h in traffic_data if h["direction"] == "inbound")
-        outbound_traffic = sum(h["traffic"] for h in traffic_data if h["direction"] == "outbound")
-        
-        return {
-            "inbound_traffic": inbound_traffic,
-            "outbound_traffic": outbound_traffic,
-            "net_flow": inbound_traffic - outbound_traffic,
-            "flow_balance": "positive" if inbound_traffic > outbound_traffic else "negative",
-            "peak_inbound_time": max([h for h in traffic_data if h["direction"] == "inbound"], key=lambda x: x["traffic"])["time"],
-            "peak_outbound_time": max([h for h in traffic_data if h["direction"] == "outbound"], key=lambda x: x["traffic"])["time"]
-        }
+    def _describe_centroid(self, cluster_type: str, centroid: np.ndarray) -> Dict[str, float]:
+        """원 단위 중심점 (유동인구는 로그 역변환)"""
+        described = {}
+        for name, value in zip(FEATURE_SETS[cluster_type], centroid):
+            if name == "log_foot_traffic":
+                described["foot_traffic"] = round(float(np.expm1(value)))
+            else:
+                described[name] = round(float(value), 2)
+        return described
     
-    def _get_traffic_recommendations(self, traffic_data: List[Dict[str, Any]]) -> List[str]:
-        """유동인구 기반 추천사항"""
-        
-        peak_hours = self._identify_peak_hours(traffic_data)
-        recommendations = []
-        
-        for peak in peak_hours:
-            if peak["peak_type"] == "morning":
-                recommendations.append("아침 시간대 유동인구가 높으므로 조식 메뉴나 커피 서비스를 고려하세요.")
-            elif peak["peak_type"] == "afternoon":
-                recommendations.append("오후 시간대 유동인구가 높으므로 점심 메뉴나 쇼핑 서비스를 강화하세요.")
-            elif peak["peak_type"] == "evening":
-                recommendations.append("저녁 시간대 유동인구가 높으므로 저녁 메뉴나 엔터테인먼트 서비스를 고려하세요.")
-        
-        return recommendations
+    def _unique_cluster_name(self, name: str, clusters: Dict[str, Any]) -> str:
+        """같은 이름의 클러스터가 있으면 번호를 붙임"""
+        if name not in clusters:
+            return name
+        suffix = 2
+        while f"{name}_{suffix}" in clusters:
+            suffix += 1
+        return f"{name}_{suffix}"
     
-    def _analyze_transportation(self, market_info: Dict[str, Any]) -> Dict[str, Any]:
-        """교통편 분석"""
+    def _analyze_transportation(self, market_info: Dict[str, Any], facilities: Dict[str, Any] = None) -> Dict[str, Any]:
+        """교통편 분석 (시설 데이터가 있는 유형은 실측 거리 기반, 없으면 샘플 값)"""
         
         # 샘플 교통편 데이터
         transportation = {
@@ -637,31 +874,95 @@ class MapVisualizationService:
                 "available": True,
                 "stations": ["대전역", "중앙로역"],
                 "walking_time": "5분",
-                "frequency": "3-5분"
+                "frequency": "3-5분",
+                "is_sample": True
             },
             "bus": {
                 "available": True,
                 "routes": ["101", "102", "201", "202"],
                 "walking_time": "2분",
-                "frequency": "5-10분"
+                "frequency": "5-10분",
+                "is_sample": True
             },
             "taxi": {
                 "available": True,
                 "waiting_time": "2-5분",
-                "accessibility": "high"
+                "accessibility": "high",
+                "is_sample": True
             },
             "parking": {
                 "available": True,
                 "capacity": 200,
                 "cost": "시간당 1,000원",
-                "accessibility": "medium"
+                "accessibility": "medium",
+                "is_sample": True
             }
         }
         
+        facilities = facilities or {}
+        if "subway" in facilities:
+            subway = facilities["subway"]
+            transportation["subway"] = {
+                "available": subway["available"],
+                "stations": subway["facilities"] or [subway["nearest"]["name"]],
+                "nearest_station": subway["nearest"]["name"],
+                "distance_m": subway["nearest"]["distance_m"],
+                "walking_time": f"{subway['nearest']['walking_minutes']}분",
+                "counts_within": subway["counts_within"],
+                "score": subway["score"],
+                "is_sample": False
+            }
+        if "bus" in facilities:
+            bus = facilities["bus"]
+            transportation["bus"] = {
+                "available": bus["available"],
+                "stops": bus["facilities"] or [bus["nearest"]["name"]],
+                "nearest_stop": bus["nearest"]["name"],
+                "distance_m": bus["nearest"]["distance_m"],
+                "walking_time": f"{bus['nearest']['walking_minutes']}분",
+                "counts_within": bus["counts_within"],
+                "score": bus["score"],
+                "is_sample": False
+            }
+        if "parking" in facilities:
+            lots = facilities["parking"]
+            transportation["parking"] = {
+                "available": lots["available"],
+                "nearest_lot": lots["nearest"]["name"],
+                "distance_m": lots["nearest"]["distance_m"],
+                "capacity": lots.get("total_capacity", 0),
+                "is_sample": False
+            }
+        
         return transportation
     
-    def _analyze_parking(self, market_info: Dict[str, Any]) -> Dict[str, Any]:
-        """주차 시설 분석"""
+    def _accessibility_data_sources(self, facilities: Dict[str, Any]) -> Dict[str, str]:
+        """항목별 데이터 출처 (시설 데이터가 없는 항목은 "sample")"""
+        sources = {
+            facility_type: "transit_stops.csv" if facility_type in facilities else "sample"
+            for facility_type in ("subway", "bus", "parking")
+        }
+        sources["taxi"] = "sample"
+        sources["pedestrian"] = "sample"
+        return sources
+    
+    def _analyze_parking(self, market_info: Dict[str, Any], facilities: Dict[str, Any] = None) -> Dict[str, Any]:
+        """주차 시설 분석 (주차장 데이터가 있으면 실측 거리 기반, 없으면 샘플 값)"""
+        
+        if facilities and "parking" in facilities:
+            lots = facilities["parking"]
+            return {
+                "nearby_parking": {
+                    "available": lots["available"],
+                    "lots": lots["facilities"],
+                    "nearest_lot": lots["nearest"]["name"],
+                    "distance_m": lots["nearest"]["distance_m"],
+                    "counts_within": lots["counts_within"],
+                    "total_capacity": lots.get("total_capacity", 0)
+                },
+                "accessibility_score": lots["score"],
+                "is_sample": False
+            }
         
         parking = {
             "public_parking": {
@@ -680,13 +981,14 @@ class MapVisualizationService:
                 "available": False,
                 "reason": "주차 금지 구역"
             },
-            "accessibility_score": 75
+            "accessibility_score": 75,
+            "is_sample": True
         }
         
         return parking
     
     def _analyze_pedestrian_access(self, market_info: Dict[str, Any]) -> Dict[str, Any]:
-        """보행자 접근성 분석"""
+        """보행자 접근성 분석 (보행 시설 데이터가 없어 샘플 값)"""
         
         pedestrian = {
             "sidewalks": {
@@ -709,7 +1011,8 @@ class MapVisualizationService:
                 "elevator_available": True,
                 "ramp_available": True
             },
-            "accessibility_score": 85
+            "accessibility_score": 85,
+            "is_sample": True
         }
         
         return pedestrian
@@ -724,9 +1027,15 @@ class MapVisualizationService:
             "pedestrian": 0.3
         }
         
-        # 교통편 점수
-        transport_score = 80 if transportation["subway"]["available"] else 60
-        if transportation["bus"]["available"]:
+        # 교통편 점수 (실측 점수가 있으면 지하철 최대 80점, 버스 최대 10점으로 환산)
+        subway, bus = transportation["subway"], transportation["bus"]
+        if "score" in subway:
+            transport_score = subway["score"] * 0.8
+        else:
+            transport_score = 80 if subway["available"] else 60
+        if "score" in bus:
+            transport_score += bus["score"] * 0.1
+        elif bus["available"]:
             transport_score += 10
         
         # 주차 점수
@@ -764,11 +1073,28 @@ class MapVisualizationService:
         return improvements
     
     # 헬퍼 메서드들
-    def _get_markets_by_region(self, region: str = None) -> List[Dict[str, Any]]:
-        """지역별 상권 조회"""
+    def _get_markets_by_region(self, region: str = None, bbox: Tuple[float, float, float, float] = None,
+                               zoom: int = None) -> List[Dict[str, Any]]:
+        """지역별 상권 조회 (bbox는 공간 인덱스로 조회, 줌별 상한 초과 시 건강 점수 상위 상권만)"""
+        markets = self.sample_market_data
+        return [markets[i] for i in self._select_market_indices(region, bbox, zoom)]
+    
+    def _select_market_indices(self, region: str = None, bbox: Tuple[float, float, float, float] = None,
+                               zoom: int = None) -> np.ndarray:
+        """조건에 맞는 상권 인덱스 (원래 순서)"""
+        markets = self.sample_market_data
+        if bbox:
+            indices = self._get_spatial_index().query_bbox(*bbox)
+        else:
+            indices = np.arange(len(markets), dtype=np.int64)
         if region:
-            return [m for m in self.sample_market_data if region in m["region"]]
-        return self.sample_market_data
+            indices = np.array([i for i in indices if region in markets[i]["region"]], dtype=np.int64)
+        
+        cap = market_cap_for_zoom(zoom)
+        if cap is not None and len(indices) > cap:
+            scores = np.array([markets[i]["health_score"] for i in indices], dtype=np.float64)
+            indices = indices[np.sort(np.argpartition(-scores, cap - 1)[:cap])]
+        return indices
     
     def _get_market_info(self, market_code: str) -> Optional[Dict[str, Any]]:
         """상권 정보 조회"""
@@ -779,15 +1105,42 @@ class MapVisualizationService:
     
     def _calculate_distance(self, lat1: float, lng1: float, lat2: float, lng2: float) -> float:
         """두 지점 간 거리 계산 (km)"""
-        R = 6371  # 지구 반지름 (km)
-        
-        dlat = math.radians(lat2 - lat1)
-        dlng = math.radians(lng2 - lng1)
-        
-        a = math.sin(dlat/2) * math.sin(dlat/2) + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlng/2) * math.sin(dlng/2)
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+        return float(haversine_km(lat1, lng1, lat2, lng2))
+    
+    def _get_market_distance_matrix(self) -> Optional[np.ndarray]:
+        """전체 상권 쌍 거리 행렬 (데이터셋 버전별 캐시, 상권 수가 많으면 None)"""
+        markets = self.sample_market_data
+        if len(markets) > MAX_CACHED_MATRIX_MARKETS:
+            return None
+        
+        with self._index_lock:
+            if self._distance_matrix is None or self._distance_matrix_version != self.dataset_version:
+                self._distance_matrix = distance_matrix_km(
+                    [m["lat"] for m in markets],
+                    [m["lng"] for m in markets],
+                    dtype=np.float32
+                )
+                self._distance_matrix_version = self.dataset_version
+            return self._distance_matrix
+    
+    def _count_competitors_within(self, markets: List[Dict[str, Any]], radius_km: float) -> List[int]:
+        """각 상권 반경 내 다른 상권 수"""
+        if not markets:
+            return []
+        
+        matrix = self._get_market_distance_matrix()
+        if matrix is not None:
+            positions = {m["market_code"]: i for i, m in enumerate(self.sample_market_data)}
+            rows = np.array([positions[m["market_code"]] for m in markets])
+            within = matrix[rows] <= radius_km
+        else:
+            within = distance_matrix_km(
+                [m["lat"] for m in markets], [m["lng"] for m in markets],
+                [m["lat"] for m in self.sample_market_data], [m["lng"] for m in self.sample_market_data]
+            ) <= radius_km
         
-        return R * c
+        # 자기 자신 제외
+        return [int(count) - 1 for count in within.sum(axis=1)]
     
     def _get_grade_from_score(self, score: float) -> str:
         """점수에서 등급 변환"""
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+상권 포인트 클러스터 인덱스
+줌 레벨마다 화면 픽셀 반경 크기의 격자로 하위 레벨 클러스터를 병합(supercluster 방식)하여
+상권 수, 평균 건강 점수, 유동인구 합계를 집계한 계층을 사전 생성
+"""
+import math
+from typing import Dict, List, Any, Tuple
+import numpy as np
+from services.geo_utils import lnglat_to_world, world_to_lnglat, EARTH_RADIUS_KM
+from services.spatial_index import GridSpatialIndex
+
+TILE_SIZE = 256
+
+
+class PointClusterIndex:
+    """줌별 격자 병합 클러스터 계층 (데이터셋 버전당 1회 생성)"""
+
+    def __init__(self, lats, lngs, health_scores, foot_traffic,
+                 radius_px: float = 60, min_zoom: int = 0, max_zoom: int = 16):
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.radius_px = radius_px
+
+        x, y = lnglat_to_world(lats, lngs)
+        size = len(x)
+        # max_zoom + 1 레벨은 개별 상권
+        level = {
+            "x": x,
+            "y": y,
+            "count": np.ones(size, dtype=np.int64),
+            "health_sum": np.asarray(health_scores, dtype=np.float64),
+            "traffic_sum": np.asarray(foot_traffic, dtype=np.int64),
+            "member": np.arange(size, dtype=np.int64),
+            "expansion_zoom": np.full(size, -1, dtype=np.int64)
+        }
+        self._levels: Dict[int, Dict[str, np.ndarray]] = {max_zoom + 1: level}
+        self._level_indexes: Dict[int, GridSpatialIndex] = {}
+
+        for z in range(max_zoom, min_zoom - 1, -1):
+            level = self._merge(level, z)
+            self._levels[z] = level
+
+    def get_clusters(self, zoom: int, bbox: Tuple[float, float, float, float] = None) -> List[Dict[str, Any]]:
+        """줌/화면 범위의 클러스터 목록 (단일 상권은 member에 상권 인덱스)"""
+        zoom = max(self.min_zoom, min(int(zoom), self.max_zoom + 1))
+        level = self._levels[zoom]
+        if bbox:
+            indices = self._get_level_index(zoom).query_bbox(*bbox)
+        else:
+            indices = np.arange(len(level["x"]))
+
+        lats, lngs = world_to_lnglat(level["x"][indices], level["y"][indices])
+        counts = level["count"][indices]
+        return [
+            {
+                "lat": float(lat),
+                "lng": float(lng),
+                "count": int(count),
+                "mean_health_score": round(float(health_sum) / int(count), 2),
+                "total_foot_traffic": int(traffic_sum),
+                "member": int(member),
+                "expansion_zoom": int(expansion_zoom),
+                "cluster_id": f"{zoom}-{int(i)}"
+            }
+            for i, lat, lng, count, health_sum, traffic_sum, member, expansion_zoom in zip(
+                indices, lats, lngs, counts,
+                level["health_sum"][indices], level["traffic_sum"][indices],
+                level["member"][indices], level["expansion_zoom"][indices]
+            )
+        ]
+
+    def _merge(self, child: Dict[str, np.ndarray], z: int) -> Dict[str, np.ndarray]:
+        """하위 레벨을 반경 크기 격자로 병합 (상권 수 가중 중심점)"""
+        radius = self.radius_px / (TILE_SIZE * (1 << z))
+        cells = np.stack([np.floor(child["x"] / radius), np.floor(child["y"] / radius)], axis=1)
+        if not len(cells):
+            return {key: values[:0] for key, values in child.items()}
+        _, first, inverse = np.unique(cells, axis=0, return_index=True, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        weights = child["count"]
+
+        count = np.bincount(inverse, weights=weights).astype(np.int64)
+        children = np.bincount(inverse)
+        # 자식이 하나뿐이면 자식과 동일한 클러스터이므로 확장 줌을 그대로 물려받음
+        expansion_zoom = np.where(children > 1, z + 1, child["expansion_zoom"][first])
+        return {
+            "x": np.bincount(inverse, weights=child["x"] * weights) / count,
+            "y": np.bincount(inverse, weights=child["y"] * weights) / count,
+            "count": count,
+            "health_sum": np.bincount(inverse, weights=child["health_sum"]),
+            "traffic_sum": np.bincount(inverse, weights=child["traffic_sum"]).astype(np.int64),
+            "member": np.where(count == 1, child["member"][first], -1),
+            "expansion_zoom": expansion_zoom
+        }
+
+    def _get_level_index(self, zoom: int) -> GridSpatialIndex:
+        """레벨별 bbox 조회용 격자 인덱스 (최초 조회 시 생성)"""
+        index = self._level_indexes.get(zoom)
+        if index is None:
+            level = self._levels[zoom]
+            lats, lngs = world_to_lnglat(level["x"], level["y"])
+            # 격자 크기: 해당 줌의 타일 폭 (km)
+            tile_km = 2 * math.pi * EARTH_RADIUS_KM / (1 << zoom)
+            index = GridSpatialIndex(lats, lngs, cell_size_km=max(tile_km, 0.05))
+            self._level_indexes[zoom] = index
+        return index
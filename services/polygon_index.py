@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+상권 폴리곤 인덱스
+경계 상자 격자 사전 필터 + numpy 벡터화 광선 투사(ray casting)로
+좌표가 속한 상권을 조회
+"""
+import math
+from typing import Dict, List, Tuple, Sequence
+import numpy as np
+
+
+class PolygonIndex:
+    """폴리곤 포함 여부 조회 인덱스 (데이터셋 로드당 1회 생성)"""
+
+    def __init__(self, polygons: Sequence[Sequence[Tuple[float, float]]], cell_size_deg: float = None):
+        """polygons: 폴리곤별 (lng, lat) 꼭짓점 목록"""
+        rings = [np.asarray(p, dtype=np.float64).reshape(-1, 2) for p in polygons]
+        self.size = len(rings)
+
+        # 꼭짓점을 한 배열에 이어 붙이고 폴리곤별 구간(offsets)만 보관
+        lengths = np.array([len(r) for r in rings], dtype=np.int64)
+        self._offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        vertices = np.concatenate(rings) if self.size and lengths.sum() else np.empty((0, 2))
+        self._xs = vertices[:, 0]
+        self._ys = vertices[:, 1]
+
+        # 폴리곤별 경계 상자와 면적 (꼭짓점 3개 미만은 무효 처리)
+        self.valid = lengths >= 3
+        self.bbox = np.full((self.size, 4), np.nan)
+        self.area = np.zeros(self.size)
+        for i in np.flatnonzero(self.valid):
+            x, y = self._edges_of(i)[:2]
+            self.bbox[i] = (x.min(), y.min(), x.max(), y.max())
+            self.area[i] = abs(float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))) / 2
+
+        # 격자 크기: 지정하지 않으면 경계 상자 크기의 중앙값
+        valid_boxes = self.bbox[self.valid]
+        if cell_size_deg is None:
+            if len(valid_boxes):
+                spans = np.maximum(valid_boxes[:, 2] - valid_boxes[:, 0], valid_boxes[:, 3] - valid_boxes[:, 1])
+                cell_size_deg = float(np.median(spans))
+            cell_size_deg = cell_size_deg or 0.01
+        self.cell_size_deg = cell_size_deg
+
+        self._cells: Dict[Tuple[int, int], np.ndarray] = {}
+        buckets: Dict[Tuple[int, int], List[int]] = {}
+        for i in np.flatnonzero(self.valid):
+            min_x, min_y, max_x, max_y = self.bbox[i]
+            for cx in range(self._cell(min_x), self._cell(max_x) + 1):
+                for cy in range(self._cell(min_y), self._cell(max_y) + 1):
+                    buckets.setdefault((cx, cy), []).append(int(i))
+        for key, indices in buckets.items():
+            self._cells[key] = np.array(indices, dtype=np.int64)
+
+    def locate(self, lat: float, lng: float) -> List[int]:
+        """좌표를 포함하는 폴리곤 인덱스 목록 (면적 오름차순 - 가장 좁은 상권이 먼저)"""
+        candidates = self._cells.get((self._cell(lng), self._cell(lat)))
+        if candidates is None:
+            return []
+
+        boxes = self.bbox[candidates]
+        in_box = (boxes[:, 0] <= lng) & (lng <= boxes[:, 2]) & (boxes[:, 1] <= lat) & (lat <= boxes[:, 3])
+        matches = [
+            int(i) for i in candidates[in_box]
+            if self._contains(i, np.array([lng]), np.array([lat]))[0]
+        ]
+        return sorted(matches, key=lambda i: self.area[i])
+
+    def query_bbox(self, min_lng: float, min_lat: float, max_lng: float, max_lat: float) -> np.ndarray:
+        """경계 상자와 겹치는 폴리곤 인덱스 (원래 순서)"""
+        min_cx, max_cx = self._cell(min_lng), self._cell(max_lng)
+        min_cy, max_cy = self._cell(min_lat), self._cell(max_lat)
+        # 범위가 전체 셀 수보다 크면 셀 목록을 직접 순회
+        if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) > len(self._cells):
+            groups = [
+                indices for (x, y), indices in self._cells.items()
+                if min_cx <= x <= max_cx and min_cy <= y <= max_cy
+            ]
+        else:
+            groups = [
+                self._cells[(x, y)]
+                for x in range(min_cx, max_cx + 1)
+                for y in range(min_cy, max_cy + 1)
+                if (x, y) in self._cells
+            ]
+        if not groups:
+            return np.array([], dtype=np.int64)
+
+        candidates = np.unique(np.concatenate(groups))
+        boxes = self.bbox[candidates]
+        overlaps = (boxes[:, 2] >= min_lng) & (boxes[:, 0] <= max_lng) & (boxes[:, 3] >= min_lat) & (boxes[:, 1] <= max_lat)
+        return candidates[overlaps]
+
+    def locate_many(self, lats, lngs) -> np.ndarray:
+        """좌표 배열별 포함 폴리곤 인덱스 (면적이 가장 작은 폴리곤, 없으면 -1)"""
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        result = np.full(len(lats), -1, dtype=np.int64)
+        if not len(lats) or not self._cells:
+            return result
+
+        # 좌표별 후보 폴리곤을 (좌표, 폴리곤) 쌍으로 펼친 뒤 경계 상자로 거름
+        cx = np.floor(lngs / self.cell_size_deg).astype(np.int64)
+        cy = np.floor(lats / self.cell_size_deg).astype(np.int64)
+        empty = np.empty(0, dtype=np.int64)
+        candidates = [self._cells.get((x, y), empty) for x, y in zip(cx.tolist(), cy.tolist())]
+        counts = np.array([len(c) for c in candidates], dtype=np.int64)
+        if not counts.sum():
+            return result
+        pair_points = np.repeat(np.arange(len(lats)), counts)
+        pair_polygons = np.concatenate(candidates)
+
+        boxes = self.bbox[pair_polygons]
+        px, py = lngs[pair_points], lats[pair_points]
+        in_box = (boxes[:, 0] <= px) & (px <= boxes[:, 2]) & (boxes[:, 1] <= py) & (py <= boxes[:, 3])
+        pair_points, pair_polygons = pair_points[in_box], pair_polygons[in_box]
+
+        # 폴리곤별로 한 번씩 판정
+        order = np.argsort(pair_polygons, kind='stable')
+        pair_points, pair_polygons = pair_points[order], pair_polygons[order]
+        boundaries = np.flatnonzero(np.diff(pair_polygons)) + 1
+        inside = np.zeros(len(pair_points), dtype=bool)
+        for start, stop in zip(np.concatenate([[0], boundaries]), np.concatenate([boundaries, [len(pair_points)]])):
+            if start == stop:
+                continue
+            points = pair_points[start:stop]
+            inside[start:stop] = self._contains(int(pair_polygons[start]), lngs[points], lats[points])
+
+        # 여러 폴리곤에 속하면 면적이 가장 작은 폴리곤 선택
+        pair_points, pair_polygons = pair_points[inside], pair_polygons[inside]
+        order = np.lexsort((-self.area[pair_polygons], pair_points))
+        result[pair_points[order]] = pair_polygons[order]
+        return result
+
+    def _contains(self, i: int, px: np.ndarray, py: np.ndarray) -> np.ndarray:
+        """좌표 × 변 브로드캐스트 광선 투사 판정"""
+        x1, y1, x2, y2 = (v[None, :] for v in self._edges_of(i))
+        px, py = px[:, None], py[:, None]
+        straddles = (y1 > py) != (y2 > py)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_cross = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+        crossings = np.count_nonzero(straddles & (px < x_cross), axis=1)
+        return (crossings % 2) == 1
+
+    def _edges_of(self, i: int):
+        start, stop = self._offsets[i], self._offsets[i + 1]
+        x, y = self._xs[start:stop], self._ys[start:stop]
+        return x, y, np.roll(x, -1), np.roll(y, -1)
+
+    def _cell(self, value: float) -> int:
+        return int(math.floor(value / self.cell_size_deg))
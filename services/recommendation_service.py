@@ -3,12 +3,20 @@
 추천 알고리즘 서비스
 사용자 프로필과 선호도를 기반으로 한 개인화된 추천
 """
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from services.data_loader import DataLoader
 from services.scoring_service import ScoringService
+import heapq
+import itertools
 import random
 import math
 
+# 리스크 허용도/자본 능력/기술 수준 단계 (프로필 조합 3 × 3 × 3)
+PROFILE_LEVELS = ("LOW", "MEDIUM", "HIGH")
+
+# 매칭 테이블 항목 - (이름, 기본 매칭 점수, 추천 이유)
+MatchEntry = Tuple[str, float, Tuple[str, ...]]
+
 class RecommendationService:
     def __init__(self):
         self.data_loader = DataLoader()
@@ -136,6 +144,39 @@ class RecommendationService:
                 "business_environment": "STABLE"
             }
         }
+        
+        # 프로필 조합별 매칭 점수/추천 이유 사전 계산 (요청 시에는 선호 보너스만 적용)
+        self._industry_match_table = {
+            profile: self._score_industries(*profile)
+            for profile in itertools.product(PROFILE_LEVELS, repeat=3)
+        }
+        self._region_match_table = {
+            capital_capacity: self._score_regions(capital_capacity) for capital_capacity in PROFILE_LEVELS
+        }
+    
+    def _score_industries(self, risk_tolerance: str, capital_capacity: str, skill_level: str) -> List[MatchEntry]:
+        """프로필 1개에 대한 전체 업종 매칭 점수와 추천 이유"""
+        return [
+            (
+                industry,
+                self._calculate_industry_match_score(characteristics, risk_tolerance, capital_capacity, skill_level),
+                tuple(self._get_industry_recommendation_reasons(
+                    characteristics, risk_tolerance, capital_capacity, skill_level
+                ))
+            )
+            for industry, characteristics in self.industry_characteristics.items()
+        ]
+    
+    def _score_regions(self, capital_capacity: str) -> List[MatchEntry]:
+        """자본 능력 1개에 대한 전체 지역 매칭 점수와 추천 이유"""
+        return [
+            (
+                region,
+                self._calculate_region_match_score(characteristics, capital_capacity),
+                tuple(self._get_region_recommendation_reasons(characteristics, capital_capacity))
+            )
+            for region, characteristics in self.region_characteristics.items()
+        ]
     
     def get_personalized_recommendations(self, user_profile: Dict[str, Any]) -> Dict[str, Any]:
         """개인화된 추천 생성"""
@@ -242,12 +283,11 @@ class RecommendationService:
         
         recommendations = []
         
-        for industry, characteristics in self.industry_characteristics.items():
-            # 매칭 점수 계산
-            match_score = self._calculate_industry_match_score(
-                characteristics, risk_tolerance, capital_capacity, skill_level
-            )
-            
+        # 사전 계산된 매칭 점수 조회 (테이블에 없는 프로필은 즉시 계산)
+        profile = (risk_tolerance, capital_capacity, skill_level)
+        entries = self._industry_match_table.get(profile) or self._score_industries(*profile)
+        
+        for industry, match_score, reasons in entries:
             # 선호 업종 보너스
             if industry in preferred_industries:
                 match_score += 20
@@ -255,10 +295,8 @@ class RecommendationService:
             recommendations.append({
                 "industry": industry,
                 "match_score": round(match_score, 1),
-                "characteristics": characteristics,
-                "reasons": self._get_industry_recommendation_reasons(
-                    characteristics, risk_tolerance, capital_capacity, skill_level
-                )
+                "characteristics": self.industry_characteristics[industry],
+                "reasons": list(reasons)
             })
         
         # 점수 순으로 정렬
@@ -334,12 +372,10 @@ class RecommendationService:
         
         recommendations = []
         
-        for region, characteristics in self.region_characteristics.items():
-            # 매칭 점수 계산
-            match_score = self._calculate_region_match_score(
-                characteristics, capital_capacity
-            )
-            
+        # 사전 계산된 매칭 점수 조회 (테이블에 없는 자본 능력은 즉시 계산)
+        entries = self._region_match_table.get(capital_capacity) or self._score_regions(capital_capacity)
+        
+        for region, match_score, reasons in entries:
             # 선호 지역 보너스
             if region in preferred_regions:
                 match_score += 20
@@ -347,10 +383,8 @@ class RecommendationService:
             recommendations.append({
                 "region": region,
                 "match_score": round(match_score, 1),
-                "characteristics": characteristics,
-                "reasons": self._get_region_recommendation_reasons(
-                    characteristics, capital_capacity
-                )
+                "characteristics": self.region_characteristics[region],
+                "reasons": list(reasons)
             })
         
         # 점수 순으로 정렬
@@ -409,38 +443,62 @@ class RecommendationService:
     def _recommend_markets(self, user_preferences: Dict[str, Any], 
                           industry_recommendations: List[Dict[str, Any]], 
                           region_recommendations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """상권 추천"""
-        recommendations = []
-        
+        """상권 추천 (상위 업종 × 상위 지역구의 전체 상권을 일괄 점수 계산 후 상위 5개)"""
         # 상위 추천 업종과 지역 조합
         top_industries = [rec["industry"] for rec in industry_recommendations[:2]]
         top_regions = [rec["region"] for rec in region_recommendations[:2]]
         
-        for industry in top_industries:
-            for region in top_regions:
-                # 임시 상권 코드 생성
-                market_code = f"1000{len(recommendations)}"
-                
-                # 점수 계산
-                score_result = self.scoring_service.calculate_market_score(
-                    market_code, industry, region
-                )
-                
-                if "error" not in score_result:
-                    recommendations.append({
-                        "market_code": market_code,
-                        "market_name": f"{region} {industry} 상권",
-                        "industry": industry,
-                        "region": region,
-                        "score": score_result["total_score"],
-                        "grade": score_result["grade"],
-                        "risk_level": score_result["risk_assessment"]["risk_level"]
-                    })
+        # 후보: (상권 코드, 상권명, 업종, 지역)
+        markets = self._get_candidate_markets(top_regions)
+        if markets:
+            candidates = [
+                (market_code, market_name, industry, region)
+                for industry in top_industries
+                for market_code, market_name, region in markets
+            ]
+        else:
+            # 상권 데이터가 없으면 조합별 임시 상권 코드 사용
+            candidates = [
+                (f"1000{i}", f"{region} {industry} 상권", industry, region)
+                for i, (industry, region) in enumerate(itertools.product(top_industries, top_regions))
+            ]
+        if not candidates:
+            return []
+        
+        # 전체 후보 점수는 배열 연산 1회, 상위 5개만 상세 결과 조회 (동점은 후보 순서)
+        totals = self.scoring_service.engine.score_rows(
+            [c[0] for c in candidates], [c[2] for c in candidates], [c[3] for c in candidates]
+        )["total"]
+        top = heapq.nlargest(5, range(len(candidates)), key=lambda i: (totals[i], -i))
+        score_results = self.scoring_service.calculate_market_scores(
+            [(candidates[i][0], candidates[i][2], candidates[i][3]) for i in top]
+        )
         
-        # 점수 순으로 정렬
-        recommendations.sort(key=lambda x: x["score"], reverse=True)
+        recommendations = []
+        for i, score_result in zip(top, score_results):
+            market_code, market_name, industry, region = candidates[i]
+            recommendations.append({
+                "market_code": market_code,
+                "market_name": market_name,
+                "industry": industry,
+                "region": region,
+                "score": score_result["total_score"],
+                "grade": score_result["grade"],
+                "risk_level": score_result["risk_assessment"]["risk_level"]
+            })
         
-        return recommendations[:5]  # 상위 5개 반환
+        return recommendations
+    
+    def _get_candidate_markets(self, regions: List[str]) -> List[Tuple[str, str, str]]:
+        """지역구 내 상권 목록 - [(상권 코드, 상권명, 지역구)]"""
+        df = self.data_loader.load_market_data()
+        if df.empty or not regions:
+            return []
+        
+        markets = df[df['district_name'].isin(regions)]
+        return list(zip(
+            markets['market_code'].astype(str), markets['market_name'].astype(str), markets['district_name'].astype(str)
+        ))
     
     def _generate_comprehensive_recommendations(self, industry_recommendations: List[Dict[str, Any]], 
                                               region_recommendations: List[Dict[str, Any]], 
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+점수 결과 캐시
+항목별 비용(직렬화 크기)을 합산해 상한을 넘으면 가장 오래 쓰지 않은 항목부터 제거하는 LRU 캐시
+(항목에 태그를 붙여 두면 태그 단위로 무효화 가능)
+"""
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Hashable, Iterable, Optional, Set
+
+# 캐시 전체 비용 상한 (바이트) 및 최대 항목 수
+DEFAULT_MAX_COST = 8 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 20000
+
+
+def estimate_cost(value: Any) -> int:
+    """결과 직렬화 크기 (바이트)"""
+    return len(json.dumps(value, ensure_ascii=False, default=str).encode('utf-8'))
+
+
+class ScoreCache:
+    """비용 기반 LRU 캐시 (반환된 결과는 공유 객체이므로 수정하지 않아야 함)"""
+
+    def __init__(self, max_cost: int = DEFAULT_MAX_COST, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_cost = max_cost
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._tags: Dict[Hashable, Set[Hashable]] = {}
+        self._total_cost = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """조회 (적중 시 최근 사용으로 갱신)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, cost: int = None, tags: Iterable[Hashable] = ()):
+        """저장 후 상한을 넘는 만큼 오래된 항목 제거"""
+        cost = estimate_cost(value) if cost is None else cost
+        if cost > self.max_cost:
+            return
+        tags = tuple(tags)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, cost, tags)
+            self._total_cost += cost
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while self._total_cost > self.max_cost or len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, tags: Iterable[Hashable]) -> int:
+        """태그가 붙은 항목 제거 - 제거한 항목 수 반환"""
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    if self._remove(key):
+                        removed += 1
+            self.invalidations += removed
+        return removed
+
+    def clear(self) -> int:
+        """전체 비우기 (통계는 유지) - 제거한 항목 수 반환"""
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+            self._tags.clear()
+            self._total_cost = 0
+            self.invalidations += removed
+        return removed
+
+    def _remove(self, key: Hashable) -> bool:
+        """항목 및 태그 인덱스 제거 (잠금 상태에서 호출)"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._total_cost -= entry[1]
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """적중/실패 통계"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups * 100, 2) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "total_cost": self._total_cost,
+                "max_cost": self.max_cost,
+                "max_entries": self.max_entries
+            }
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+점수 의존성 그래프
+원천 데이터 → 요인 테이블 → 파생 캐시(종합 점수, 점수 분포, 건강 점수)의 의존 관계를 선언하고
+원천 데이터 변경 시 영향 받는 키(지역/업종/상권)만 하위 캐시에 전달해 무효화하며 변경 이력을 기록
+"""
+import time
+import threading
+import weakref
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Any, Callable
+
+# 원천 데이터 → 요인 테이블
+SOURCE_FACTORS = {
+    "regional_population": "regional_factors",
+    "regional_rent": "regional_factors",
+    "regional_indicators": "regional_factors",
+    "industry_statistics": "industry_factors",
+    "business_data": "market_factors",
+    "foot_traffic_data": "foot_traffic"
+}
+
+# 요인 테이블 → 파생 캐시
+FACTOR_DEPENDENTS = {
+    "regional_factors": ["score_cache", "score_distribution"],
+    "industry_factors": ["score_cache", "score_distribution"],
+    "market_factors": ["score_cache", "score_distribution", "health_scores"],
+    "foot_traffic": ["health_scores"]
+}
+
+# 보관할 변경 이력 수
+CHANGE_LOG_SIZE = 500
+
+# 변경 키 - {"region": [...]}, {"industry": [...]}, {"market": [...]},
+# {"market_industry": [(상권, 업종), ...]}, 전체 변경은 {"all": True}
+ChangeKeys = Dict[str, Any]
+
+
+class ScoreDependencyGraph:
+    """원천 데이터 변경 → 영향 받는 파생 캐시 키만 무효화"""
+
+    def __init__(self):
+        # 캐시 노드 → 무효화 핸들러 (서비스 인스턴스 수명을 늘리지 않도록 약한 참조)
+        self._handlers: Dict[str, List[weakref.WeakMethod]] = {}
+        self._changes = deque(maxlen=CHANGE_LOG_SIZE)
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def register(self, node: str, handler: Callable[[ChangeKeys], int]):
+        """캐시 노드 무효화 핸들러 등록 (핸들러는 무효화한 항목 수 반환)"""
+        with self._lock:
+            self._handlers.setdefault(node, []).append(weakref.WeakMethod(handler))
+
+    def notify(self, source: str, keys: ChangeKeys) -> Dict[str, Any]:
+        """원천 데이터 변경 전파 - 변경 이력 항목 반환"""
+        factor = SOURCE_FACTORS.get(source)
+        if factor is None:
+            raise ValueError(f"알 수 없는 원천 데이터입니다: {source}")
+
+        started_at = time.monotonic()
+        invalidated = {}
+        for node in FACTOR_DEPENDENTS[factor]:
+            with self._lock:
+                handlers = [ref() for ref in self._handlers.get(node, [])]
+                self._handlers[node] = [ref for ref in self._handlers.get(node, []) if ref() is not None]
+            invalidated[node] = sum(handler(keys) for handler in handlers if handler is not None)
+
+        with self._lock:
+            self._sequence += 1
+            entry = {
+                "sequence": self._sequence,
+                "timestamp": datetime.utcnow().isoformat(),
+                "source": source,
+                "factor": factor,
+                "keys": {name: value if name == "all" else list(value) for name, value in keys.items()},
+                "invalidated": invalidated,
+                "elapsed_ms": round((time.monotonic() - started_at) * 1000, 3)
+            }
+            self._changes.append(entry)
+        return entry
+
+    def get_changes(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """최근 변경 이력 (최신순)"""
+        with self._lock:
+            return list(reversed(self._changes))[:limit]
+
+    def describe(self) -> Dict[str, Any]:
+        """의존성 그래프 구조"""
+        return {
+            "sources": dict(SOURCE_FACTORS),
+            "factors": {factor: list(nodes) for factor, nodes in FACTOR_DEPENDENTS.items()}
+        }
+
+
+# 원천 데이터 변경을 받는 공용 그래프
+score_dependencies = ScoreDependencyGraph()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+점수 분포
+(업종, 지역)별 상권 종합 점수를 정렬 배열로 보관하고
+백분위/순위는 이진 탐색(O(log n)), 차트용 히스토그램은 고정 구간(0~100)으로 계산
+"""
+from typing import Dict, Any
+import numpy as np
+
+# 히스토그램 기본 구간 수 및 점수 범위
+DEFAULT_HISTOGRAM_BINS = 20
+SCORE_RANGE = (0.0, 100.0)
+
+
+class ScoreDistribution:
+    """정렬된 점수 배열 기반 분포"""
+
+    def __init__(self, scores, scope: str):
+        self.scores = np.sort(np.asarray(scores, dtype=np.float64))
+        self.scope = scope
+        self.size = len(self.scores)
+
+    def position(self, score: float) -> Dict[str, Any]:
+        """점수의 백분위(해당 점수 이하 비율)와 순위(더 높은 점수 수 + 1)"""
+        at_or_below = int(np.searchsorted(self.scores, score, side='right'))
+        return {
+            "percentile": round(at_or_below / self.size * 100, 1) if self.size else None,
+            "rank": self.size - at_or_below + 1,
+            "total_markets": self.size,
+            "scope": self.scope
+        }
+
+    def summary(self, bins: int = DEFAULT_HISTOGRAM_BINS) -> Dict[str, Any]:
+        """기술 통계와 히스토그램"""
+        counts, edges = np.histogram(self.scores, bins=bins, range=SCORE_RANGE)
+        if not self.size:
+            return {
+                "total_markets": 0,
+                "scope": self.scope,
+                "histogram": {"bin_edges": edges.round(2).tolist(), "counts": counts.tolist()}
+            }
+        quantiles = np.percentile(self.scores, [10, 25, 50, 75, 90])
+        return {
+            "total_markets": self.size,
+            "scope": self.scope,
+            "min": float(self.scores[0]),
+            "max": float(self.scores[-1]),
+            "mean": round(float(self.scores.mean()), 1),
+            "percentiles": {
+                f"p{p}": round(float(q), 1) for p, q in zip((10, 25, 50, 75, 90), quantiles)
+            },
+            "histogram": {"bin_edges": edges.round(2).tolist(), "counts": counts.tolist()}
+        }
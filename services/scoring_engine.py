@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+점수 행렬 엔진
+업종/지역 요인 테이블을 numpy 배열로 보관하고 상권 × 업종 × 지역 전체 조합의
+종합 점수 텐서를 브로드캐스트 연산 한 번으로 계산 (반올림은 단건 계산과 동일)
+"""
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+
+# 업종 요인 테이블 (생존율 %, 성장 잠재력, 리스크, 경쟁 강도)
+INDUSTRY_FACTORS = {
+    "식음료업": {"survival_rate": 75.0, "growth_potential": 0.7, "risk_level": 0.3, "competition_intensity": 0.7},
+    "쇼핑업": {"survival_rate": 65.0, "growth_potential": 0.5, "risk_level": 0.5, "competition_intensity": 0.8},
+    "숙박업": {"survival_rate": 70.0, "growth_potential": 0.6, "risk_level": 0.4, "competition_intensity": 0.6},
+    "여가서비스업": {"survival_rate": 60.0, "growth_potential": 0.8, "risk_level": 0.6, "competition_intensity": 0.5},
+    "운송업": {"survival_rate": 80.0, "growth_potential": 0.4, "risk_level": 0.2, "competition_intensity": 0.4},
+    "의료업": {"survival_rate": 85.0, "growth_potential": 0.9, "risk_level": 0.1, "competition_intensity": 0.3},
+    "교육업": {"survival_rate": 90.0, "growth_potential": 0.8, "risk_level": 0.1, "competition_intensity": 0.4},
+    "문화업": {"survival_rate": 55.0, "growth_potential": 0.6, "risk_level": 0.7, "competition_intensity": 0.6},
+    "스포츠업": {"survival_rate": 65.0, "growth_potential": 0.7, "risk_level": 0.5, "competition_intensity": 0.5},
+    "기타서비스업": {"survival_rate": 70.0, "growth_potential": 0.6, "risk_level": 0.4, "competition_intensity": 0.6}
+}
+DEFAULT_INDUSTRY_FACTORS = {"survival_rate": 70.0, "growth_potential": 0.6, "risk_level": 0.4, "competition_intensity": 0.5}
+
+# 지역 요인 테이블
+REGIONAL_FACTORS = {
+    "동구": {"population_density": 2800, "economic_growth": 1.8, "unemployment_rate": 3.2, "average_income": 2800000, "infrastructure_score": 0.7, "commercial_rent_per_sqm": 15000},
+    "서구": {"population_density": 3200, "economic_growth": 2.1, "unemployment_rate": 2.8, "average_income": 3200000, "infrastructure_score": 0.8, "commercial_rent_per_sqm": 18000},
+    "유성구": {"population_density": 1800, "economic_growth": 2.8, "unemployment_rate": 2.1, "average_income": 3800000, "infrastructure_score": 0.9, "commercial_rent_per_sqm": 20000},
+    "중구": {"population_density": 4500, "economic_growth": 1.5, "unemployment_rate": 3.5, "average_income": 3000000, "infrastructure_score": 0.8, "commercial_rent_per_sqm": 25000},
+    "대덕구": {"population_density": 1200, "economic_growth": 2.3, "unemployment_rate": 2.5, "average_income": 3500000, "infrastructure_score": 0.7, "commercial_rent_per_sqm": 12000}
+}
+DEFAULT_REGIONAL_FACTORS = {"population_density": 2500, "economic_growth": 2.0, "unemployment_rate": 3.0, "average_income": 3000000, "infrastructure_score": 0.7, "commercial_rent_per_sqm": 18000}
+
+# 임대료 점수 - 기준 임대료(원/㎡, 5개 구 평균)에서 기준 점수, 기준 대비 100% 비쌀 때마다 기울기만큼 감점
+REFERENCE_RENT_PER_SQM = 18000
+RENT_SCORE_AT_REFERENCE = 60
+RENT_SCORE_SLOPE = 40
+
+# 상권 요인 중 아직 데이터가 없는 항목의 기본 점수
+DEFAULT_MARKET_COMPONENTS = {"competition_level": 70, "accessibility": 75, "foot_traffic": 65}
+
+# 동일 업종 밀도가 이 값(개/km²) 이상이면 경쟁 점수 0점
+COMPETITION_SATURATION_PER_KM2 = 40.0
+
+# 인구 통계 기본 점수
+DEFAULT_DEMOGRAPHICS_SCORE = 70
+
+# 종합 점수 그룹 가중치 (상권, 업종, 지역)
+GROUP_WEIGHTS = (0.4, 0.35, 0.25)
+GROUP_NAMES = ("market_factors", "industry_factors", "regional_factors")
+
+# 요인 벡터 배치 (그룹별 요인 순서, 가중치 dict와 동일)
+FACTOR_LAYOUT = {
+    "market_factors": ["population_density", "competition_level", "accessibility", "rent_cost", "foot_traffic"],
+    "industry_factors": ["survival_rate", "growth_potential", "risk_level", "competition_intensity"],
+    "regional_factors": ["economic_indicators", "demographics", "infrastructure"]
+}
+FACTOR_KEYS = [(group, factor) for group in GROUP_NAMES for factor in FACTOR_LAYOUT[group]]
+
+GRADE_THRESHOLDS = np.array([40, 50, 60, 70, 80, 90], dtype=np.float64)
+GRADE_LABELS = np.array(["D", "C", "C+", "B", "B+", "A", "A+"])
+
+# 한 번에 계산하는 최대 조합 수 (상권 × 업종 × 지역)
+MAX_MATRIX_CELLS = 500000
+
+# float64 가수부 절반 분할 상수 (Dekker)
+_SPLITTER = 134217729.0
+
+
+def round_half_even(values, ndigits: int = 1) -> np.ndarray:
+    """파이썬 round()와 같은 결과를 내는 벡터 반올림
+
+    values × 10^ndigits의 정확한 곱을 (근사값 + 오차)로 구해
+    근사값이 .5에 걸린 경우 오차 부호로 올림/내림을 결정합니다.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scale = float(10 ** ndigits)
+    product = values * scale
+    # Dekker 분할로 곱의 반올림 오차를 정확히 계산 (scale은 작은 정수라 분할 불필요)
+    c = _SPLITTER * values
+    high = c - (c - values)
+    low = values - high
+    error = ((high * scale - product) + low * scale)
+
+    rounded = np.rint(product)
+    tie = np.abs(product - np.trunc(product)) == 0.5
+    rounded = np.where(tie & (error > 0), np.floor(product) + 1, rounded)
+    rounded = np.where(tie & (error < 0), np.floor(product), rounded)
+    return rounded / scale
+
+
+def rent_score(rent_per_sqm):
+    """지역 상업용 임대료(원/㎡) → 임대료 점수 (낮을수록 높음, 0-100)"""
+    relative = np.asarray(rent_per_sqm, dtype=np.float64) / REFERENCE_RENT_PER_SQM
+    return np.clip(RENT_SCORE_AT_REFERENCE + RENT_SCORE_SLOPE * (1 - relative), 0, 100)
+
+
+def competition_score(competition, market_code: str, industry: str) -> float:
+    """동일 업종 사업체 밀도 기반 경쟁 점수 (집계 데이터가 없으면 기본값)"""
+    default = DEFAULT_MARKET_COMPONENTS["competition_level"]
+    if competition is None or not market_code or not industry:
+        return default
+    result = competition.get_competition(market_code, industry)
+    if result is None:
+        return default
+    return max(0.0, 100 * (1 - result["density_per_km2"] / COMPETITION_SATURATION_PER_KM2))
+
+
+def _unique_inverse(values: List[str]):
+    """고유값 목록(첫 등장 순서)과 각 원소의 고유값 인덱스"""
+    positions: Dict[str, int] = {}
+    inverse = np.array([positions.setdefault(v, len(positions)) for v in values], dtype=np.int64)
+    return list(positions), inverse
+
+
+def grades_for(scores: np.ndarray) -> np.ndarray:
+    """점수 배열 → 등급 배열"""
+    return GRADE_LABELS[np.searchsorted(GRADE_THRESHOLDS, scores, side='right')]
+
+
+class ScoringEngine:
+    """요인 테이블 배열 보관 및 점수 텐서 계산"""
+
+    def __init__(self, weights: Dict[str, Dict[str, float]], competition=None):
+        self.weights = weights
+        self.competition = competition
+        # 원천 데이터 갱신으로 바뀔 수 있으므로 인스턴스별 사본 사용
+        self.industry_factors = {industry: dict(row) for industry, row in INDUSTRY_FACTORS.items()}
+        self.regional_factors = {region: dict(row) for region, row in REGIONAL_FACTORS.items()}
+
+    def industry_table(self, industries: List[str]) -> Dict[str, np.ndarray]:
+        """업종 축 요인 배열"""
+        rows = [self.industry_factors.get(industry, DEFAULT_INDUSTRY_FACTORS) for industry in industries]
+        return {name: np.array([row[name] for row in rows], dtype=np.float64) for name in DEFAULT_INDUSTRY_FACTORS}
+
+    def regional_table(self, regions: List[str]) -> Dict[str, np.ndarray]:
+        """지역 축 요인 배열"""
+        rows = [self.regional_factors.get(region, DEFAULT_REGIONAL_FACTORS) for region in regions]
+        return {name: np.array([row[name] for row in rows], dtype=np.float64) for name in DEFAULT_REGIONAL_FACTORS}
+
+    def competition_table(self, market_codes: List[str], industries: List[str]) -> np.ndarray:
+        """상권 × 업종 경쟁 점수 (집계 대상이 아닌 상권은 업종 조회 생략)"""
+        scores = np.full((len(market_codes), len(industries)), float(DEFAULT_MARKET_COMPONENTS["competition_level"]))
+        if self.competition is None:
+            return scores
+        for m, market_code in enumerate(market_codes):
+            if not market_code or not self.competition.has_area(market_code):
+                continue
+            for i, industry in enumerate(industries):
+                scores[m, i] = competition_score(self.competition, market_code, industry)
+        return scores
+
+    def industry_scores(self, industries: List[str]) -> Dict[str, np.ndarray]:
+        """업종 요인 점수 (업종 축)"""
+        table = self.industry_table(industries)
+        weights = self.weights["industry_factors"]
+        survival = table["survival_rate"]
+        growth = table["growth_potential"] * 100
+        risk = (1 - table["risk_level"]) * 100
+        competition = (1 - table["competition_intensity"]) * 100
+        total = (
+            survival * weights["survival_rate"] +
+            growth * weights["growth_potential"] +
+            risk * weights["risk_level"] +
+            competition * weights["competition_intensity"]
+        )
+        return {
+            "total": round_half_even(total),
+            "survival_rate": round_half_even(survival),
+            "growth_potential": round_half_even(growth),
+            "risk_level": round_half_even(risk),
+            "competition_intensity": round_half_even(competition)
+        }
+
+    def regional_scores(self, regions: List[str]) -> Dict[str, np.ndarray]:
+        """지역 요인 점수 (지역 축)"""
+        table = self.regional_table(regions)
+        weights = self.weights["regional_factors"]
+        economic = (
+            np.minimum(100, (table["economic_growth"] / 3.0) * 100) * 0.4 +
+            np.maximum(0, (5.0 - table["unemployment_rate"]) / 5.0 * 100) * 0.3 +
+            np.minimum(100, (table["average_income"] / 5000000) * 100) * 0.3
+        )
+        demographics = np.full(len(regions), float(DEFAULT_DEMOGRAPHICS_SCORE))
+        infrastructure = table["infrastructure_score"] * 100
+        total = (
+            economic * weights["economic_indicators"] +
+            demographics * weights["demographics"] +
+            infrastructure * weights["infrastructure"]
+        )
+        return {
+            "total": round_half_even(total),
+            "economic_indicators": round_half_even(economic),
+            "demographics": round_half_even(demographics),
+            "infrastructure": round_half_even(infrastructure),
+            "population_density": table["population_density"],
+            "commercial_rent_per_sqm": table["commercial_rent_per_sqm"]
+        }
+
+    def market_scores(self, market_codes: List[str], industries: List[str],
+                      population_density: np.ndarray, rent_per_sqm: np.ndarray) -> Dict[str, np.ndarray]:
+        """상권 요인 점수 (상권 × 업종 × 지역)"""
+        weights = self.weights["market_factors"]
+        population = np.minimum(100, (population_density / 5000) * 100)[None, None, :]
+        competition = self.competition_table(market_codes, industries)[:, :, None]
+        rent = rent_score(rent_per_sqm)[None, None, :]
+        total = (
+            population * weights["population_density"] +
+            competition * weights["competition_level"] +
+            DEFAULT_MARKET_COMPONENTS["accessibility"] * weights["accessibility"] +
+            rent * weights["rent_cost"] +
+            DEFAULT_MARKET_COMPONENTS["foot_traffic"] * weights["foot_traffic"]
+        )
+        return {
+            "total": round_half_even(total),
+            "population_density": round_half_even(population[0, 0]),
+            "competition_level": round_half_even(competition[:, :, 0]),
+            "rent_cost": round_half_even(rent[0, 0])
+        }
+
+    def score_tensor(self, market_codes: List[str], industries: List[str], regions: List[str]) -> Dict[str, Any]:
+        """종합 점수 텐서 (상권 × 업종 × 지역) 및 요인별 점수"""
+        industry = self.industry_scores(industries)
+        regional = self.regional_scores(regions)
+        market = self.market_scores(
+            market_codes, industries, regional["population_density"], regional["commercial_rent_per_sqm"]
+        )
+
+        market_weight, industry_weight, regional_weight = GROUP_WEIGHTS
+        raw_total = (
+            market["total"] * market_weight +
+            industry["total"][None, :, None] * industry_weight +
+            regional["total"][None, None, :] * regional_weight
+        )
+        # 등급은 단건 계산과 같이 반올림 전 점수 기준
+        return {
+            "total": round_half_even(raw_total),
+            "grades": grades_for(raw_total),
+            "market": market,
+            "industry": industry,
+            "regional": regional
+        }
+
+    def score_rows(self, market_codes: List[str], industries: List[str], regions: List[str]) -> Dict[str, Any]:
+        """후보 N개 (상권[i], 업종[i], 지역[i]) 점수 - 업종/지역 요인은 고유값만 계산해 인덱싱"""
+        unique_industries, industry_idx = _unique_inverse(industries)
+        unique_regions, region_idx = _unique_inverse(regions)
+        industry = self.industry_scores(unique_industries)
+        regional = self.regional_scores(unique_regions)
+
+        weights = self.weights["market_factors"]
+        population = np.minimum(100, (regional["population_density"][region_idx] / 5000) * 100)
+        rent = rent_score(regional["commercial_rent_per_sqm"][region_idx])
+        competition = np.array([
+            competition_score(self.competition, market_code, industry_name)
+            for market_code, industry_name in zip(market_codes, industries)
+        ], dtype=np.float64)
+        market_total = round_half_even(
+            population * weights["population_density"] +
+            competition * weights["competition_level"] +
+            DEFAULT_MARKET_COMPONENTS["accessibility"] * weights["accessibility"] +
+            rent * weights["rent_cost"] +
+            DEFAULT_MARKET_COMPONENTS["foot_traffic"] * weights["foot_traffic"]
+        )
+
+        market_weight, industry_weight, regional_weight = GROUP_WEIGHTS
+        raw_total = (
+            market_total * market_weight +
+            industry["total"][industry_idx] * industry_weight +
+            regional["total"][region_idx] * regional_weight
+        )
+        return {
+            "total": round_half_even(raw_total),
+            "grades": grades_for(raw_total),
+            "market": {"total": market_total, "population_density": population, "competition_level": competition,
+                       "rent_cost": rent},
+            "industry": {name: values[industry_idx] for name, values in industry.items()},
+            "regional": {name: values[region_idx] for name, values in regional.items()}
+        }
+
+    def factor_vectors(self, market_codes: List[str], industries: List[str], regions: List[str]) -> np.ndarray:
+        """후보 N개의 반올림 전 요인 점수 (N × FACTOR_KEYS)"""
+        industry = self.industry_table(industries)
+        regional = self.regional_table(regions)
+        size = len(market_codes)
+        competition = np.array([
+            competition_score(self.competition, market_code, industry_name)
+            for market_code, industry_name in zip(market_codes, industries)
+        ], dtype=np.float64)
+        columns = {
+            "population_density": np.minimum(100, (regional["population_density"] / 5000) * 100),
+            "competition_level": competition,
+            "accessibility": np.full(size, float(DEFAULT_MARKET_COMPONENTS["accessibility"])),
+            "rent_cost": rent_score(regional["commercial_rent_per_sqm"]),
+            "foot_traffic": np.full(size, float(DEFAULT_MARKET_COMPONENTS["foot_traffic"])),
+            "survival_rate": industry["survival_rate"],
+            "growth_potential": industry["growth_potential"] * 100,
+            "risk_level": (1 - industry["risk_level"]) * 100,
+            "competition_intensity": (1 - industry["competition_intensity"]) * 100,
+            "economic_indicators": (
+                np.minimum(100, (regional["economic_growth"] / 3.0) * 100) * 0.4 +
+                np.maximum(0, (5.0 - regional["unemployment_rate"]) / 5.0 * 100) * 0.3 +
+                np.minimum(100, (regional["average_income"] / 5000000) * 100) * 0.3
+            ),
+            "demographics": np.full(size, float(DEFAULT_DEMOGRAPHICS_SCORE)),
+            "infrastructure": regional["infrastructure_score"] * 100
+        }
+        return np.stack([columns[factor] for _, factor in FACTOR_KEYS], axis=1).reshape(size, len(FACTOR_KEYS))
+
+    def weight_tensor(self, weight_sets: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        """가중치 세트 S개 → (요인 가중치 S × 그룹 × 요인, 그룹 가중치 S × 그룹)
+
+        각 세트는 기본 가중치를 부분적으로 덮어쓰며, 그룹 내 요인 가중치와 그룹 가중치는 합이 1이 되도록 정규화합니다.
+        """
+        factor_weights = np.zeros((len(weight_sets), len(GROUP_NAMES), len(FACTOR_KEYS)))
+        group_weights = np.zeros((len(weight_sets), len(GROUP_NAMES)))
+        for s, weight_set in enumerate(weight_sets):
+            for g, group in enumerate(GROUP_NAMES):
+                overrides = weight_set.get(group) or {}
+                for k, (key_group, factor) in enumerate(FACTOR_KEYS):
+                    if key_group == group:
+                        factor_weights[s, g, k] = overrides.get(factor, self.weights[group][factor])
+                overrides = weight_set.get("group_weights") or {}
+                group_weights[s, g] = overrides.get(group, GROUP_WEIGHTS[g])
+
+        factor_weights /= factor_weights.sum(axis=2, keepdims=True)
+        group_weights /= group_weights.sum(axis=1, keepdims=True)
+        return factor_weights, group_weights
+
+    def evaluate_weight_sets(self, factors: np.ndarray, factor_weights: np.ndarray,
+                             group_weights: np.ndarray) -> Dict[str, np.ndarray]:
+        """요인 벡터 1개 × 가중치 세트 S개 - 그룹 점수는 행렬곱 1회, 반올림 규칙은 단건 계산과 동일"""
+        exact_group_totals = factor_weights @ factors  # (S, 그룹)
+        group_totals = round_half_even(exact_group_totals)
+        raw_total = (
+            group_totals[:, 0] * group_weights[:, 0] +
+            group_totals[:, 1] * group_weights[:, 1] +
+            group_totals[:, 2] * group_weights[:, 2]
+        )
+
+        # 민감도: 가중치 1단위 증가 시 (정규화 후) 종합 점수 변화량
+        # 요인 j: 그룹 가중치 × (요인 점수 - 그룹 점수), 그룹 g: 그룹 점수 - 종합 점수
+        factor_group = np.array([GROUP_NAMES.index(group) for group, _ in FACTOR_KEYS])
+        exact_total = (exact_group_totals * group_weights).sum(axis=1)
+        factor_sensitivity = group_weights[:, factor_group] * (factors[None, :] - exact_group_totals[:, factor_group])
+        group_sensitivity = exact_group_totals - exact_total[:, None]
+        return {
+            "group_totals": group_totals,
+            "total": round_half_even(raw_total),
+            "grades": grades_for(raw_total),
+            "factor_sensitivity": factor_sensitivity,
+            "group_sensitivity": group_sensitivity
+        }
+
+    def score_rows_weighted(self, market_codes: List[str], industries: List[str], regions: List[str],
+                            weight_set: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """후보 N개를 대체 가중치 세트 1개로 계산 (요인 행렬 × 가중치 행렬 1회)"""
+        factors = self.factor_vectors(market_codes, industries, regions)
+        factor_weights, group_weights = self.weight_tensor([weight_set])
+        group_totals = round_half_even(factors @ factor_weights[0].T)  # (N, 그룹)
+        market_weight, industry_weight, regional_weight = group_weights[0]
+        raw_total = (
+            group_totals[:, 0] * market_weight +
+            group_totals[:, 1] * industry_weight +
+            group_totals[:, 2] * regional_weight
+        )
+        return {
+            "total": round_half_even(raw_total),
+            "grades": grades_for(raw_total),
+            "group_totals": group_totals
+        }
+
+    def best_by_region(self, total: np.ndarray, market_codes: List[str], industries: List[str],
+                       regions: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """지역별 최고 점수 (상권, 업종) 조합"""
+        best = {}
+        flat = total.reshape(-1, len(regions))
+        if not len(flat):
+            return {region: None for region in regions}
+        winners = flat.argmax(axis=0)
+        for r, region in enumerate(regions):
+            m, i = divmod(int(winners[r]), len(industries))
+            best[region] = {
+                "market_code": market_codes[m],
+                "industry": industries[i],
+                "total_score": float(flat[winners[r], r])
+            }
+        return best
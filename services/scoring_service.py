@@ -3,13 +3,35 @@
 종합 점수 계산 서비스
 상권, 업종, 지역 데이터를 종합하여 점수 계산
 """
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from services.data_loader import DataLoader
+from services.score_cache import ScoreCache
+from services.score_distribution import ScoreDistribution, DEFAULT_HISTOGRAM_BINS
+from services.competition_density_service import competition_density
+from services.score_dependency_graph import score_dependencies, SOURCE_FACTORS, ChangeKeys
+from services.scoring_engine import (
+    ScoringEngine, DEFAULT_INDUSTRY_FACTORS, DEFAULT_REGIONAL_FACTORS,
+    MAX_MATRIX_CELLS, GROUP_NAMES, GROUP_WEIGHTS, FACTOR_LAYOUT, FACTOR_KEYS, competition_score, rent_score
+)
 import math
+import json
+import threading
+import hashlib
+import numpy as np
+
+# 지역 비교 1회 요청의 최대 후보 수
+MAX_COMPARE_CANDIDATES = 500
+
+# what-if 1회 요청의 최대 가중치 세트 수
+MAX_WHAT_IF_WEIGHT_SETS = 1000
+
+# 상위 상권 검색 최대 결과 수
+MAX_TOP_MARKETS = 100
 
 class ScoringService:
     def __init__(self):
         self.data_loader = DataLoader()
+        self.competition = competition_density
         
         # 가중치 설정
         self.weights = {
@@ -32,8 +54,156 @@ class ScoringService:
                 "infrastructure": 0.30
             }
         }
+        
+        # 점수 행렬 엔진 (같은 가중치 참조)
+        self.engine = ScoringEngine(self.weights, self.competition)
+        
+        # (상권, 업종, 지역, 가중치 해시) → 점수 결과 (원천 데이터 변경은 의존성 그래프로 태그 무효화)
+        self.score_cache = ScoreCache()
+        self._weights_hash = self._hash_weights()
+        
+        # 상위 상권 검색용 상권 목록 배열 (상권 데이터 DataFrame이 바뀌면 재구성)
+        self._market_universe: Optional[Dict[str, Any]] = None
+        
+        # (업종, 지역) → (가중치 해시, 상권 목록, 점수 분포)
+        # 분포 구성 중 사업체 최초 집계가 일어나면 무효화 핸들러가 같은 스레드에서 호출되므로 재진입 잠금 사용
+        self._distributions: Dict[Tuple[str, str], Tuple] = {}
+        self._distribution_lock = threading.RLock()
+        
+        score_dependencies.register("score_cache", self._invalidate_scores)
+        score_dependencies.register("score_distribution", self._invalidate_distributions)
+    
+    @property
+    def dataset_version(self) -> int:
+        """사업체 밀도 집계 버전 (통계 표시용)"""
+        return self.competition.version
+    
+    def update_regional_factors(self, updates: Dict[str, Dict[str, float]],
+                                source: str = "regional_indicators") -> Dict[str, Any]:
+        """지역 요인 갱신 - 값이 바뀐 지역만 의존 캐시 무효화"""
+        return self._update_factor_table(
+            self.engine.regional_factors, DEFAULT_REGIONAL_FACTORS, "regional_factors", "region", updates, source
+        )
+    
+    def update_industry_factors(self, updates: Dict[str, Dict[str, float]],
+                                source: str = "industry_statistics") -> Dict[str, Any]:
+        """업종 요인 갱신 - 값이 바뀐 업종만 의존 캐시 무효화"""
+        return self._update_factor_table(
+            self.engine.industry_factors, DEFAULT_INDUSTRY_FACTORS, "industry_factors", "industry", updates, source
+        )
+    
+    def update_regional_rent(self, rents: Dict[str, float]) -> Dict[str, Any]:
+        """지역별 상업용 임대료(원/㎡) 갱신 - 임대료가 바뀐 지역만 의존 캐시 무효화"""
+        return self.update_regional_factors(
+            {region: {"commercial_rent_per_sqm": rent} for region, rent in rents.items()}, source="regional_rent"
+        )
+    
+    def get_change_log(self, limit: int = 50) -> Dict[str, Any]:
+        """의존성 그래프 구조와 최근 변경 이력"""
+        return {"dependency_graph": score_dependencies.describe(), "changes": score_dependencies.get_changes(limit)}
+    
+    def _update_factor_table(self, table: Dict[str, Dict[str, float]], defaults: Dict[str, float], factor: str,
+                             dimension: str, updates: Dict[str, Dict[str, float]], source: str) -> Dict[str, Any]:
+        """요인 테이블 변경분 비교 후 반영 및 변경 전파"""
+        if SOURCE_FACTORS.get(source) != factor:
+            return {"error": f"{factor}를 갱신하는 원천 데이터가 아닙니다: {source}"}
+        for name, values in updates.items():
+            for key, value in values.items():
+                if key not in defaults:
+                    return {"error": f"알 수 없는 요인 항목입니다: {name}.{key}"}
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+                    return {"error": f"{name}.{key}는 숫자여야 합니다."}
+        
+        changed = []
+        for name, values in updates.items():
+            current = table.get(name, defaults)
+            merged = dict(current, **{key: float(value) for key, value in values.items()})
+            if name not in table or merged != current:
+                table[name] = merged
+                changed.append(name)
+        
+        change = score_dependencies.notify(source, {dimension: changed}) if changed else None
+        return {"changed": changed, "change": change}
+    
+    def _invalidate_scores(self, keys: ChangeKeys) -> int:
+        """변경 키에 해당하는 점수 캐시 항목 무효화"""
+        if keys.get("all"):
+            return self.score_cache.clear()
+        tags = [(dimension, value) for dimension, values in keys.items() for value in values]
+        return self.score_cache.invalidate(tags)
+    
+    def _invalidate_distributions(self, keys: ChangeKeys) -> int:
+        """변경 키에 해당하는 점수 분포 무효화 (다음 조회 시 재구성)"""
+        with self._distribution_lock:
+            if keys.get("all"):
+                removed = len(self._distributions)
+                self._distributions.clear()
+                return removed
+            
+            regions = set(keys.get("region", ()))
+            industries = set(keys.get("industry", ()))
+            # 상권 × 업종 변경은 그 상권을 모집단에 포함하는 분포만 (해당 지역구 또는 전체 상권 분포)
+            universe = self._market_universe
+            market_districts = universe["district_by_code"] if universe is not None else {}
+            market_changes = {}
+            for market_code, industry in keys.get("market_industry", ()):
+                if str(market_code) in market_districts:
+                    market_changes.setdefault(industry, set()).add(market_districts[str(market_code)])
+            
+            stale = []
+            for (industry, region), (_, _, distribution) in self._distributions.items():
+                districts = market_changes.get(industry)
+                if region in regions or industry in industries or (
+                    districts and (distribution.scope == "all" or region in districts)
+                ):
+                    stale.append((industry, region))
+            for key in stale:
+                del self._distributions[key]
+            return len(stale)
+    
+    def set_weights(self, weights: Dict[str, Dict[str, float]]):
+        """가중치 변경 (캐시 키의 가중치 해시도 갱신)"""
+        for group, values in weights.items():
+            self.weights.setdefault(group, {}).update(values)
+        self._weights_hash = self._hash_weights()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """점수 캐시 적중/실패 통계"""
+        return dict(self.score_cache.stats(), weights_hash=self._weights_hash, dataset_version=self.dataset_version)
+    
+    def _hash_weights(self) -> str:
+        payload = json.dumps(self.weights, sort_keys=True)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+    
+    def _score_cache_key(self, market_code: str, industry: str, region: str) -> Tuple:
+        return (str(market_code), industry, region, self._weights_hash)
+    
+    def _cache_score(self, market_code: str, industry: str, region: str, result: Dict[str, Any]):
+        """점수 결과 저장 (상권/업종/지역 태그로 무효화)"""
+        market_code = str(market_code)
+        self.score_cache.put(
+            self._score_cache_key(market_code, industry, region), result,
+            tags=(("market", market_code), ("industry", industry), ("region", region),
+                  ("market_industry", (market_code, industry)))
+        )
+    
+    def _with_position(self, result: Dict[str, Any], industry: str, region: str) -> Dict[str, Any]:
+        """점수 결과 + 분포 내 위치 (분포는 다른 상권 변경에도 바뀌므로 캐시에 넣지 않고 조회 시 추가)"""
+        return dict(result, market_position=self._market_position(industry, region, result["total_score"]))
     
     def calculate_market_score(self, market_code: str, industry: str, region: str) -> Dict[str, Any]:
+        """상권 종합 점수 계산 (같은 입력·가중치면 캐시 결과 사용)"""
+        cached = self.score_cache.get(self._score_cache_key(market_code, industry, region))
+        if cached is not None:
+            return self._with_position(cached, industry, region)
+        
+        result = self._calculate_market_score(market_code, industry, region)
+        if "error" in result:
+            return result
+        self._cache_score(market_code, industry, region, result)
+        return self._with_position(result, industry, region)
+    
+    def _calculate_market_score(self, market_code: str, industry: str, region: str) -> Dict[str, Any]:
         """상권 종합 점수 계산"""
         try:
             # 기본 데이터 수집
@@ -45,7 +215,7 @@ class ScoringService:
                 return {"error": "필요한 데이터를 찾을 수 없습니다."}
             
             # 각 요소별 점수 계산
-            market_score = self._calculate_market_factors_score(market_data, regional_data)
+            market_score = self._calculate_market_factors_score(market_data, regional_data, industry)
             industry_score = self._calculate_industry_factors_score(industry_data)
             regional_score = self._calculate_regional_factors_score(regional_data)
             
@@ -72,6 +242,370 @@ class ScoringService:
         except Exception as e:
             return {"error": f"점수 계산 중 오류가 발생했습니다: {str(e)}"}
     
+    def calculate_score_matrix(self, market_codes: List[str] = None, industries: List[str] = None,
+                               regions: List[str] = None) -> Dict[str, Any]:
+        """상권 × 업종 × 지역 전체 조합 종합 점수 (축을 생략하면 전체 목록)"""
+        if market_codes is None:
+            df = self.data_loader.load_market_data()
+            market_codes = df['market_code'].astype(str).tolist() if not df.empty else []
+        industries = industries or list(self.engine.industry_factors)
+        regions = regions or list(self.engine.regional_factors)
+        
+        if not market_codes:
+            return {"error": "점수를 계산할 상권이 없습니다."}
+        cells = len(market_codes) * len(industries) * len(regions)
+        if cells > MAX_MATRIX_CELLS:
+            return {"error": f"조합 수({cells})가 최대 {MAX_MATRIX_CELLS}개를 초과합니다. 축을 나누어 요청하세요."}
+        
+        tensor = self.engine.score_tensor(market_codes, industries, regions)
+        total = tensor["total"]
+        
+        return {
+            "axes": {
+                "market_codes": market_codes,
+                "industries": industries,
+                "regions": regions
+            },
+            "total_scores": total.tolist(),
+            "grades": tensor["grades"].tolist(),
+            "industry_scores": dict(zip(industries, tensor["industry"]["total"].tolist())),
+            "regional_scores": dict(zip(regions, tensor["regional"]["total"].tolist())),
+            "best_by_region": self.engine.best_by_region(total, market_codes, industries, regions)
+        }
+    
+    def calculate_market_scores(self, candidates: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+        """(상권, 업종, 지역) 후보 일괄 점수 계산 - calculate_market_score와 같은 형식의 결과 목록"""
+        results = [self.score_cache.get(self._score_cache_key(*candidate)) for candidate in candidates]
+        missing = [i for i, result in enumerate(results) if result is None]
+        
+        # 캐시에 없는 후보만 일괄 계산
+        if missing:
+            market_codes, industries, regions = (list(axis) for axis in zip(*(candidates[i] for i in missing)))
+            rows = self.engine.score_rows(market_codes, industries, regions)
+            for row, i in enumerate(missing):
+                results[i] = self._build_score_result(rows, row)
+                self._cache_score(*candidates[i], results[i])
+        return [
+            self._with_position(result, industry, region)
+            for result, (_, industry, region) in zip(results, candidates)
+        ]
+    
+    def compare_locations(self, industry: str, locations: List[Tuple[str, str]], top_k: int = None) -> Dict[str, Any]:
+        """지역/상권 후보 비교 - 중복 제거 후 일괄 점수 계산, 부분 정렬로 상위 top_k 순위화"""
+        locations = list(dict.fromkeys(locations))
+        if len(locations) > MAX_COMPARE_CANDIDATES:
+            return {"error": f"비교 후보는 최대 {MAX_COMPARE_CANDIDATES}개까지 가능합니다."}
+        
+        size = len(locations)
+        rows = self.engine.score_rows(
+            [market_code for _, market_code in locations], [industry] * size, [region for region, _ in locations]
+        )
+        totals = rows["total"]
+        k = size if top_k is None else max(0, min(top_k, size))
+        
+        # k번째 점수 이상인 후보만 골라 (점수 내림차순, 입력 순서) 정렬
+        if 0 < k < size:
+            threshold = np.partition(totals, size - k)[size - k]
+            selected = np.flatnonzero(totals >= threshold)
+        else:
+            selected = np.arange(size)
+        order = selected[np.lexsort((selected, -totals[selected]))][:k]
+        
+        best_score = float(totals.max()) if size else 0.0
+        # 백분위: 전체 후보 중 해당 점수 이하인 비율
+        percentiles = (totals[None, :] <= totals[order][:, None]).sum(axis=1) / size * 100 if size else []
+        
+        results = []
+        for rank, (i, percentile) in enumerate(zip(order, percentiles), start=1):
+            region, market_code = locations[i]
+            analysis = self.score_cache.get(self._score_cache_key(market_code, industry, region))
+            if analysis is None:
+                analysis = self._build_score_result(rows, int(i))
+                self._cache_score(market_code, industry, region, analysis)
+            analysis = self._with_position(analysis, industry, region)
+            results.append({
+                "region": region,
+                "market_code": market_code,
+                "rank": rank,
+                "percentile": round(float(percentile), 1),
+                "score_delta": round(float(totals[i]) - best_score, 1),
+                "score_analysis": analysis
+            })
+        
+        return {
+            "comparison_results": results,
+            "total_candidates": size,
+            "average_score": round(float(totals.mean()), 1) if size else 0,
+            "highest_score": best_score,
+            "lowest_score": float(totals.min()) if size else 0
+        }
+    
+    def search_top_markets(self, industry: str, k: int = 20, district: str = None, market_type: str = None,
+                           min_score: float = None, weights: Dict[str, Any] = None) -> Dict[str, Any]:
+        """전체 상권 중 업종 점수 상위 k개 (상권의 지역구를 지역 요인으로 사용)
+        
+        필터(지역구, 상권 유형)는 점수 계산 전에, 최저 점수는 계산 후에 적용하고
+        argpartition으로 상위 k개만 골라 정렬합니다. weights를 주면 what-if와 같은 방식으로 가중치를 덮어씁니다.
+        """
+        if weights:
+            error = self._validate_weight_set(weights)
+            if error:
+                return {"error": f"weights: {error}"}
+        
+        universe = self._get_market_universe()
+        if universe is None:
+            return {"error": "점수를 계산할 상권이 없습니다."}
+        
+        mask = np.ones(len(universe["market_codes"]), dtype=bool)
+        if district:
+            mask &= universe["district_names"] == district
+        if market_type:
+            mask &= universe["market_types"] == market_type
+        candidates = np.flatnonzero(mask)
+        size = len(candidates)
+        
+        if size:
+            market_codes = universe["market_codes"][candidates].tolist()
+            regions = universe["district_names"][candidates].tolist()
+            if weights:
+                rows = self.engine.score_rows_weighted(market_codes, [industry] * size, regions, weights)
+                group_totals = rows["group_totals"]
+            else:
+                rows = self.engine.score_rows(market_codes, [industry] * size, regions)
+                group_totals = np.stack(
+                    [rows["market"]["total"], rows["industry"]["total"], rows["regional"]["total"]], axis=1
+                )
+            totals = rows["total"]
+        else:
+            totals = np.array([], dtype=np.float64)
+        
+        # 최저 점수 필터 후 상위 k개 선택 (점수 내림차순, 동점은 상권 목록 순서)
+        eligible = np.flatnonzero(totals >= min_score) if min_score is not None else np.arange(size)
+        k = max(0, min(k, len(eligible)))
+        if 0 < k < len(eligible):
+            top = eligible[np.argpartition(-totals[eligible], k - 1)[:k]]
+            threshold = totals[top].min()
+            top = eligible[totals[eligible] >= threshold]
+        else:
+            top = eligible
+        order = top[np.lexsort((top, -totals[top]))][:k]
+        
+        results = []
+        for rank, i in enumerate(order, start=1):
+            market = candidates[i]
+            results.append({
+                "rank": rank,
+                "market_code": str(universe["market_codes"][market]),
+                "market_name": str(universe["market_names"][market]),
+                "district_name": str(universe["district_names"][market]),
+                "market_type": str(universe["market_types"][market]),
+                "total_score": float(totals[i]),
+                "grade": str(rows["grades"][i]),
+                "group_scores": {
+                    group: float(group_totals[i, g]) for g, group in enumerate(GROUP_NAMES)
+                }
+            })
+        
+        return {
+            "industry": industry,
+            "filters": {"district": district, "market_type": market_type, "min_score": min_score},
+            "evaluated_markets": size,
+            "matched_markets": int(len(eligible)),
+            "results": results
+        }
+    
+    def _get_market_universe(self) -> Optional[Dict[str, Any]]:
+        """상권 데이터 → 검색용 배열 (상권 코드, 이름, 지역구, 유형)"""
+        df = self.data_loader.load_market_data()
+        if df.empty:
+            return None
+        universe = self._market_universe
+        if universe is not None and universe["source"] is df:
+            return universe
+        
+        universe = {
+            "source": df,
+            "market_codes": df['market_code'].astype(str).to_numpy(dtype=object),
+            "market_names": df['market_name'].astype(str).to_numpy(dtype=object),
+            "district_names": df['district_name'].astype(str).to_numpy(dtype=object),
+            "market_types": df['market_type'].astype(str).to_numpy(dtype=object)
+        }
+        universe["district_by_code"] = dict(zip(universe["market_codes"], universe["district_names"]))
+        self._market_universe = universe
+        return universe
+    
+    def get_score_distribution(self, industry: str, region: str) -> Optional[ScoreDistribution]:
+        """(업종, 지역) 상권 점수 분포 - 가중치/상권 목록이 바뀌거나 의존성 그래프로 무효화되면 재구성
+        
+        해당 지역구 상권이 있으면 그 상권들, 없으면 전체 상권을 해당 지역 요인으로 계산합니다.
+        """
+        universe = self._get_market_universe()
+        if universe is None:
+            return None
+        
+        key = (industry, region)
+        with self._distribution_lock:
+            entry = self._distributions.get(key)
+            if entry is not None and entry[0] == self._weights_hash and entry[1] is universe:
+                return entry[2]
+            
+            in_region = universe["district_names"] == region
+            scope = "district" if in_region.any() else "all"
+            market_codes = universe["market_codes"][in_region] if scope == "district" else universe["market_codes"]
+            size = len(market_codes)
+            rows = self.engine.score_rows(market_codes.tolist(), [industry] * size, [region] * size)
+            distribution = ScoreDistribution(rows["total"], scope)
+            self._distributions[key] = (self._weights_hash, universe, distribution)
+            return distribution
+    
+    def refresh_distributions(self, industries: List[str] = None, regions: List[str] = None) -> int:
+        """(업종, 지역) 점수 분포 일괄 구성 - 구성된 분포 수 반환"""
+        count = 0
+        for industry in industries or list(self.engine.industry_factors):
+            for region in regions or list(self.engine.regional_factors):
+                if self.get_score_distribution(industry, region) is not None:
+                    count += 1
+        return count
+    
+    def get_distribution_summary(self, industry: str, region: str, bins: int = DEFAULT_HISTOGRAM_BINS,
+                                 market_code: str = None) -> Dict[str, Any]:
+        """차트용 점수 분포 히스토그램 (market_code를 주면 해당 상권 위치 포함)"""
+        distribution = self.get_score_distribution(industry, region)
+        if distribution is None:
+            return {"error": "점수 분포를 계산할 상권이 없습니다."}
+        
+        result = {"industry": industry, "region": region, **distribution.summary(bins)}
+        if market_code:
+            score = self.calculate_market_score(market_code, industry, region)
+            if "error" in score:
+                return score
+            result["market"] = {"market_code": market_code, "total_score": score["total_score"], **distribution.position(score["total_score"])}
+        return result
+    
+    def _market_position(self, industry: str, region: str, total_score: float) -> Optional[Dict[str, Any]]:
+        """점수 분포 내 백분위/순위 (분포가 없으면 None)"""
+        distribution = self.get_score_distribution(industry, region)
+        return distribution.position(total_score) if distribution is not None else None
+    
+    def what_if(self, market_code: str, industry: str, region: str,
+                weight_sets: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """대체 가중치 세트별 점수/등급/순위와 가중치 민감도
+        
+        요인 점수 벡터를 한 번 계산한 뒤 모든 가중치 세트를 행렬곱 한 번으로 평가합니다.
+        응답의 factor_scores로 클라이언트에서도 같은 식(그룹별 가중합 → 반올림 → 그룹 가중합)으로 재계산할 수 있습니다.
+        """
+        if len(weight_sets) > MAX_WHAT_IF_WEIGHT_SETS:
+            return {"error": f"가중치 세트는 최대 {MAX_WHAT_IF_WEIGHT_SETS}개까지 가능합니다."}
+        for i, weight_set in enumerate(weight_sets):
+            error = self._validate_weight_set(weight_set)
+            if error:
+                return {"error": f"weight_sets[{i}]: {error}"}
+        
+        baseline = self.calculate_market_score(market_code, industry, region)
+        if "error" in baseline:
+            return baseline
+        
+        factors = self.engine.factor_vectors([market_code], [industry], [region])[0]
+        # 0번은 현재 가중치 (민감도 기준)
+        factor_weights, group_weights = self.engine.weight_tensor([{}] + list(weight_sets))
+        evaluation = self.engine.evaluate_weight_sets(factors, factor_weights, group_weights)
+        
+        totals = evaluation["total"][1:]
+        ranks = np.empty(len(totals), dtype=np.int64)
+        ranks[np.argsort(-totals, kind='stable')] = np.arange(1, len(totals) + 1)
+        
+        results = []
+        for i, weight_set in enumerate(weight_sets):
+            results.append({
+                "name": weight_set.get("name", f"set_{i + 1}"),
+                "total_score": float(totals[i]),
+                "grade": str(evaluation["grades"][i + 1]),
+                "rank": int(ranks[i]),
+                "delta_from_baseline": round(float(totals[i]) - baseline["total_score"], 1),
+                "group_scores": {
+                    group: float(evaluation["group_totals"][i + 1, g]) for g, group in enumerate(GROUP_NAMES)
+                }
+            })
+        
+        return {
+            "market_code": market_code,
+            "industry": industry,
+            "region": region,
+            "baseline": {"total_score": baseline["total_score"], "grade": baseline["grade"]},
+            "baseline_weights": dict(self.weights, group_weights=dict(zip(GROUP_NAMES, GROUP_WEIGHTS))),
+            "factor_scores": self._by_factor(factors, 2),
+            "sensitivity": {
+                "factors": self._by_factor(evaluation["factor_sensitivity"][0], 3),
+                "groups": {
+                    group: round(float(evaluation["group_sensitivity"][0, g]), 3) for g, group in enumerate(GROUP_NAMES)
+                }
+            },
+            "results": results
+        }
+    
+    def _validate_weight_set(self, weight_set: Any) -> Optional[str]:
+        """가중치 세트 형식 검증 - 오류 메시지 또는 None"""
+        if not isinstance(weight_set, dict):
+            return "가중치 세트는 객체여야 합니다."
+        for group, values in weight_set.items():
+            if group == "name":
+                continue
+            valid_keys = GROUP_NAMES if group == "group_weights" else FACTOR_LAYOUT.get(group)
+            if valid_keys is None:
+                return f"알 수 없는 가중치 그룹입니다: {group}"
+            if not isinstance(values, dict):
+                return f"{group}는 객체여야 합니다."
+            for key, value in values.items():
+                if key not in valid_keys:
+                    return f"알 수 없는 가중치 항목입니다: {group}.{key}"
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0 or not math.isfinite(value):
+                    return f"{group}.{key}는 0 이상의 숫자여야 합니다."
+        
+        # 정규화할 수 있도록 그룹별 가중치 합이 0보다 커야 함
+        for group in GROUP_NAMES:
+            merged = dict(self.weights[group], **(weight_set.get(group) or {}))
+            if sum(merged.values()) <= 0:
+                return f"{group} 가중치 합이 0입니다."
+        merged = dict(zip(GROUP_NAMES, GROUP_WEIGHTS), **(weight_set.get("group_weights") or {}))
+        if sum(merged.values()) <= 0:
+            return "group_weights 합이 0입니다."
+        return None
+    
+    def _by_factor(self, values: np.ndarray, ndigits: int) -> Dict[str, Dict[str, float]]:
+        """FACTOR_KEYS 순서 벡터 → {그룹: {요인: 값}}"""
+        grouped: Dict[str, Dict[str, float]] = {group: {} for group in GROUP_NAMES}
+        for (group, factor), value in zip(FACTOR_KEYS, values):
+            grouped[group][factor] = round(float(value), ndigits)
+        return grouped
+    
+    def _build_score_result(self, rows: Dict[str, Any], i: int) -> Dict[str, Any]:
+        """일괄 계산 결과의 i번째 후보 → 단건 계산과 같은 결과 형식"""
+        market_score = {
+            "total": float(rows["market"]["total"][i]),
+            "population_density": round(float(rows["market"]["population_density"][i]), 1),
+            "competition_level": round(float(rows["market"]["competition_level"][i]), 1),
+            "accessibility": round(75, 1),
+            "rent_cost": round(float(rows["market"]["rent_cost"][i]), 1),
+            "foot_traffic": round(65, 1)
+        }
+        industry_score = {
+            name: float(rows["industry"][name][i])
+            for name in ("total", "survival_rate", "growth_potential", "risk_level", "competition_intensity")
+        }
+        regional_score = {
+            name: float(rows["regional"][name][i])
+            for name in ("total", "economic_indicators", "demographics", "infrastructure")
+        }
+        return {
+            "total_score": float(rows["total"][i]),
+            "grade": str(rows["grades"][i]),
+            "market_score": market_score,
+            "industry_score": industry_score,
+            "regional_score": regional_score,
+            "recommendations": self._generate_recommendations(market_score, industry_score, regional_score),
+            "risk_assessment": self._assess_risk(market_score, industry_score, regional_score)
+        }
+    
     def _get_market_data(self, market_code: str) -> Optional[Dict[str, Any]]:
         """상권 데이터 조회"""
         market_data = self.data_loader.get_market_by_code(market_code)
@@ -90,119 +624,28 @@ class ScoringService:
     def _get_industry_data(self, industry: str) -> Dict[str, Any]:
         """업종 데이터 조회 (샘플 데이터)"""
         # 실제로는 industry_analysis API에서 데이터를 가져와야 함
-        industry_data = {
-            "survival_rate": {
-                "식음료업": 75.0,
-                "쇼핑업": 65.0,
-                "숙박업": 70.0,
-                "여가서비스업": 60.0,
-                "운송업": 80.0,
-                "의료업": 85.0,
-                "교육업": 90.0,
-                "문화업": 55.0,
-                "스포츠업": 65.0,
-                "기타서비스업": 70.0
-            }.get(industry, 70.0),
-            "growth_potential": {
-                "식음료업": 0.7,
-                "쇼핑업": 0.5,
-                "숙박업": 0.6,
-                "여가서비스업": 0.8,
-                "운송업": 0.4,
-                "의료업": 0.9,
-                "교육업": 0.8,
-                "문화업": 0.6,
-                "스포츠업": 0.7,
-                "기타서비스업": 0.6
-            }.get(industry, 0.6),
-            "risk_level": {
-                "식음료업": 0.3,
-                "쇼핑업": 0.5,
-                "숙박업": 0.4,
-                "여가서비스업": 0.6,
-                "운송업": 0.2,
-                "의료업": 0.1,
-                "교육업": 0.1,
-                "문화업": 0.7,
-                "스포츠업": 0.5,
-                "기타서비스업": 0.4
-            }.get(industry, 0.4),
-            "competition_intensity": {
-                "식음료업": 0.7,
-                "쇼핑업": 0.8,
-                "숙박업": 0.6,
-                "여가서비스업": 0.5,
-                "운송업": 0.4,
-                "의료업": 0.3,
-                "교육업": 0.4,
-                "문화업": 0.6,
-                "스포츠업": 0.5,
-                "기타서비스업": 0.6
-            }.get(industry, 0.5)
-        }
-        return industry_data
+        return dict(self.engine.industry_factors.get(industry, DEFAULT_INDUSTRY_FACTORS))
     
     def _get_regional_data(self, region: str) -> Dict[str, Any]:
         """지역 데이터 조회 (샘플 데이터)"""
-        regional_data = {
-            "동구": {
-                "population_density": 2800,
-                "economic_growth": 1.8,
-                "unemployment_rate": 3.2,
-                "average_income": 2800000,
-                "infrastructure_score": 0.7
-            },
-            "서구": {
-                "population_density": 3200,
-                "economic_growth": 2.1,
-                "unemployment_rate": 2.8,
-                "average_income": 3200000,
-                "infrastructure_score": 0.8
-            },
-            "유성구": {
-                "population_density": 1800,
-                "economic_growth": 2.8,
-                "unemployment_rate": 2.1,
-                "average_income": 3800000,
-                "infrastructure_score": 0.9
-            },
-            "중구": {
-                "population_density": 4500,
-                "economic_growth": 1.5,
-                "unemployment_rate": 3.5,
-                "average_income": 3000000,
-                "infrastructure_score": 0.8
-            },
-            "대덕구": {
-                "population_density": 1200,
-                "economic_growth": 2.3,
-                "unemployment_rate": 2.5,
-                "average_income": 3500000,
-                "infrastructure_score": 0.7
-            }
-        }.get(region, {
-            "population_density": 2500,
-            "economic_growth": 2.0,
-            "unemployment_rate": 3.0,
-            "average_income": 3000000,
-            "infrastructure_score": 0.7
-        })
-        return regional_data
-    
-    def _calculate_market_factors_score(self, market_data: Dict[str, Any], regional_data: Dict[str, Any]) -> Dict[str, Any]:
+        return dict(self.engine.regional_factors.get(region, DEFAULT_REGIONAL_FACTORS))
+    
+    def _calculate_market_factors_score(self, market_data: Dict[str, Any], regional_data: Dict[str, Any],
+                                        industry: str = None) -> Dict[str, Any]:
         """상권 요인 점수 계산"""
         # 인구 밀도 점수 (0-100)
         population_density = regional_data.get("population_density", 2500)
         population_score = min(100, (population_density / 5000) * 100)
         
         # 경쟁 수준 점수 (상권 밀도 기반, 낮을수록 좋음)
-        competition_score = 70  # 기본값, 실제로는 상권 밀도 계산
+        competition_score = self._calculate_competition_score(market_data.get("market_code"), industry)
         
         # 접근성 점수 (교통편, 지하철역 등)
         accessibility_score = 75  # 기본값
         
-        # 임대료 점수 (낮을수록 좋음)
-        rent_score = 60  # 기본값, 실제로는 지역별 임대료 비교
+        # 임대료 점수 (지역 상업용 임대료가 낮을수록 좋음)
+        rent_per_sqm = regional_data.get("commercial_rent_per_sqm", DEFAULT_REGIONAL_FACTORS["commercial_rent_per_sqm"])
+        rent_cost_score = float(rent_score(rent_per_sqm))
         
         # 유동인구 점수
         foot_traffic_score = 65  # 기본값
@@ -212,7 +655,7 @@ class ScoringService:
             population_score * self.weights["market_factors"]["population_density"] +
             competition_score * self.weights["market_factors"]["competition_level"] +
             accessibility_score * self.weights["market_factors"]["accessibility"] +
-            rent_score * self.weights["market_factors"]["rent_cost"] +
+            rent_cost_score * self.weights["market_factors"]["rent_cost"] +
             foot_traffic_score * self.weights["market_factors"]["foot_traffic"]
         )
         
@@ -221,10 +664,14 @@ class ScoringService:
             "population_density": round(population_score, 1),
             "competition_level": round(competition_score, 1),
             "accessibility": round(accessibility_score, 1),
-            "rent_cost": round(rent_score, 1),
+            "rent_cost": round(rent_cost_score, 1),
             "foot_traffic": round(foot_traffic_score, 1)
         }
     
+    def _calculate_competition_score(self, market_code: str, industry: str = None) -> float:
+        """동일 업종 사업체 밀도 기반 경쟁 점수 (집계 데이터가 없으면 기본값 70)"""
+        return competition_score(self.competition, market_code, industry)
+    
     def _calculate_industry_factors_score(self, industry_data: Dict[str, Any]) -> Dict[str, Any]:
         """업종 요인 점수 계산"""
         # 생존율 점수
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+공간 인덱스
+위경도 좌표를 평면(km)으로 투영한 등간격 격자 인덱스
+반경/최근접 조회 시 인접 격자만 탐색
+"""
+import math
+from typing import Dict, Tuple
+import numpy as np
+from services.geo_utils import EARTH_RADIUS_KM, distances_from_point
+
+
+class GridSpatialIndex:
+    """등간격 격자 공간 인덱스 (데이터셋 버전당 1회 생성)"""
+
+    def __init__(self, lats, lngs, cell_size_km: float = 1.0):
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lngs = np.asarray(lngs, dtype=np.float64)
+        self.cell_size_km = cell_size_km
+        self.size = len(self.lats)
+
+        # 데이터 중심 위도 기준 등장방형 투영
+        self.ref_lat = float(self.lats.mean()) if self.size else 0.0
+        self._x_scale = EARTH_RADIUS_KM * math.cos(math.radians(self.ref_lat)) * math.pi / 180
+        self._y_scale = EARTH_RADIUS_KM * math.pi / 180
+
+        self._cells: Dict[Tuple[int, int], np.ndarray] = {}
+        if self.size:
+            cx, cy = self._cell_of(self.lats, self.lngs)
+            order = np.lexsort((cy, cx))
+            keys = np.stack([cx[order], cy[order]], axis=1)
+            boundaries = np.flatnonzero(np.any(np.diff(keys, axis=0) != 0, axis=1)) + 1
+            for group in np.split(order, boundaries):
+                self._cells[(int(cx[group[0]]), int(cy[group[0]]))] = group
+
+    def query_radius(self, lat: float, lng: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """반경 내 지점 조회 - (인덱스, 거리 km), 거리 오름차순"""
+        if not self.size or radius_km < 0:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float64)
+
+        # 반경을 감싸는 위경도 범위 → 격자 범위
+        dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+        max_abs_lat = min(89.9, abs(lat) + dlat)
+        dlng = math.degrees(radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(max_abs_lat))))
+        min_cx, min_cy = self._cell_of(lat - dlat, lng - dlng)
+        max_cx, max_cy = self._cell_of(lat + dlat, lng + dlng)
+
+        candidates = self._collect(int(min_cx), int(max_cx), int(min_cy), int(max_cy))
+        if not len(candidates):
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float64)
+
+        distances = distances_from_point(lat, lng, self.lats[candidates], self.lngs[candidates])
+        mask = distances <= radius_km
+        candidates, distances = candidates[mask], distances[mask]
+        order = np.argsort(distances, kind='stable')
+        return candidates[order], distances[order]
+
+    def query_bbox(self, min_lng: float, min_lat: float, max_lng: float, max_lat: float) -> np.ndarray:
+        """경계 상자 내 지점 인덱스 (원래 순서)"""
+        if not self.size:
+            return np.array([], dtype=np.int64)
+
+        min_cx, min_cy = self._cell_of(min_lat, min_lng)
+        max_cx, max_cy = self._cell_of(max_lat, max_lng)
+        candidates = self._collect(int(min_cx), int(max_cx), int(min_cy), int(max_cy))
+        if not len(candidates):
+            return candidates
+
+        lats, lngs = self.lats[candidates], self.lngs[candidates]
+        mask = (lngs >= min_lng) & (lngs <= max_lng) & (lats >= min_lat) & (lats <= max_lat)
+        return np.sort(candidates[mask])
+
+    def query_nearest(self, lat: float, lng: float, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """최근접 k개 지점 조회 - (인덱스, 거리 km), 거리 오름차순"""
+        k = min(k, self.size)
+        if k <= 0:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float64)
+
+        # 후보가 k개 이상 모일 때까지 격자 고리를 넓힌 뒤, k번째 거리로 반경 조회하여 정확도 보장
+        cx, cy = (int(v) for v in self._cell_of(lat, lng))
+        ring = 0
+        candidates = np.array([], dtype=np.int64)
+        while len(candidates) < k:
+            candidates = self._collect(cx - ring, cx + ring, cy - ring, cy + ring)
+            ring += 1
+
+        distances = distances_from_point(lat, lng, self.lats[candidates], self.lngs[candidates])
+        kth_distance = float(np.partition(distances, k - 1)[k - 1])
+
+        indices, distances = self.query_radius(lat, lng, kth_distance)
+        return indices[:k], distances[:k]
+
+    def _cell_of(self, lats, lngs):
+        cx = np.floor(np.asarray(lngs) * self._x_scale / self.cell_size_km).astype(np.int64)
+        cy = np.floor(np.asarray(lats) * self._y_scale / self.cell_size_km).astype(np.int64)
+        return cx, cy
+
+    def _collect(self, min_cx: int, max_cx: int, min_cy: int, max_cy: int) -> np.ndarray:
+        """격자 범위 내 지점 인덱스 수집"""
+        # 격자 범위가 전체 셀 수보다 크면 셀 목록을 직접 순회
+        if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) > len(self._cells):
+            groups = [
+                indices for (x, y), indices in self._cells.items()
+                if min_cx <= x <= max_cx and min_cy <= y <= max_cy
+            ]
+        else:
+            groups = [
+                self._cells[(x, y)]
+                for x in range(min_cx, max_cx + 1)
+                for y in range(min_cy, max_cy + 1)
+                if (x, y) in self._cells
+            ]
+        if not groups:
+            return np.array([], dtype=np.int64)
+        return np.concatenate(groups)
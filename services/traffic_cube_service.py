@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+유동인구 큐브 서비스
+FootTrafficData를 상권 × 요일 × 시간 × 인구통계 큐브로 사전 집계하는 서비스
+(FootTrafficData 변경이 커밋되면 다음 조회 시 재집계)
+"""
+import threading
+from typing import Dict, List, Any, Optional
+import numpy as np
+from flask import has_app_context
+from sqlalchemy import func, event
+from sqlalchemy.orm import Session, object_session
+from extensions import db
+from models import CommercialArea, FootTrafficData
+from services.score_dependency_graph import score_dependencies
+
+WEEKDAY_NAMES = ["월", "화", "수", "목", "금", "토", "일"]
+
+# 큐브 마지막 축 채널 구성
+CHANNELS = [
+    "foot_traffic",
+    "age_20s", "age_30s", "age_40s", "age_50s", "age_60s",
+    "male", "female",
+    "dwell_time_x10",  # 유동인구 가중 평균 체류시간 (0.1분 단위)
+    "samples"          # 집계된 원본 행 수
+]
+CH_TRAFFIC = 0
+CH_AGE = slice(1, 6)
+CH_GENDER = slice(6, 8)
+CH_DWELL = 8
+CH_SAMPLES = 9
+
+AGE_LABELS = ["20대", "30대", "40대", "50대", "60대 이상"]
+
+INT32_MAX = np.iinfo(np.int32).max
+
+
+class TrafficCubeService:
+    """상권별 요일×시간 유동인구 큐브 (상권당 고정 크기 int32 배열)"""
+
+    SHAPE = (7, 24, len(CHANNELS))
+
+    def __init__(self):
+        self._cubes: Dict[str, np.ndarray] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+        # 최초/재집계가 동시에 여러 번 실행되지 않도록 직렬화
+        self._load_lock = threading.Lock()
+        # FootTrafficData를 변경한 커밋 전 세션 id
+        self._dirty_sessions = set()
+        # 재집계/초기화마다 증가 (파생 캐시 무효화용)
+        self.version = 0
+
+    def refresh(self) -> int:
+        """큐브 전체 재집계 - 집계된 상권 수 반환
+
+        커밋된 데이터만 집계하도록 요청 세션과 별도의 세션으로 조회
+        """
+        with Session(db.engine) as session:
+            return self._refresh(session)
+
+    def _refresh(self, session: Session) -> int:
+        # 집계 중 변경이 커밋되면 버전이 바뀌므로 결과를 만료 상태로 둠
+        started_version = self.version
+        traffic = FootTrafficData
+        rows = session.query(
+            traffic.area_id,
+            traffic.day_of_week,
+            traffic.hour,
+            func.sum(traffic.foot_traffic_count),
+            func.sum(traffic.age_20s),
+            func.sum(traffic.age_30s),
+            func.sum(traffic.age_40s),
+            func.sum(traffic.age_50s),
+            func.sum(traffic.age_60s),
+            func.sum(traffic.male_count),
+            func.sum(traffic.female_count),
+            func.sum(traffic.dwell_time_avg * traffic.foot_traffic_count),
+            func.count(traffic.id)
+        ).group_by(traffic.area_id, traffic.day_of_week, traffic.hour).all()
+
+        area_codes = dict(session.query(CommercialArea.id, CommercialArea.area_code).all())
+
+        cubes: Dict[str, np.ndarray] = {}
+        if rows:
+            values = np.array([[v or 0 for v in row] for row in rows], dtype=np.float64)
+            area_ids, area_index = np.unique(values[:, 0].astype(np.int64), return_inverse=True)
+            dow = values[:, 1].astype(np.int64)
+            hour = values[:, 2].astype(np.int64)
+
+            # 범위를 벗어난 요일/시간은 버림
+            valid = (dow >= 0) & (dow < 7) & (hour >= 0) & (hour < 24)
+
+            stacked = np.zeros((len(area_ids),) + self.SHAPE, dtype=np.float64)
+            channel_values = np.empty((len(values), len(CHANNELS)), dtype=np.float64)
+            channel_values[:, CH_TRAFFIC] = values[:, 3]
+            channel_values[:, 1:8] = values[:, 4:11]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                channel_values[:, CH_DWELL] = np.where(values[:, 3] > 0, values[:, 11] / values[:, 3] * 10, 0)
+            channel_values[:, CH_SAMPLES] = values[:, 12]
+
+            stacked[area_index[valid], dow[valid], hour[valid]] = channel_values[valid]
+            stacked = np.clip(np.rint(stacked), 0, INT32_MAX).astype(np.int32)
+
+            for i, area_id in enumerate(area_ids):
+                area_code = area_codes.get(int(area_id))
+                if area_code is not None:
+                    cubes[str(area_code)] = stacked[i]
+
+        with self._lock:
+            self._cubes = cubes
+            self._loaded = self.version == started_version
+            self.version += 1
+
+        score_dependencies.notify("foot_traffic_data", {"all": True})
+        return len(cubes)
+
+    def get_cube(self, area_code: str) -> Optional[np.ndarray]:
+        """상권 큐브 조회 (7 × 24 × 채널)"""
+        self._ensure_loaded()
+        cube = self._cubes.get(str(area_code))
+        if cube is None or cube[:, :, CH_TRAFFIC].sum() == 0:
+            return None
+        return cube
+
+    def all_cubes(self) -> Dict[str, np.ndarray]:
+        """전체 상권 큐브 (상권 코드 → 큐브)"""
+        self._ensure_loaded()
+        return self._cubes
+
+    def has_area(self, area_code: str) -> bool:
+        """큐브 데이터 보유 여부"""
+        return self.get_cube(area_code) is not None
+
+    def hourly_profile(self, area_code: str, day_of_week: int = None) -> Optional[np.ndarray]:
+        """시간대별 유동인구 합계 (24,)"""
+        cube = self.get_cube(area_code)
+        if cube is None:
+            return None
+        if day_of_week is not None:
+            return cube[day_of_week, :, CH_TRAFFIC].astype(np.int64)
+        return cube[:, :, CH_TRAFFIC].sum(axis=0, dtype=np.int64)
+
+    def weekday_profile(self, area_code: str) -> Optional[np.ndarray]:
+        """요일별 유동인구 합계 (7,)"""
+        cube = self.get_cube(area_code)
+        if cube is None:
+            return None
+        return cube[:, :, CH_TRAFFIC].sum(axis=1, dtype=np.int64)
+
+    def peak_hours(self, area_code: str, top_n: int = 3) -> List[Dict[str, Any]]:
+        """유동인구 상위 시간대"""
+        profile = self.hourly_profile(area_code)
+        if profile is None:
+            return []
+
+        top_n = min(top_n, len(profile))
+        top = np.argpartition(-profile, top_n - 1)[:top_n]
+        top = top[np.argsort(-profile[top], kind='stable')]
+        return [{"hour": int(h), "traffic": int(profile[h])} for h in top]
+
+    def peak_windows(self, area_code: str, window: int = 2, count: int = 2) -> List[str]:
+        """겹치지 않는 피크 시간 구간 (예: '12:00-14:00')"""
+        profile = self.hourly_profile(area_code)
+        if profile is None:
+            return []
+
+        window_sums = np.convolve(profile, np.ones(window, dtype=np.int64), mode='valid')
+        windows = []
+        for start in np.argsort(-window_sums, kind='stable'):
+            if all(abs(int(start) - taken) >= window for taken in windows):
+                windows.append(int(start))
+            if len(windows) == count:
+                break
+
+        return [f"{start:02d}:00-{start + window:02d}:00" for start in sorted(windows)]
+
+    def demographic_mix(self, area_code: str, day_of_week: int = None, hour: int = None) -> Optional[Dict[str, Any]]:
+        """연령/성별 구성비 (%)"""
+        cube = self.get_cube(area_code)
+        if cube is None:
+            return None
+
+        cells = cube
+        if day_of_week is not None:
+            cells = cells[day_of_week:day_of_week + 1]
+        if hour is not None:
+            cells = cells[:, hour:hour + 1]
+
+        ages = cells[:, :, CH_AGE].sum(axis=(0, 1), dtype=np.int64)
+        genders = cells[:, :, CH_GENDER].sum(axis=(0, 1), dtype=np.int64)
+        age_total = int(ages.sum())
+        gender_total = int(genders.sum())
+
+        return {
+            "age": {
+                label: round(int(count) / age_total * 100, 1) if age_total else 0.0
+                for label, count in zip(AGE_LABELS, ages)
+            },
+            "gender": {
+                "male": round(int(genders[0]) / gender_total * 100, 1) if gender_total else 0.0,
+                "female": round(int(genders[1]) / gender_total * 100, 1) if gender_total else 0.0
+            }
+        }
+
+    def average_dwell_time(self, area_code: str) -> Optional[float]:
+        """유동인구 가중 평균 체류시간 (분)"""
+        cube = self.get_cube(area_code)
+        if cube is None:
+            return None
+        traffic = cube[:, :, CH_TRAFFIC].astype(np.float64)
+        return round(float((cube[:, :, CH_DWELL] * traffic).sum() / traffic.sum()) / 10, 1)
+
+    def weekend_ratio(self, area_code: str) -> Optional[float]:
+        """주말/평일 시간당 평균 유동인구 비율"""
+        cube = self.get_cube(area_code)
+        if cube is None:
+            return None
+
+        traffic = cube[:, :, CH_TRAFFIC].sum(axis=1, dtype=np.int64)
+        samples = cube[:, :, CH_SAMPLES].sum(axis=1, dtype=np.int64)
+        weekday_samples = samples[:5].sum()
+        weekend_samples = samples[5:].sum()
+        if not weekday_samples or not weekend_samples:
+            return None
+
+        weekday_avg = traffic[:5].sum() / weekday_samples
+        weekend_avg = traffic[5:].sum() / weekend_samples
+        if not weekday_avg:
+            return None
+        return round(float(weekend_avg / weekday_avg), 2)
+
+    def _ensure_loaded(self):
+        """최초 조회 또는 데이터 변경 후 조회 시 큐브 집계 (실패하면 다음 조회 때 재시도)"""
+        if self._loaded or not has_app_context():
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"유동인구 큐브 집계 실패: {e}")
+
+    def clear_cache(self):
+        """캐시 초기화"""
+        with self._lock:
+            self._cubes = {}
+            self._loaded = False
+            self.version += 1
+        score_dependencies.notify("foot_traffic_data", {"all": True})
+
+    def record_change(self, session: Session):
+        """FootTrafficData 변경 세션 기록"""
+        with self._lock:
+            self._dirty_sessions.add(id(session))
+
+    def apply_pending(self, session: Session):
+        """변경이 커밋되면 큐브를 만료시켜 다음 조회 때 재집계 (파생 캐시는 즉시 무효화)"""
+        with self._lock:
+            if id(session) not in self._dirty_sessions:
+                return
+            self._dirty_sessions.discard(id(session))
+            self._loaded = False
+            self.version += 1
+        score_dependencies.notify("foot_traffic_data", {"all": True})
+
+    def discard_pending(self, session: Session):
+        """롤백된 세션 기록 폐기"""
+        with self._lock:
+            self._dirty_sessions.discard(id(session))
+
+
+# 서비스 간 공유하는 인스턴스 (유동인구 변경 이벤트 수신)
+traffic_cube = TrafficCubeService()
+
+
+@event.listens_for(FootTrafficData, "after_insert")
+@event.listens_for(FootTrafficData, "after_update")
+@event.listens_for(FootTrafficData, "after_delete")
+def _on_traffic_change(mapper, connection, target):
+    traffic_cube.record_change(object_session(target))
+
+
+@event.listens_for(Session, "after_commit")
+def _on_commit(session):
+    traffic_cube.apply_pending(session)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _on_rollback(session, previous_transaction):
+    traffic_cube.discard_pending(session)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+유동인구 흐름 프로필 서비스
+유동인구 큐브에서 상권 × 기간(일간 24시간 / 주간 7일) 고정 길이 배열을 만들고
+피크 시간과 합계/평균/최저 시간을 재집계 시점에 한 번만 계산해 조회용으로 보관
+(FootTrafficData에는 이동 방향이 없어 유입/유출은 제공하지 않음)
+"""
+import threading
+from typing import Dict, Any, Tuple
+import numpy as np
+from services.traffic_cube_service import TrafficCubeService, WEEKDAY_NAMES, CH_TRAFFIC
+
+TIME_PERIODS = {
+    "daily": list(range(24)),
+    "weekly": WEEKDAY_NAMES
+}
+
+PEAK_COUNT = 3
+
+PEAK_RECOMMENDATIONS = {
+    "morning": "아침 시간대 유동인구가 높으므로 조식 메뉴나 커피 서비스를 고려하세요.",
+    "afternoon": "오후 시간대 유동인구가 높으므로 점심 메뉴나 쇼핑 서비스를 강화하세요.",
+    "evening": "저녁 시간대 유동인구가 높으므로 저녁 메뉴나 엔터테인먼트 서비스를 고려하세요."
+}
+
+
+def _sample_profiles() -> Dict[str, np.ndarray]:
+    """큐브 데이터가 없는 상권용 기본 패턴"""
+    daily = np.full(24, 1000 * 0.5)
+    daily[7:10] = 1000 * 1.5    # 출근 시간
+    daily[12:15] = 1000 * 2.0   # 점심 시간
+    daily[18:21] = 1000 * 1.8   # 퇴근 시간
+    daily[21:24] = 1000 * 1.2   # 저녁 시간
+    weekly = np.array([1.0, 1.0, 1.0, 1.0, 1.0, 1.3, 0.8]) * 5000
+    return {"daily": daily.astype(np.int64), "weekly": weekly.astype(np.int64)}
+
+
+def _peak_type(time: Any) -> str:
+    if isinstance(time, int) and 6 <= time <= 10:
+        return "morning"
+    if isinstance(time, int) and 12 <= time <= 16:
+        return "afternoon"
+    return "evening"
+
+
+class TrafficFlowService:
+    """상권별 흐름 프로필 사전 계산 및 조회"""
+
+    def __init__(self, traffic_cube: TrafficCubeService):
+        self.traffic_cube = traffic_cube
+        self._profiles: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._cube_version = None
+        self._lock = threading.Lock()
+
+        sample = _sample_profiles()
+        self._sample_profiles = {
+            period: self._build_profile(sample[period], period) for period in TIME_PERIODS
+        }
+
+    def get_profile(self, market_code: str, time_period: str = "daily") -> Dict[str, Any]:
+        """흐름 프로필 조회 (큐브 데이터가 없으면 기본 패턴)"""
+        self._ensure_current()
+        profile = self._profiles.get((str(market_code), time_period))
+        if profile is None:
+            profile = self._sample_profiles[time_period]
+        return profile
+
+    def refresh(self) -> int:
+        """큐브 기준 전체 프로필 재계산 - 계산된 상권 수 반환"""
+        cubes = self.traffic_cube.all_cubes()
+        version = self.traffic_cube.version
+
+        profiles = {}
+        codes = [code for code, cube in cubes.items() if cube[:, :, CH_TRAFFIC].sum() > 0]
+        if codes:
+            traffic = np.stack([cubes[code][:, :, CH_TRAFFIC] for code in codes]).astype(np.int64)
+            series = {
+                "daily": traffic.sum(axis=1),   # (상권, 24)
+                "weekly": traffic.sum(axis=2)   # (상권, 7)
+            }
+            for period, values in series.items():
+                for code, row in zip(codes, values):
+                    profiles[(code, period)] = self._build_profile(row, period)
+
+        with self._lock:
+            self._profiles = profiles
+            self._cube_version = version
+        return len(codes)
+
+    def _ensure_current(self):
+        """큐브가 재집계되었으면 프로필 재계산"""
+        self.traffic_cube.all_cubes()
+        if self._cube_version != self.traffic_cube.version:
+            self.refresh()
+
+    def _build_profile(self, values: np.ndarray, period: str) -> Dict[str, Any]:
+        """고정 길이 배열 → 흐름/피크 요약"""
+        labels = TIME_PERIODS[period]
+        values = np.asarray(values, dtype=np.int64)
+
+        peaks = np.argsort(-values, kind='stable')[:PEAK_COUNT]
+        peak_hours = [
+            {"time": labels[i], "traffic": int(values[i]), "peak_type": _peak_type(labels[i])}
+            for i in peaks
+        ]
+
+        return {
+            "traffic_flow": [
+                {"time": label, "traffic": int(traffic)}
+                for label, traffic in zip(labels, values)
+            ],
+            "peak_hours": peak_hours,
+            "flow_patterns": {
+                "total_traffic": int(values.sum()),
+                "average_traffic": round(float(values.mean()), 1),
+                "peak_time": labels[int(np.argmax(values))],
+                "lowest_time": labels[int(np.argmin(values))]
+            },
+            "recommendations": [PEAK_RECOMMENDATIONS[peak["peak_type"]] for peak in peak_hours]
+        }
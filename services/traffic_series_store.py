@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+유동인구 시계열 저장소
+상권 × 월 단위로 델타 인코딩된 int32 컬럼을 instance/ 아래 파일로 저장하고
+numpy 배열로 바로 읽어오는 압축 저장소
+(복원한 월 시계열은 바이트 한도 LRU로, 상권별 월 합계는 기록 시까지 캐시)
+상권은 프로세스에서 처음 조회될 때와 FootTrafficData 변경이 커밋된 뒤 조회될 때 DB에서 다시 변환
+(전체 사전 변환은 flask import-traffic-series)
+"""
+import os
+import io
+import re
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Dict, List, Optional, Set
+import numpy as np
+from flask import has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from extensions import db
+from models import CommercialArea, FootTrafficData
+from services.score_dependency_graph import score_dependencies
+
+FORMAT_VERSION = 1
+
+# 저장 컬럼 (모두 int32, 체류시간은 0.1분 단위)
+SERIES_COLUMNS = [
+    "foot_traffic_count",
+    "age_20s", "age_30s", "age_40s", "age_50s", "age_60s",
+    "male_count", "female_count",
+    "dwell_time_x10"
+]
+
+# 복원한 월 시계열 캐시 한도 (바이트)
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+# 파일 경로에 쓰이는 상권 코드 허용 형식
+AREA_CODE_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+def _valid_area_code(area_code) -> bool:
+    return AREA_CODE_PATTERN.fullmatch(str(area_code)) is not None
+
+
+def _delta_encode(values: np.ndarray) -> np.ndarray:
+    """첫 값 + 이웃 차분으로 인코딩"""
+    values = np.asarray(values, dtype=np.int64)
+    deltas = np.diff(values, prepend=0)
+    if deltas.size and (deltas.min() < np.iinfo(np.int32).min or deltas.max() > np.iinfo(np.int32).max):
+        raise ValueError("델타 값이 int32 범위를 벗어났습니다.")
+    return deltas.astype(np.int32)
+
+
+def _delta_decode(deltas: np.ndarray) -> np.ndarray:
+    """누적합으로 복원"""
+    return np.cumsum(deltas, dtype=np.int64).astype(np.int32)
+
+
+def _month_start(year: int, month: int) -> np.datetime64:
+    return np.datetime64(f"{year:04d}-{month:02d}", 'h')
+
+
+class TrafficSeriesStore:
+    """상권별 월 단위 유동인구 시계열 압축 저장소"""
+
+    def __init__(self, base_dir: str = None):
+        self.base_dir = base_dir or os.path.join(os.path.dirname(__file__), '..', 'instance', 'traffic_series')
+        self.max_cache_bytes = MAX_CACHE_BYTES
+        # 경로 → (시계열, 바이트 수), 최근 사용 순
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._cache_bytes = 0
+        # (상권 코드, 컬럼) → 월별 합계
+        self._totals: Dict[tuple, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        # DB와 동기화된 상권 코드, 커밋 후 다시 변환할 상권 id, 커밋 전 세션별 변경 상권 id
+        self._synced: Set[str] = set()
+        self._stale_area_ids: Set[int] = set()
+        self._pending: Dict[int, Set[int]] = {}
+        self._sync_lock = threading.Lock()
+
+    def write_month(self, area_code: str, year: int, month: int,
+                    hours: np.ndarray, columns: Dict[str, np.ndarray]) -> str:
+        """월 단위 시계열 저장
+
+        hours는 월 시작 시각 기준 경과 시간(시간 단위)이며 오름차순이어야 함
+        """
+        hours = np.asarray(hours, dtype=np.int64)
+        if hours.size and np.any(np.diff(hours) < 0):
+            raise ValueError("hours는 오름차순으로 정렬되어야 합니다.")
+
+        payload = {
+            "format_version": np.array([FORMAT_VERSION], dtype=np.int32),
+            "hours": _delta_encode(hours)
+        }
+        for column in SERIES_COLUMNS:
+            values = columns.get(column)
+            if values is None:
+                values = np.zeros(len(hours), dtype=np.int64)
+            values = np.asarray(values)
+            if len(values) != len(hours):
+                raise ValueError(f"{column} 길이가 hours와 다릅니다.")
+            payload[column] = _delta_encode(values)
+
+        path = self._month_path(area_code, year, month)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # 임시 파일에 쓴 뒤 교체하여 부분 기록 방지
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **payload)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(buffer.getvalue())
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._evict(path)
+            for key in [key for key in self._totals if key[0] == str(area_code)]:
+                del self._totals[key]
+
+        score_dependencies.notify("foot_traffic_data", {"market": [str(area_code)]})
+        return path
+
+    def read_month(self, area_code: str, year: int, month: int) -> Optional[Dict[str, np.ndarray]]:
+        """월 단위 시계열 조회 (timestamp: datetime64[h])"""
+        if not _valid_area_code(area_code):
+            return None
+        path = self._month_path(area_code, year, month)
+        with self._lock:
+            cached = self._cache.get(path)
+            if cached is not None:
+                self._cache.move_to_end(path)
+                return cached[0]
+
+        if not os.path.exists(path):
+            return None
+
+        with np.load(path) as archive:
+            hours = _delta_decode(archive["hours"]).astype(np.int64)
+            series = {
+                "timestamp": _month_start(year, month) + hours.astype('timedelta64[h]')
+            }
+            for column in SERIES_COLUMNS:
+                series[column] = _delta_decode(archive[column])
+
+        size = sum(values.nbytes for values in series.values())
+        with self._lock:
+            self._evict(path)
+            self._cache[path] = (series, size)
+            self._cache_bytes += size
+            while self._cache_bytes > self.max_cache_bytes and len(self._cache) > 1:
+                _, (_, evicted) = self._cache.popitem(last=False)
+                self._cache_bytes -= evicted
+        return series
+
+    def read_range(self, area_code: str, start: date, end: date,
+                   columns: List[str] = None) -> Dict[str, np.ndarray]:
+        """기간 [start, end) 시계열 조회"""
+        self._ensure_synced(area_code)
+        columns = columns or SERIES_COLUMNS
+        start_ts = np.datetime64(start, 'h')
+        end_ts = np.datetime64(end, 'h')
+
+        parts = []
+        for year, month in self._months_between(start, end):
+            series = self.read_month(area_code, year, month)
+            if series is None:
+                continue
+            mask = (series["timestamp"] >= start_ts) & (series["timestamp"] < end_ts)
+            parts.append({key: series[key][mask] for key in ["timestamp"] + columns})
+
+        if not parts:
+            result = {"timestamp": np.array([], dtype='datetime64[h]')}
+            result.update({column: np.array([], dtype=np.int32) for column in columns})
+            return result
+
+        return {key: np.concatenate([part[key] for part in parts]) for key in ["timestamp"] + columns}
+
+    def monthly_totals(self, area_code: str, column: str = "foot_traffic_count") -> Dict[str, int]:
+        """월별 합계 ('YYYY-MM' → 합계, 상권에 새 월이 기록될 때까지 캐시)"""
+        self._ensure_synced(area_code)
+        key = (str(area_code), column)
+        with self._lock:
+            cached = self._totals.get(key)
+        if cached is not None:
+            return dict(cached)
+
+        months = self.available_months(area_code)
+        totals = {}
+        for year, month in months:
+            series = self.read_month(area_code, year, month)
+            if series is not None and len(series[column]):
+                totals[f"{year:04d}-{month:02d}"] = int(series[column].sum(dtype=np.int64))
+
+        # 저장된 파일이 있는 상권만 캐시 (임의 코드 조회로 캐시가 커지지 않도록)
+        if months:
+            with self._lock:
+                self._totals[key] = totals
+        return dict(totals)
+
+    def available_months(self, area_code: str) -> List[tuple]:
+        """저장된 (연, 월) 목록"""
+        if not _valid_area_code(area_code):
+            return []
+        area_dir = os.path.join(self.base_dir, str(area_code))
+        if not os.path.isdir(area_dir):
+            return []
+
+        months = []
+        for name in os.listdir(area_dir):
+            if not name.endswith('.npz'):
+                continue
+            try:
+                year, month = name[:-4].split('-')
+                months.append((int(year), int(month)))
+            except ValueError:
+                continue
+        return sorted(months)
+
+    def import_from_db(self, area_code: str = None) -> int:
+        """FootTrafficData를 월 단위 파일로 변환 - 기록한 파일 수 반환
+
+        상권별로 전체 월을 다시 쓰고 더 이상 데이터가 없는 월 파일은 삭제하며,
+        커밋된 데이터만 변환하도록 요청 세션과 별도의 세션으로 조회
+        """
+        with Session(db.engine) as session:
+            return self._import_areas(session, area_code)
+
+    def _import_areas(self, session: Session, area_code: Optional[str]) -> int:
+        traffic = FootTrafficData
+        areas = session.query(CommercialArea.id, CommercialArea.area_code)
+        if area_code:
+            areas = areas.filter(CommercialArea.area_code == str(area_code))
+
+        written = 0
+        for area_id, code in areas.all():
+            code = str(code)
+            if not _valid_area_code(code):
+                print(f"유동인구 시계열 변환 건너뜀 (잘못된 상권 코드): {code!r}")
+                continue
+            with self._lock:
+                self._stale_area_ids.discard(area_id)
+
+            rows = session.query(
+                traffic.date,
+                traffic.hour,
+                traffic.foot_traffic_count,
+                traffic.age_20s,
+                traffic.age_30s,
+                traffic.age_40s,
+                traffic.age_50s,
+                traffic.age_60s,
+                traffic.male_count,
+                traffic.female_count,
+                traffic.dwell_time_avg
+            ).filter(traffic.area_id == area_id).order_by(traffic.date, traffic.hour).all()
+
+            existing = set(self.available_months(code))
+            if not rows:
+                self._remove_months(code, existing)
+                with self._lock:
+                    self._synced.add(code)
+                continue
+
+            dates = np.array([row[0] for row in rows], dtype='datetime64[D]')
+            timestamps = dates.astype('datetime64[h]') + np.array([row[1] for row in rows], dtype='timedelta64[h]')
+            values = np.array([[v or 0 for v in row[2:]] for row in rows], dtype=np.float64)
+            values[:, -1] = np.rint(values[:, -1] * 10)
+            values = values.astype(np.int64)
+
+            month_keys = dates.astype('datetime64[M]')
+            for month_key in np.unique(month_keys):
+                mask = month_keys == month_key
+                year, month = (int(part) for part in str(month_key).split('-'))
+                hours = (timestamps[mask] - _month_start(year, month)).astype(np.int64)
+                columns = {column: values[mask, i] for i, column in enumerate(SERIES_COLUMNS)}
+                self.write_month(code, year, month, hours, columns)
+                existing.discard((year, month))
+                written += 1
+
+            self._remove_months(code, existing)
+            with self._lock:
+                self._synced.add(code)
+
+        return written
+
+    def record_change(self, session: Session, area_ids):
+        """플러시된 FootTrafficData 변경 상권을 커밋 전까지 보관"""
+        with self._lock:
+            self._pending.setdefault(id(session), set()).update(
+                area_id for area_id in area_ids if area_id is not None
+            )
+
+    def apply_pending(self, session: Session):
+        """커밋된 변경 상권을 다음 조회 때 다시 변환하도록 표시"""
+        with self._lock:
+            area_ids = self._pending.pop(id(session), None)
+            if area_ids:
+                self._stale_area_ids.update(area_ids)
+
+    def discard_pending(self, session: Session):
+        """롤백된 세션의 변경분 폐기"""
+        with self._lock:
+            self._pending.pop(id(session), None)
+
+    def _ensure_synced(self, area_code: str):
+        """처음 조회하거나 변경이 커밋된 상권이면 DB에서 다시 변환 (앱 컨텍스트 필요)"""
+        area_code = str(area_code)
+        if not has_app_context() or not _valid_area_code(area_code):
+            return
+        with self._lock:
+            if area_code in self._synced and not self._stale_area_ids:
+                return
+
+        with self._sync_lock:
+            try:
+                with Session(db.engine) as session:
+                    # 변경이 커밋된 상권 id → 코드로 바꿔 동기화 표시 해제
+                    with self._lock:
+                        stale = set(self._stale_area_ids)
+                    if stale:
+                        codes = [str(code) for (code,) in session.query(CommercialArea.area_code).filter(
+                            CommercialArea.id.in_(stale)
+                        )]
+                        with self._lock:
+                            self._synced.difference_update(codes)
+                            self._stale_area_ids.difference_update(stale)
+
+                    with self._lock:
+                        if area_code in self._synced:
+                            return
+                    self._import_areas(session, area_code)
+                    with self._lock:
+                        self._synced.add(area_code)
+            except Exception as e:
+                print(f"유동인구 시계열 동기화 실패: {e}")
+
+    def _remove_months(self, area_code: str, months):
+        """월 파일 삭제 및 캐시 무효화"""
+        if not months:
+            return
+        for year, month in months:
+            path = self._month_path(area_code, year, month)
+            if os.path.exists(path):
+                os.remove(path)
+            with self._lock:
+                self._evict(path)
+        with self._lock:
+            for key in [key for key in self._totals if key[0] == area_code]:
+                del self._totals[key]
+        score_dependencies.notify("foot_traffic_data", {"market": [area_code]})
+
+    def _month_path(self, area_code: str, year: int, month: int) -> str:
+        if not _valid_area_code(area_code):
+            raise ValueError(f"잘못된 상권 코드입니다: {area_code!r}")
+        return os.path.join(self.base_dir, str(area_code), f"{year:04d}-{month:02d}.npz")
+
+    def _months_between(self, start: date, end: date) -> List[tuple]:
+        if isinstance(start, datetime):
+            start = start.date()
+        if isinstance(end, datetime):
+            end = end.date()
+
+        months = []
+        year, month = start.year, start.month
+        while (year, month) <= (end.year, end.month):
+            months.append((year, month))
+            month += 1
+            if month > 12:
+                year, month = year + 1, 1
+        return months
+
+    def _evict(self, path: str):
+        """캐시 항목 제거 (잠금 상태에서 호출)"""
+        entry = self._cache.pop(path, None)
+        if entry is not None:
+            self._cache_bytes -= entry[1]
+
+    def clear_cache(self):
+        """캐시 초기화"""
+        with self._lock:
+            self._cache.clear()
+            self._cache_bytes = 0
+            self._totals.clear()
+            self._synced.clear()
+
+
+# 서비스 간 공유하는 인스턴스 (유동인구 변경 이벤트 수신)
+traffic_series = TrafficSeriesStore()
+
+
+def _load_previous_value(target, value, oldvalue, initiator):
+    """active_history 설정용 빈 리스너"""
+
+
+# 만료된 area_id도 변경 시 이전 값을 읽어 이전 상권까지 다시 변환
+event.listen(FootTrafficData.area_id, "set", _load_previous_value, active_history=True)
+
+
+@event.listens_for(FootTrafficData, "after_insert")
+@event.listens_for(FootTrafficData, "after_delete")
+def _on_traffic_insert_or_delete(mapper, connection, target):
+    traffic_series.record_change(object_session(target), [target.area_id])
+
+
+@event.listens_for(FootTrafficData, "after_update")
+def _on_traffic_update(mapper, connection, target):
+    history = inspect(target).attrs.area_id.history
+    traffic_series.record_change(object_session(target), [target.area_id, *history.deleted])
+
+
+@event.listens_for(Session, "after_commit")
+def _on_commit(session):
+    traffic_series.apply_pending(session)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _on_rollback(session, previous_transaction):
+    traffic_series.discard_pending(session)
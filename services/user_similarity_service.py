@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+유사 사용자 검색 서비스
+활성 사용자의 사용자 유형/사업 단계/관심 업종/선호 지역을 멀티핫 특성으로 보고
+특성별 역색인(사용자 슬롯 목록)으로 코사인 유사도를 정확히 계산해 상위 k명을 반환하며,
+사용자 추가·수정·삭제는 커밋 시점에 해당 사용자만 갱신 (수정/삭제된 슬롯은 비활성화 후 일정 비율을 넘으면 압축)
+"""
+import threading
+from typing import Dict, List, Any, Optional
+import numpy as np
+from flask import has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from extensions import db
+from models import User
+
+DEFAULT_SIMILAR_USERS = 3
+
+# 비활성 슬롯이 이 수 이상이면서 활성 슬롯보다 많아지면 압축
+COMPACT_MIN_DEAD_SLOTS = 1000
+
+# 사용자 프로필 스냅샷 - 비활성 사용자면 None
+UserSnapshot = Optional[Dict[str, Any]]
+
+
+def _string_list(value) -> List[str]:
+    """문자열 목록 값 정규화 (단일 문자열은 한 항목, 문자열이 아닌 항목은 제외)"""
+    if isinstance(value, str):
+        return [value] if value else []
+    if not isinstance(value, (list, tuple)):
+        return []
+    return [item for item in value if isinstance(item, str) and item]
+
+
+def _profile_features(profile: Dict[str, Any]) -> List[str]:
+    """프로필 → 특성 토큰 목록 (중복 제거)"""
+    preferences = profile.get("preferences") or {}
+    tokens = []
+    if profile.get("userType"):
+        tokens.append(f"type:{profile['userType']}")
+    if profile.get("businessStage"):
+        tokens.append(f"stage:{profile['businessStage']}")
+    tokens.extend(f"industry:{industry}" for industry in _string_list(preferences.get("interestedBusinessTypes")))
+    tokens.extend(f"area:{area}" for area in _string_list(preferences.get("preferredAreas")))
+    return list(dict.fromkeys(tokens))
+
+
+class _Postings:
+    """특성별 사용자 슬롯 목록 (추가만 하고 조회 시 numpy 배열로 이어 붙임)"""
+
+    __slots__ = ("items", "array")
+
+    def __init__(self):
+        self.items: List[int] = []
+        self.array = np.array([], dtype=np.int64)
+
+    def as_array(self) -> np.ndarray:
+        if len(self.items) > len(self.array):
+            self.array = np.concatenate([self.array, np.array(self.items[len(self.array):], dtype=np.int64)])
+        return self.array
+
+
+class UserSimilarityService:
+    """멀티핫 특성 코사인 유사도 기반 유사 사용자 색인"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # 최초/전체 재구성이 동시에 여러 번 실행되지 않도록 직렬화
+        self._load_lock = threading.RLock()
+        self._loaded = False
+        self._reset()
+        # 커밋 전 세션별 변경분 (세션 id → {사용자 id: 스냅샷})
+        self._pending: Dict[int, Dict[int, UserSnapshot]] = {}
+        # 재구성 중 커밋된 변경분 (재구성 후 반영), 재구성 중이 아니면 None
+        self._load_buffer: Optional[Dict[int, UserSnapshot]] = None
+
+    def _reset(self):
+        self._postings: Dict[str, _Postings] = {}
+        self._slot_users = np.zeros(0, dtype=np.int64)
+        self._slot_sizes = np.zeros(0, dtype=np.float64)
+        self._slot_active = np.zeros(0, dtype=bool)
+        self._slot_count = 0
+        self._user_slots: Dict[int, int] = {}
+        self._profiles: Dict[int, Dict[str, Any]] = {}
+
+    def refresh(self) -> int:
+        """전체 재구성 - 색인된 사용자 수 반환
+
+        호출한 쪽 세션에 영향을 주지 않도록 별도 세션으로 조회하며,
+        조회 시작 후 커밋된 변경은 조회 결과에 빠졌을 수 있으므로 모아 두었다가 재구성 뒤 반영
+        """
+        with self._load_lock:
+            with self._lock:
+                self._load_buffer = {}
+            try:
+                with Session(db.engine) as session:
+                    # is_active가 NULL인 사용자도 활성으로 간주 (_snapshot과 같은 기준)
+                    users = session.query(
+                        User.id, User.user_type, User.business_stage,
+                        User.interested_business_types, User.preferred_areas
+                    ).filter(User.is_active.isnot(False)).order_by(User.id).all()
+            except Exception:
+                with self._lock:
+                    self._load_buffer = None
+                raise
+
+            with self._lock:
+                self._reset()
+                self._reserve(len(users))
+                for user_id, user_type, business_stage, industries, areas in users:
+                    self._add(user_id, _build_profile(user_type, business_stage, industries, areas))
+                buffered, self._load_buffer = self._load_buffer, None
+                self._apply_changes(buffered)
+                self._loaded = True
+            return len(users)
+
+    def find_similar(self, profile: Dict[str, Any], k: int = DEFAULT_SIMILAR_USERS,
+                     exclude_user_id: int = None) -> List[Dict[str, Any]]:
+        """프로필과 코사인 유사도가 높은 사용자 상위 k명 (동점은 사용자 id 순)"""
+        self._ensure_loaded()
+        tokens = _profile_features(profile)
+        if not tokens or k <= 0:
+            return []
+
+        with self._lock:
+            postings = [self._postings[token].as_array() for token in tokens if token in self._postings]
+            if not postings:
+                return []
+            # 공통 특성 수 = 질의 특성의 역색인 슬롯 빈도
+            overlap = np.bincount(np.concatenate(postings), minlength=self._slot_count)[:self._slot_count]
+            sizes = self._slot_sizes[:self._slot_count]
+            active = self._slot_active[:self._slot_count]
+            users = self._slot_users[:self._slot_count]
+
+            candidates = np.flatnonzero((overlap > 0) & active)
+            if exclude_user_id is not None:
+                candidates = candidates[users[candidates] != exclude_user_id]
+            if not len(candidates):
+                return []
+            scores = overlap[candidates] / np.sqrt(sizes[candidates] * len(tokens))
+
+            if k < len(candidates):
+                top = np.argpartition(-scores, k - 1)[:k]
+                threshold = scores[top].min()
+                top = np.flatnonzero(scores >= threshold)
+            else:
+                top = np.arange(len(candidates))
+            order = top[np.lexsort((users[candidates[top]], -scores[top]))][:k]
+
+            return [
+                {
+                    "user_id": int(users[candidates[i]]),
+                    "similarity_score": round(float(scores[i]), 3),
+                    "profile": self._profiles[int(users[candidates[i]])]
+                }
+                for i in order
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        """색인 현황"""
+        with self._lock:
+            return {
+                "users": len(self._user_slots),
+                "slots": self._slot_count,
+                "features": len(self._postings)
+            }
+
+    def clear_cache(self):
+        """색인 초기화"""
+        with self._lock:
+            self._reset()
+            self._loaded = False
+
+    def record_change(self, session: Session, user_id: int, snapshot: UserSnapshot):
+        """플러시된 사용자 변경을 커밋 전까지 보관 (같은 사용자는 마지막 상태만)"""
+        with self._lock:
+            self._pending.setdefault(id(session), {})[user_id] = snapshot
+
+    def apply_pending(self, session: Session):
+        """커밋된 변경 사용자만 색인에 반영 (재구성 중이면 재구성 후 반영, 미구성이면 폐기)"""
+        with self._lock:
+            changes = self._pending.pop(id(session), None)
+            if not changes:
+                return
+            if self._load_buffer is not None:
+                self._load_buffer.update(changes)
+            elif self._loaded:
+                self._apply_changes(changes)
+
+    def discard_pending(self, session: Session):
+        """롤백된 세션의 변경분 폐기"""
+        with self._lock:
+            self._pending.pop(id(session), None)
+
+    def _apply_changes(self, changes: Dict[int, UserSnapshot]):
+        """사용자별 최신 스냅샷 반영 후 필요 시 압축 (잠금 상태에서 호출)"""
+        for user_id, snapshot in changes.items():
+            self._remove(user_id)
+            if snapshot is not None:
+                self._add(user_id, snapshot)
+
+        live = len(self._user_slots)
+        dead = self._slot_count - live
+        if dead >= COMPACT_MIN_DEAD_SLOTS and dead > live:
+            self._compact()
+
+    def _add(self, user_id: int, profile: Dict[str, Any]):
+        """새 슬롯에 사용자 추가 (잠금 상태에서 호출)"""
+        tokens = _profile_features(profile)
+        if not tokens:
+            return
+        self._reserve(self._slot_count + 1)
+        slot = self._slot_count
+        self._slot_count += 1
+        self._slot_users[slot] = user_id
+        self._slot_sizes[slot] = len(tokens)
+        self._slot_active[slot] = True
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = _Postings()
+            postings.items.append(slot)
+        self._user_slots[user_id] = slot
+        self._profiles[user_id] = profile
+
+    def _remove(self, user_id: int):
+        """사용자 슬롯 비활성화 (잠금 상태에서 호출)"""
+        slot = self._user_slots.pop(user_id, None)
+        if slot is not None:
+            self._slot_active[slot] = False
+        self._profiles.pop(user_id, None)
+
+    def _reserve(self, size: int):
+        """슬롯 배열 용량 확보 (2배씩 증가)"""
+        capacity = len(self._slot_users)
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2, 1024)
+        for name in ("_slot_users", "_slot_sizes", "_slot_active"):
+            current = getattr(self, name)
+            grown = np.zeros(capacity, dtype=current.dtype)
+            grown[:len(current)] = current
+            setattr(self, name, grown)
+
+    def _compact(self):
+        """비활성 슬롯 제거 후 재구성 (잠금 상태에서 호출)"""
+        profiles = sorted(self._profiles.items())
+        self._reset()
+        self._reserve(len(profiles))
+        for user_id, profile in profiles:
+            self._add(user_id, profile)
+
+    def _ensure_loaded(self):
+        """최초 조회 시 색인 구성 (실패하면 다음 조회에서 재시도)"""
+        if self._loaded or not has_app_context():
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"유사 사용자 색인 구성 실패: {e}")
+
+
+def _build_profile(user_type: str, business_stage: str, industries, areas) -> Dict[str, Any]:
+    """User 컬럼 → 추천 API 프로필 형식"""
+    return {
+        "userType": user_type,
+        "businessStage": business_stage,
+        "preferences": {
+            "interestedBusinessTypes": _string_list(industries),
+            "preferredAreas": _string_list(areas)
+        }
+    }
+
+
+# 사용자 변경 이벤트를 받는 공용 인스턴스
+user_similarity = UserSimilarityService()
+
+
+def _snapshot(user: User) -> UserSnapshot:
+    """사용자 프로필 스냅샷 (is_active가 False인 사용자만 비활성으로 보고 None)"""
+    if user.is_active is False:
+        return None
+    return _build_profile(user.user_type, user.business_stage, user.interested_business_types, user.preferred_areas)
+
+
+@event.listens_for(User, "after_insert")
+def _on_user_insert(mapper, connection, target):
+    user_similarity.record_change(object_session(target), target.id, _snapshot(target))
+
+
+@event.listens_for(User, "after_update")
+def _on_user_update(mapper, connection, target):
+    user_similarity.record_change(object_session(target), target.id, _snapshot(target))
+
+
+@event.listens_for(User, "after_delete")
+def _on_user_delete(mapper, connection, target):
+    user_similarity.record_change(object_session(target), target.id, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _on_commit(session):
+    user_similarity.apply_pending(session)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _on_rollback(session, previous_transaction):
+    user_similarity.discard_pending(session)
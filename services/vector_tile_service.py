@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+벡터 타일 서비스
+상권 폴리곤을 줌별로 단순화(Douglas-Peucker)하고 타일 경계로 잘라(Sutherland-Hodgman)
+Mapbox Vector Tile(protobuf)로 인코딩, 현재 데이터셋 버전의 타일 피라미드만 디스크에 캐시
+"""
+import os
+import shutil
+import struct
+import threading
+from typing import Dict, List, Any, Optional, Tuple, Sequence
+import numpy as np
+from services.geo_utils import lnglat_to_world
+
+EXTENT = 4096
+BUFFER = 64
+LAYER_NAME = "markets"
+
+MAX_ZOOM = 20
+# 사전 생성 피라미드 줌 범위 (그 이상은 요청 시 생성 후 캐시)
+PYRAMID_MIN_ZOOM = 8
+PYRAMID_MAX_ZOOM = 14
+
+# 줌별 단순화 허용 오차 (타일 픽셀 단위, 256px 기준)
+SIMPLIFY_TOLERANCE_PX = 0.5
+
+# MVT 지오메트리 명령
+CMD_MOVE_TO = 1
+CMD_LINE_TO = 2
+CMD_CLOSE_PATH = 7
+GEOM_POLYGON = 3
+
+
+# ---------------------------------------------------------------------------
+# protobuf 인코딩
+# ---------------------------------------------------------------------------
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _key(field: int, wire_type: int) -> bytes:
+    return _varint((field << 3) | wire_type)
+
+
+def _bytes_field(field: int, payload: bytes) -> bytes:
+    return _key(field, 2) + _varint(len(payload)) + payload
+
+
+def _packed_field(field: int, values: Sequence[int]) -> bytes:
+    return _bytes_field(field, b"".join(_varint(v) for v in values))
+
+
+def _encode_value(value: Any) -> bytes:
+    """Tile.Value 메시지"""
+    if isinstance(value, bool):
+        return _key(7, 0) + _varint(int(value))
+    if isinstance(value, (int, np.integer)):
+        return _key(6, 0) + _varint(_zigzag(int(value)))
+    if isinstance(value, (float, np.floating)):
+        return _key(3, 1) + struct.pack("<d", float(value))
+    return _bytes_field(1, str(value).encode("utf-8"))
+
+
+def encode_layer(name: str, features: List[Dict[str, Any]], extent: int = EXTENT) -> bytes:
+    """Tile.Layer 메시지 (features: id, properties, geometry 명령 목록)"""
+    keys: Dict[str, int] = {}
+    values: Dict[Tuple[type, Any], int] = {}
+    encoded_features = []
+
+    for feature in features:
+        tags = []
+        for key, value in feature["properties"].items():
+            if value is None:
+                continue
+            tags.append(keys.setdefault(key, len(keys)))
+            tags.append(values.setdefault((type(value), value), len(values)))
+
+        body = _key(1, 0) + _varint(feature["id"])
+        if tags:
+            body += _packed_field(2, tags)
+        body += _key(3, 0) + _varint(GEOM_POLYGON)
+        body += _packed_field(4, feature["geometry"])
+        encoded_features.append(_bytes_field(2, body))
+
+    layer = _key(15, 0) + _varint(2) + _bytes_field(1, name.encode("utf-8"))
+    layer += b"".join(encoded_features)
+    layer += b"".join(_bytes_field(3, key.encode("utf-8")) for key in keys)
+    layer += b"".join(_bytes_field(4, _encode_value(value)) for (_, value) in values)
+    layer += _key(5, 0) + _varint(extent)
+    return layer
+
+
+def encode_polygon_geometry(rings: List[np.ndarray]) -> List[int]:
+    """정수 타일 좌표 링 목록 → MVT 지오메트리 명령 (링 시작점 기준 델타 + zigzag)"""
+    commands = []
+    cursor_x = cursor_y = 0
+    for ring in rings:
+        commands.append(CMD_MOVE_TO | (1 << 3))
+        commands.append(_zigzag(int(ring[0, 0]) - cursor_x))
+        commands.append(_zigzag(int(ring[0, 1]) - cursor_y))
+        deltas = np.diff(ring, axis=0)
+        commands.append(CMD_LINE_TO | (len(deltas) << 3))
+        for dx, dy in deltas.tolist():
+            commands.append(_zigzag(dx))
+            commands.append(_zigzag(dy))
+        commands.append(CMD_CLOSE_PATH | (1 << 3))
+        cursor_x, cursor_y = int(ring[-1, 0]), int(ring[-1, 1])
+    return commands
+
+
+# ---------------------------------------------------------------------------
+# 기하 연산
+# ---------------------------------------------------------------------------
+
+def douglas_peucker_ranks(points: np.ndarray) -> np.ndarray:
+    """꼭짓점별 Douglas-Peucker 유지 임계값
+
+    허용 오차 tol로 단순화한 결과는 rank > tol인 꼭짓점 집합과 같으므로
+    한 번 계산해 두면 모든 줌에서 재사용 가능 (양 끝점은 무한대)
+    """
+    n = len(points)
+    ranks = np.zeros(n)
+    if n == 0:
+        return ranks
+    ranks[0] = ranks[-1] = np.inf
+
+    stack = [(0, n - 1, np.inf)]
+    while stack:
+        start, end, parent_rank = stack.pop()
+        if end - start < 2:
+            continue
+        segment = points[end] - points[start]
+        inner = points[start + 1:end] - points[start]
+        length = np.hypot(segment[0], segment[1])
+        if length == 0:
+            distances = np.hypot(inner[:, 0], inner[:, 1])
+        else:
+            distances = np.abs(segment[0] * inner[:, 1] - segment[1] * inner[:, 0]) / length
+        offset = int(np.argmax(distances))
+        split = start + 1 + offset
+        # 상위 분할점보다 먼저 남는 일이 없도록 부모 임계값으로 제한
+        rank = min(float(distances[offset]), parent_rank)
+        ranks[split] = rank
+        stack.append((start, split, rank))
+        stack.append((split, end, rank))
+    return ranks
+
+
+def clip_polygon(ring: np.ndarray, min_value: float, max_value: float) -> np.ndarray:
+    """정사각형 [min, max]² 범위로 폴리곤 자르기 (Sutherland-Hodgman, 변 단위 벡터화)"""
+    for axis, bound, keep_greater in ((0, min_value, True), (0, max_value, False),
+                                      (1, min_value, True), (1, max_value, False)):
+        if len(ring) == 0:
+            break
+        prev = np.roll(ring, 1, axis=0)
+        inside_cur = ring[:, axis] >= bound if keep_greater else ring[:, axis] <= bound
+        inside_prev = np.roll(inside_cur, 1)
+        if inside_cur.all():
+            continue
+
+        crosses = inside_cur != inside_prev
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = (bound - prev[:, axis]) / (ring[:, axis] - prev[:, axis])
+            intersections = prev + t[:, None] * (ring - prev)
+        intersections[:, axis] = bound
+
+        # 변마다 [교차점, 현재 점] 순으로 출력 후보를 만들고 마스크로 선택
+        candidates = np.stack([intersections, ring], axis=1).reshape(-1, 2)
+        mask = np.stack([crosses, inside_cur], axis=1).reshape(-1)
+        ring = candidates[mask]
+    return ring
+
+
+def _ring_area(ring: np.ndarray) -> float:
+    x, y = ring[:, 0], ring[:, 1]
+    return float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y)) / 2
+
+
+class VectorTileService:
+    """상권 폴리곤 벡터 타일 생성 및 디스크 캐시"""
+
+    def __init__(self, base_dir: str = None):
+        self.base_dir = base_dir or os.path.join(os.path.dirname(__file__), '..', 'instance', 'vector_tiles')
+        self._layers: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._pyramid_builds: Dict[str, threading.Thread] = {}
+
+    def has_layer(self, version: str) -> bool:
+        """버전 준비 여부"""
+        return version in self._layers
+
+    def prepare(self, version: str, polygons: List[List[Tuple[float, float]]],
+                properties: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """데이터셋 버전별 투영 좌표/단순화 임계값/경계 상자 (1회 계산, 이전 버전은 삭제)"""
+        with self._lock:
+            layer = self._layers.get(version)
+            if layer is not None:
+                return layer
+            self._drop_other_versions(version)
+
+            rings, ranks, boxes, kept = [], [], [], []
+            for i, polygon in enumerate(polygons):
+                coords = np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+                if len(coords) and np.array_equal(coords[0], coords[-1]):
+                    coords = coords[:-1]
+                if len(coords) < 3:
+                    continue
+                wx, wy = lnglat_to_world(coords[:, 1], coords[:, 0])
+                ring = np.column_stack([wx, wy])
+                # 닫힌 링의 시작점과 가장 먼 점을 고정점으로 두 구간 단순화
+                far = int(np.argmax(np.hypot(*(ring - ring[0]).T)))
+                rank = np.empty(len(ring))
+                rank[:far + 1] = douglas_peucker_ranks(ring[:far + 1])
+                rank[far:] = douglas_peucker_ranks(np.vstack([ring[far:], ring[:1]]))[:-1]
+                rank[0] = rank[far] = np.inf
+                rings.append(ring)
+                ranks.append(rank)
+                boxes.append((wx.min(), wy.min(), wx.max(), wy.max()))
+                kept.append(i)
+
+            layer = {
+                "rings": rings,
+                "ranks": ranks,
+                "bbox": np.array(boxes, dtype=np.float64).reshape(-1, 4),
+                "properties": [properties[i] for i in kept]
+            }
+            self._layers[version] = layer
+            return layer
+
+    def get_tile(self, version: str, z: int, x: int, y: int) -> bytes:
+        """타일 조회 (디스크 캐시 우선) - prepare 이후 호출"""
+        path = self._tile_path(version, z, x, y)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                return f.read()
+
+        tile = self.render_tile(version, z, x, y)
+        if tile:
+            self._write_tile(path, tile)
+        return tile
+
+    def render_tile(self, version: str, z: int, x: int, y: int) -> bytes:
+        """타일 렌더링 - 포함 폴리곤이 없으면 빈 바이트 (유효한 빈 타일)"""
+        layer = self._layers.get(version)
+        if layer is None or not len(layer["bbox"]):
+            return b""
+
+        scale = 1 << z
+        pad = BUFFER / EXTENT
+        boxes = layer["bbox"] * scale
+        visible = np.flatnonzero(
+            (boxes[:, 2] >= x - pad) & (boxes[:, 0] <= x + 1 + pad)
+            & (boxes[:, 3] >= y - pad) & (boxes[:, 1] <= y + 1 + pad)
+        )
+        if not len(visible):
+            return b""
+
+        # 허용 오차: 타일 픽셀 → 정규 좌표
+        tolerance = SIMPLIFY_TOLERANCE_PX / (256 * scale)
+        features = []
+        for i in visible:
+            ring = layer["rings"][i][layer["ranks"][i] > tolerance]
+            geometry = self._tile_ring(ring, scale, x, y)
+            if geometry is None:
+                continue
+            features.append({
+                "id": int(i) + 1,
+                "properties": layer["properties"][i],
+                "geometry": encode_polygon_geometry([geometry])
+            })
+
+        if not features:
+            return b""
+        return _bytes_field(3, encode_layer(LAYER_NAME, features))
+
+    def build_pyramid(self, version: str, min_zoom: int = PYRAMID_MIN_ZOOM, max_zoom: int = PYRAMID_MAX_ZOOM) -> int:
+        """폴리곤이 있는 타일만 사전 생성 - 생성한 타일 수 반환"""
+        layer = self._layers.get(version)
+        if layer is None:
+            return 0
+
+        written = 0
+        for z in range(min_zoom, max_zoom + 1):
+            # 생성 중 새 버전으로 교체되면 중단
+            if version not in self._layers:
+                break
+            scale = 1 << z
+            tiles = set()
+            for min_x, min_y, max_x, max_y in (layer["bbox"] * scale).tolist():
+                for tx in range(int(min_x), min(int(max_x), scale - 1) + 1):
+                    for ty in range(int(min_y), min(int(max_y), scale - 1) + 1):
+                        tiles.add((tx, ty))
+            for tx, ty in tiles:
+                path = self._tile_path(version, z, tx, ty)
+                if os.path.exists(path):
+                    continue
+                tile = self.render_tile(version, z, tx, ty)
+                if tile:
+                    self._write_tile(path, tile)
+                    written += 1
+        return written
+
+    def ensure_pyramid(self, version: str):
+        """버전별 피라미드 백그라운드 생성 (버전당 1회)"""
+        with self._lock:
+            if version in self._pyramid_builds:
+                return
+            thread = threading.Thread(target=self._build_pyramid_safely, args=(version,), daemon=True)
+            self._pyramid_builds[version] = thread
+        thread.start()
+
+    def clear_cache(self):
+        """메모리 캐시 초기화"""
+        with self._lock:
+            self._layers.clear()
+            self._pyramid_builds.clear()
+
+    def _drop_other_versions(self, version: str):
+        """다른 버전의 레이어/피라미드 기록과 디스크 타일 삭제 (잠금 상태에서 호출)"""
+        for old in [old for old in self._layers if old != version]:
+            del self._layers[old]
+        for old in [old for old in self._pyramid_builds if old != version]:
+            del self._pyramid_builds[old]
+        if os.path.isdir(self.base_dir):
+            for name in os.listdir(self.base_dir):
+                if name != version:
+                    shutil.rmtree(os.path.join(self.base_dir, name), ignore_errors=True)
+
+    def _build_pyramid_safely(self, version: str):
+        try:
+            self.build_pyramid(version)
+        except Exception as e:
+            print(f"벡터 타일 피라미드 생성 실패: {e}")
+
+    def _tile_ring(self, ring: np.ndarray, scale: int, x: int, y: int) -> Optional[np.ndarray]:
+        """정규 좌표 링 → 잘라낸 정수 타일 좌표 링 (외곽 링은 양의 면적)"""
+        if len(ring) < 3:
+            return None
+        local = (ring * scale - (x, y)) * EXTENT
+        local = clip_polygon(local, -BUFFER, EXTENT + BUFFER)
+        if len(local) < 3:
+            return None
+
+        local = np.rint(local).astype(np.int64)
+        # 정수화 후 연속 중복점 제거
+        keep = np.any(local != np.roll(local, 1, axis=0), axis=1)
+        local = local[keep]
+        if len(local) < 3:
+            return None
+
+        area = _ring_area(local)
+        if area == 0:
+            return None
+        if area < 0:
+            local = local[::-1]
+        return local
+
+    def _write_tile(self, path: str, tile: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(tile)
+        os.replace(tmp_path, path)
+
+    def _tile_path(self, version: str, z: int, x: int, y: int) -> str:
+        return os.path.join(self.base_dir, version, str(z), str(x), f"{y}.pbf")
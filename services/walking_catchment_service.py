@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+도보 상권 범위 서비스
+csv/road_nodes.csv, csv/road_edges.csv 도로망 추출본을 CSR 인접 배열로 적재하고
+상권 중심에서 제한 거리 다익스트라로 5/10/15분 도보 도달 범위를 데이터셋 버전마다 사전 계산
+(도로망 파일이 없거나 상권이 도로망에서 멀면 직선거리 × 우회 계수로 추정)
+"""
+import os
+import math
+import heapq
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+import pandas as pd
+from services.geo_utils import EARTH_RADIUS_KM, haversine_km
+from services.spatial_index import GridSpatialIndex
+from services.accessibility_service import WALKING_SPEED_M_PER_MIN
+
+CATCHMENT_MINUTES = [5, 10, 15]
+
+# 도로망 최근접 노드까지 이 거리(m)를 넘으면 도로망 밖으로 보고 추정값 사용
+MAX_SNAP_M = 300
+
+# 직선거리 대비 실제 보행 거리 비율 (도로망이 없을 때의 추정용)
+DETOUR_FACTOR = 1.25
+
+# 추정 범위 원을 근사하는 다각형 꼭짓점 수
+ESTIMATE_POLYGON_VERTICES = 32
+
+
+class RoadGraph:
+    """CSR 형식 보행 도로망 (간선은 양방향, 가중치는 m)"""
+
+    def __init__(self, lats, lngs, sources, targets, lengths_m):
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lngs = np.asarray(lngs, dtype=np.float64)
+        self.size = len(self.lats)
+
+        # 양방향 간선을 출발 노드 기준으로 정렬해 indptr/indices/weights 구성
+        src = np.concatenate([sources, targets]).astype(np.int64)
+        dst = np.concatenate([targets, sources]).astype(np.int64)
+        weights = np.concatenate([lengths_m, lengths_m]).astype(np.float64)
+        order = np.argsort(src, kind='stable')
+        self.indptr = np.zeros(self.size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=self.size), out=self.indptr[1:])
+        self.indices = dst[order]
+        self.weights = weights[order]
+
+        # 탐색 루프에서는 스칼라 접근이 잦으므로 파이썬 리스트로 보관
+        self._indptr = self.indptr.tolist()
+        self._indices = self.indices.tolist()
+        self._weights = self.weights.tolist()
+
+        self.node_index = GridSpatialIndex(self.lats, self.lngs, cell_size_km=0.5)
+
+    def snap(self, lat: float, lng: float) -> Optional[Tuple[int, float]]:
+        """최근접 노드 - (노드, 거리 m), 도로망 밖이면 None"""
+        nodes, distances = self.node_index.query_nearest(lat, lng, 1)
+        if not len(nodes) or distances[0] * 1000 > MAX_SNAP_M:
+            return None
+        return int(nodes[0]), float(distances[0]) * 1000
+
+    def bounded_dijkstra(self, source: int, initial_m: float, limit_m: float) -> Dict[int, float]:
+        """limit_m 이내 도달 노드별 최단 거리 (m)"""
+        indptr, indices, weights = self._indptr, self._indices, self._weights
+        settled: Dict[int, float] = {}
+        heap = [(initial_m, source)] if initial_m <= limit_m else []
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if node in settled:
+                continue
+            settled[node] = distance
+            for k in range(indptr[node], indptr[node + 1]):
+                neighbor = indices[k]
+                candidate = distance + weights[k]
+                if candidate <= limit_m and neighbor not in settled:
+                    heapq.heappush(heap, (candidate, neighbor))
+        return settled
+
+
+def convex_hull(points: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    """볼록 껍질 (반시계 방향, Andrew monotone chain)"""
+    points = sorted(set(points))
+    if len(points) <= 2:
+        return points
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower, upper = [], []
+    for p in points:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    for p in reversed(points):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    return lower[:-1] + upper[:-1]
+
+
+def _hull_area_km2(hull: List[Tuple[float, float]]) -> float:
+    """경위도 다각형 면적 (중심 위도 기준 평면 근사)"""
+    if len(hull) < 3:
+        return 0.0
+    lngs = np.array([p[0] for p in hull])
+    lats = np.array([p[1] for p in hull])
+    x = np.radians(lngs) * EARTH_RADIUS_KM * math.cos(math.radians(lats.mean()))
+    y = np.radians(lats) * EARTH_RADIUS_KM
+    return float(abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2)
+
+
+class WalkingCatchmentService:
+    """상권별 도보 도달 범위 사전 계산 및 도보 거리 기반 반경 조회"""
+
+    def __init__(self, data_dir: str = None):
+        self.data_dir = data_dir or os.path.join(os.path.dirname(__file__), '..', 'csv')
+        self._graph: Optional[RoadGraph] = None
+        self._graph_loaded = False
+        self._catchments: Dict[str, Dict[str, Any]] = {}
+        self._snaps: List[Optional[Tuple[int, float]]] = []
+        self._version = None
+        self._lock = threading.Lock()
+
+    def load_graph(self) -> Optional[RoadGraph]:
+        """도로망 로드 (파일이 없으면 None)"""
+        if self._graph_loaded:
+            return self._graph
+
+        nodes_path = os.path.join(self.data_dir, 'road_nodes.csv')
+        edges_path = os.path.join(self.data_dir, 'road_edges.csv')
+        graph = None
+        if os.path.exists(nodes_path) and os.path.exists(edges_path):
+            try:
+                nodes = pd.read_csv(nodes_path, encoding='utf-8-sig', dtype={'node_id': str})
+                edges = pd.read_csv(edges_path, encoding='utf-8-sig', dtype={'from_node': str, 'to_node': str})
+                node_ids = {node_id: i for i, node_id in enumerate(nodes['node_id'])}
+                sources = edges['from_node'].map(node_ids)
+                targets = edges['to_node'].map(node_ids)
+                valid = sources.notna() & targets.notna()
+                sources = sources[valid].astype(np.int64).values
+                targets = targets[valid].astype(np.int64).values
+                if 'length_m' in edges:
+                    lengths = pd.to_numeric(edges['length_m'][valid], errors='coerce').values
+                else:
+                    lengths = np.full(len(sources), np.nan)
+                # 길이가 없는 간선은 양 끝 노드 직선거리로 채움
+                missing = np.isnan(lengths)
+                if missing.any():
+                    lats, lngs = nodes['lat'].values, nodes['lng'].values
+                    lengths[missing] = haversine_km(
+                        lats[sources[missing]], lngs[sources[missing]],
+                        lats[targets[missing]], lngs[targets[missing]]
+                    ) * 1000
+                graph = RoadGraph(nodes['lat'].values, nodes['lng'].values, sources, targets, lengths)
+            except Exception as e:
+                print(f"도로망 데이터 로드 실패: {e}")
+
+        self._graph = graph
+        self._graph_loaded = True
+        return graph
+
+    def get_catchment(self, market_code: str) -> Optional[Dict[str, Any]]:
+        """사전 계산된 상권 도보 도달 범위"""
+        return self._catchments.get(str(market_code))
+
+    def precompute(self, markets: List[Dict[str, Any]], version: str) -> int:
+        """데이터셋 버전이 바뀌었으면 전체 상권 재계산 - 계산된 상권 수 반환"""
+        with self._lock:
+            if self._version == version:
+                return len(self._catchments)
+
+            graph = self.load_graph()
+            snaps = [graph.snap(m["lat"], m["lng"]) if graph else None for m in markets]
+            catchments = {}
+            for market, snap in zip(markets, snaps):
+                catchments[str(market["market_code"])] = self._build_catchment(graph, market, snap)
+
+            self._catchments = catchments
+            self._snaps = snaps
+            self._version = version
+            return len(catchments)
+
+    def walk_distances(self, center_lat: float, center_lng: float, markets: List[Dict[str, Any]],
+                       max_km: float) -> List[Tuple[int, float]]:
+        """중심점에서 max_km 이내 도보 도달 상권 - [(상권 인덱스, 도보 거리 km)], 거리 오름차순
+
+        precompute로 상권 노드 매칭이 끝난 상태여야 합니다.
+        """
+        graph = self.load_graph()
+        center_snap = graph.snap(center_lat, center_lng) if graph else None
+        settled = graph.bounded_dijkstra(center_snap[0], center_snap[1], max_km * 1000) if center_snap else {}
+
+        results = []
+        for i, market in enumerate(markets):
+            snap = self._snaps[i] if i < len(self._snaps) else None
+            if center_snap and snap:
+                node_distance = settled.get(snap[0])
+                if node_distance is None:
+                    continue
+                walk_km = (node_distance + snap[1]) / 1000
+            else:
+                # 도로망 밖이면 직선거리 × 우회 계수
+                walk_km = float(haversine_km(center_lat, center_lng, market["lat"], market["lng"])) * DETOUR_FACTOR
+            if walk_km <= max_km:
+                results.append((i, walk_km))
+        results.sort(key=lambda item: item[1])
+        return results
+
+    def _build_catchment(self, graph: Optional[RoadGraph], market: Dict[str, Any],
+                         snap: Optional[Tuple[int, float]]) -> Dict[str, Any]:
+        """상권 1곳의 분 단위 도달 범위 (다익스트라 1회로 모든 구간 계산)"""
+        if graph is None or snap is None:
+            return {
+                "method": "straight_line_estimate",
+                "catchments": [self._estimate_band(market, minutes) for minutes in CATCHMENT_MINUTES]
+            }
+
+        limit_m = max(CATCHMENT_MINUTES) * WALKING_SPEED_M_PER_MIN
+        settled = graph.bounded_dijkstra(snap[0], snap[1], limit_m)
+        nodes = np.fromiter(settled.keys(), dtype=np.int64, count=len(settled))
+        distances = np.fromiter(settled.values(), dtype=np.float64, count=len(settled))
+
+        bands = []
+        for minutes in CATCHMENT_MINUTES:
+            reached = nodes[distances <= minutes * WALKING_SPEED_M_PER_MIN]
+            points = [(market["lng"], market["lat"])] + list(zip(
+                graph.lngs[reached].tolist(), graph.lats[reached].tolist()
+            ))
+            hull = convex_hull(points)
+            bands.append({
+                "minutes": minutes,
+                "reachable_nodes": int(len(reached)),
+                "area_km2": round(_hull_area_km2(hull), 3),
+                "polygon": [{"lng": lng, "lat": lat} for lng, lat in hull]
+            })
+        return {"method": "road_network", "snap_distance_m": round(snap[1], 1), "catchments": bands}
+
+    def _estimate_band(self, market: Dict[str, Any], minutes: int) -> Dict[str, Any]:
+        """도로망이 없을 때의 원형 추정 범위"""
+        radius_km = minutes * WALKING_SPEED_M_PER_MIN / 1000 / DETOUR_FACTOR
+        angles = np.linspace(0, 2 * math.pi, ESTIMATE_POLYGON_VERTICES, endpoint=False)
+        dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+        dlng = dlat / math.cos(math.radians(market["lat"]))
+        return {
+            "minutes": minutes,
+            "reachable_nodes": 0,
+            "area_km2": round(math.pi * radius_km ** 2, 3),
+            "polygon": [
+                {"lng": market["lng"] + dlng * math.cos(a), "lat": market["lat"] + dlat * math.sin(a)}
+                for a in angles
+            ]
+        }
@@ -0,0 +1,22 @@
+"""
+DB가 필요한 테스트용 앱 픽스처 - 임시 SQLite 파일에 모델 테이블을 만들어 사용
+"""
+import pytest
+from flask import Flask
+from extensions import db
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'test.db'}",
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        TESTING=True
+    )
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
@@ -0,0 +1,87 @@
+"""
+접근성 사전 계산 검증 - 시설 유형별 최근접 시설, 반경 내 시설 수, 점수, 주차 용량
+"""
+import pytest
+from services.accessibility_service import AccessibilityService
+from services.geo_utils import haversine_km
+
+MARKET = {"market_code": "10000", "lat": 36.3320, "lng": 127.4340}
+
+# 상권 기준 북쪽으로 떨어진 시설 (위도 0.001° ≈ 111m)
+FACILITIES = """facility_id,name,facility_type,lat,lng,routes,capacity
+S1,가까운역,subway,36.3340,127.4340,1호선,
+S2,두번째역,subway,36.3400,127.4340,1호선,
+B1,정류장1,bus,36.3323,127.4340,101,
+B2,정류장2,bus,36.3330,127.4340,102,
+B3,정류장3,bus,36.3380,127.4340,103,
+P1,주차장1,parking,36.3324,127.4340,,120
+P2,주차장2,parking,36.3360,127.4340,,80
+"""
+
+
+@pytest.fixture
+def service(tmp_path):
+    (tmp_path / "transit_stops.csv").write_text(FACILITIES, encoding="utf-8")
+    service = AccessibilityService(data_dir=str(tmp_path))
+    assert service.precompute([MARKET], "v1") == 1
+    return service
+
+
+def _distance_m(lat: float) -> int:
+    return int(round(float(haversine_km(MARKET["lat"], MARKET["lng"], lat, MARKET["lng"])) * 1000))
+
+
+def test_precompute_reports_nearest_and_counts_per_type(service):
+    result = service.get_market_accessibility("10000")
+    assert set(result) == {"subway", "bus", "parking"}
+
+    subway = result["subway"]
+    assert subway["nearest"]["name"] == "가까운역"
+    assert subway["nearest"]["distance_m"] == _distance_m(36.3340)
+    assert subway["counts_within"] == {"500m": 1, "1000m": 2}
+    assert subway["available"] and subway["facilities"] == ["가까운역", "두번째역"]
+
+    bus = result["bus"]
+    assert bus["nearest"]["name"] == "정류장1"
+    assert bus["counts_within"] == {"500m": 2, "1000m": 3}
+    # 버스는 500m 이내만 이용 가능 목록에 포함
+    assert sorted(bus["facilities"]) == ["정류장1", "정류장2"]
+
+    parking = result["parking"]
+    assert parking["nearest"]["name"] == "주차장1"
+    assert parking["counts_within"] == {"500m": 2, "1000m": 2}
+    assert parking["total_capacity"] == 200
+
+
+def test_scores_grow_with_closer_facilities(service, tmp_path):
+    near = service.get_market_accessibility("10000")
+    far_market = {"market_code": "20000", "lat": 36.3200, "lng": 127.4340}
+    service.precompute([MARKET, far_market], "v2")
+    far = service.get_market_accessibility("20000")
+
+    for facility_type in ("subway", "bus", "parking"):
+        assert 0 <= far[facility_type]["score"] < near[facility_type]["score"] <= 100
+
+
+def test_missing_types_are_omitted(tmp_path):
+    (tmp_path / "transit_stops.csv").write_text(FACILITIES.split("B1,")[0], encoding="utf-8")
+    service = AccessibilityService(data_dir=str(tmp_path))
+    service.precompute([MARKET], "v1")
+    assert set(service.get_market_accessibility("10000")) == {"subway"}
+
+
+def test_map_accessibility_marks_sample_sections():
+    from services.map_visualization_service import MapVisualizationService
+
+    analysis = MapVisualizationService().get_accessibility_analysis("10000")
+    sources = analysis["data_sources"]
+    for section, source in sources.items():
+        assert source in ("transit_stops.csv", "sample")
+
+    # 동봉 데이터에는 지하철역만 있으므로 나머지는 샘플로 표시
+    assert sources["subway"] == "transit_stops.csv"
+    assert analysis["transportation"]["subway"]["is_sample"] is False
+    assert sources["bus"] == sources["parking"] == sources["pedestrian"] == "sample"
+    assert analysis["transportation"]["bus"]["is_sample"] is True
+    assert analysis["parking"]["is_sample"] is True
+    assert analysis["pedestrian"]["is_sample"] is True
@@ -0,0 +1,83 @@
+"""
+경쟁 밀도 증분 반영 검증 - 커밋마다 증감한 카운트가 전체 재집계 결과와 같은지 확인
+"""
+from extensions import db
+from models import CommercialArea, BusinessData
+from services.competition_density_service import competition_density
+
+# 약 2.2km 떨어진 두 상권 (반경 500m)
+AREAS = {"10000": (36.3320, 127.4340), "20000": (36.3520, 127.4340)}
+
+
+def _add_business(area: CommercialArea, business_type: str, lat: float, lng: float) -> BusinessData:
+    business = BusinessData(
+        area_id=area.id, business_type=business_type, business_name=f"{business_type} 테스트",
+        address="대전", latitude=lat, longitude=lng, status="active"
+    )
+    db.session.add(business)
+    db.session.commit()
+    return business
+
+
+def _incremental_and_refreshed():
+    incremental = {code: competition_density.get_counts(code) for code in AREAS}
+    competition_density.refresh()
+    refreshed = {code: competition_density.get_counts(code) for code in AREAS}
+    return incremental, refreshed
+
+
+def test_incremental_counts_match_refresh_across_commits(app):
+    areas = {}
+    for code, (lat, lng) in AREAS.items():
+        areas[code] = CommercialArea(area_code=code, area_name=code, address="대전", latitude=lat, longitude=lng, radius=500)
+        db.session.add(areas[code])
+    db.session.commit()
+    competition_density.refresh()
+
+    # 추가
+    cafe = _add_business(areas["10000"], "카페", 36.3321, 127.4341)
+    restaurant = _add_business(areas["10000"], "음식점", 36.3322, 127.4342)
+    incremental, refreshed = _incremental_and_refreshed()
+    assert incremental == refreshed == {"10000": {"카페": 1, "음식점": 1}, "20000": {}}
+
+    # 폐업 - 앞선 커밋으로 속성이 만료된 상태에서 변경
+    cafe.status = "closed"
+    db.session.commit()
+    incremental, refreshed = _incremental_and_refreshed()
+    assert incremental == refreshed == {"10000": {"음식점": 1}, "20000": {}}
+
+    # 이전 - 다른 상권으로 이동하면 이전 상권은 감소
+    restaurant.latitude = 36.3521
+    db.session.commit()
+    incremental, refreshed = _incremental_and_refreshed()
+    assert incremental == refreshed == {"10000": {}, "20000": {"음식점": 1}}
+
+    # 재개업 후 업종 변경
+    cafe.status = "active"
+    db.session.commit()
+    cafe.business_type = "베이커리"
+    db.session.commit()
+    incremental, refreshed = _incremental_and_refreshed()
+    assert incremental == refreshed == {"10000": {"베이커리": 1}, "20000": {"음식점": 1}}
+
+    # 삭제
+    db.session.delete(restaurant)
+    db.session.commit()
+    incremental, refreshed = _incremental_and_refreshed()
+    assert incremental == refreshed == {"10000": {"베이커리": 1}, "20000": {}}
+
+
+def test_rolled_back_changes_are_not_applied(app):
+    area = CommercialArea(area_code="10000", area_name="10000", address="대전", latitude=36.332, longitude=127.434, radius=500)
+    db.session.add(area)
+    db.session.commit()
+    competition_density.refresh()
+
+    db.session.add(BusinessData(
+        area_id=area.id, business_type="카페", business_name="카페", address="대전",
+        latitude=36.3321, longitude=127.4341, status="active"
+    ))
+    db.session.flush()
+    db.session.rollback()
+
+    assert competition_density.get_counts("10000") == {}
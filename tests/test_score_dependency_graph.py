@@ -0,0 +1,71 @@
+"""
+점수 의존성 그래프 검증 - 원천 데이터 변경 시 영향 받는 키의
+점수 캐시와 건강 점수만 무효화되고 변경 이력이 남는지 확인
+"""
+import pytest
+from services.scoring_service import ScoringService
+from services.core_diagnosis_service import CoreDiagnosisService
+from services.score_dependency_graph import score_dependencies
+
+SCORED = [("10000", "식음료업", "동구"), ("10000", "식음료업", "중구"), ("20000", "쇼핑업", "중구")]
+
+
+@pytest.fixture
+def services(app):
+    scoring, diagnosis = ScoringService(), CoreDiagnosisService()
+    for candidate in SCORED:
+        scoring.calculate_market_score(*candidate)
+    for market_code in ("10000", "20000"):
+        assert "error" not in diagnosis.calculate_health_score(market_code)
+    yield scoring, diagnosis
+    diagnosis._executor.shutdown(wait=True)
+
+
+def _cached_scores(scoring):
+    return {candidate for candidate in SCORED if scoring.score_cache.get(scoring._score_cache_key(*candidate))}
+
+
+def _cached_health(diagnosis):
+    return {market_code for market_code in ("10000", "20000") if diagnosis.health_cache.get((market_code, None))}
+
+
+def test_rent_change_evicts_only_that_region(services):
+    scoring, diagnosis = services
+    before = scoring.calculate_market_score("10000", "식음료업", "중구")
+    assert _cached_scores(scoring) == set(SCORED)
+    last_sequence = score_dependencies.get_changes(1)[0]["sequence"] if score_dependencies.get_changes(1) else 0
+
+    # 값이 같은 갱신은 아무것도 무효화하지 않음
+    assert scoring.update_regional_rent({"중구": 25000}) == {"changed": [], "change": None}
+
+    result = scoring.update_regional_rent({"중구": 36000, "동구": 15000})
+    assert result["changed"] == ["중구"]
+    assert _cached_scores(scoring) == {("10000", "식음료업", "동구")}
+    # 건강 점수는 지역 요인에 의존하지 않음
+    assert _cached_health(diagnosis) == {"10000", "20000"}
+
+    (entry,) = score_dependencies.get_changes(1)
+    assert entry["sequence"] > last_sequence
+    assert entry["source"] == "regional_rent"
+    assert entry["factor"] == "regional_factors"
+    assert entry["keys"] == {"region": ["중구"]}
+    assert entry["invalidated"]["score_cache"] >= 2
+
+    # 임대료가 두 배가 되면 임대료 점수는 기준 60점에서 40점 하락, 재계산 결과에 반영
+    after = scoring.calculate_market_score("10000", "식음료업", "중구")
+    assert before["market_score"]["rent_cost"] == 44.4
+    assert after["market_score"]["rent_cost"] == 20.0
+    assert after["total_score"] < before["total_score"]
+
+
+def test_market_change_evicts_only_that_market(services):
+    scoring, diagnosis = services
+
+    entry = score_dependencies.notify("business_data", {"market_industry": [("20000", "쇼핑업")]})
+    assert _cached_scores(scoring) == {("10000", "식음료업", "동구"), ("10000", "식음료업", "중구")}
+    assert _cached_health(diagnosis) == {"10000"}
+    assert entry["factor"] == "market_factors"
+    assert entry["keys"] == {"market_industry": [("20000", "쇼핑업")]}
+    assert entry["invalidated"]["score_cache"] >= 1
+    assert entry["invalidated"]["health_scores"] >= 1
+    assert score_dependencies.get_changes(1) == [entry]
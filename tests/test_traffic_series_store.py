@@ -0,0 +1,102 @@
+"""
+유동인구 시계열 저장소 검증 - 월 파일 기록/기간 조회 왕복과 FootTrafficData 커밋 동기화
+"""
+from datetime import date
+import numpy as np
+import pytest
+from extensions import db
+from models import CommercialArea, FootTrafficData
+from services.traffic_series_store import TrafficSeriesStore, SERIES_COLUMNS, traffic_series
+
+
+def test_write_month_read_range_round_trip(tmp_path):
+    store = TrafficSeriesStore(base_dir=str(tmp_path))
+    rng = np.random.default_rng(7)
+
+    expected_timestamps, expected = [], {column: [] for column in SERIES_COLUMNS}
+    for year, month, days in ((2026, 1, 31), (2026, 2, 28)):
+        hours = np.sort(rng.choice(days * 24, size=100, replace=False))
+        columns = {column: rng.integers(0, 5000, size=len(hours)) for column in SERIES_COLUMNS}
+        store.write_month("10000", year, month, hours, columns)
+
+        start = np.datetime64(f"{year:04d}-{month:02d}", 'h')
+        expected_timestamps.append(start + hours.astype('timedelta64[h]'))
+        for column in SERIES_COLUMNS:
+            expected[column].append(columns[column])
+
+    # 월 경계를 넘는 기간 [1/15, 2/10)
+    series = store.read_range("10000", date(2026, 1, 15), date(2026, 2, 10))
+    timestamps = np.concatenate(expected_timestamps)
+    mask = (timestamps >= np.datetime64("2026-01-15", 'h')) & (timestamps < np.datetime64("2026-02-10", 'h'))
+
+    np.testing.assert_array_equal(series["timestamp"], timestamps[mask])
+    for column in SERIES_COLUMNS:
+        np.testing.assert_array_equal(series[column], np.concatenate(expected[column])[mask])
+
+    # 선택 컬럼만 조회
+    partial = store.read_range("10000", date(2026, 2, 1), date(2026, 3, 1), columns=["male_count"])
+    assert set(partial) == {"timestamp", "male_count"}
+
+
+def test_monthly_totals_follow_rewrites(tmp_path):
+    store = TrafficSeriesStore(base_dir=str(tmp_path))
+    hours = np.arange(10)
+    store.write_month("10000", 2026, 1, hours, {"foot_traffic_count": np.full(10, 3)})
+    assert store.monthly_totals("10000") == {"2026-01": 30}
+
+    store.write_month("10000", 2026, 1, hours, {"foot_traffic_count": np.full(10, 5)})
+    store.write_month("10000", 2026, 2, hours, {"foot_traffic_count": np.ones(10)})
+    assert store.monthly_totals("10000") == {"2026-01": 50, "2026-02": 10}
+
+
+def test_rejects_unsafe_area_codes(tmp_path):
+    store = TrafficSeriesStore(base_dir=str(tmp_path))
+    assert store.read_month("../10000", 2026, 1) is None
+    assert store.monthly_totals("../10000") == {}
+    with pytest.raises(ValueError):
+        store.write_month("../10000", 2026, 1, np.arange(3), {})
+
+
+def _traffic(area: CommercialArea, day: date, hour: int, count: int) -> FootTrafficData:
+    return FootTrafficData(
+        area_id=area.id, date=day, day_of_week=day.weekday(), hour=hour, foot_traffic_count=count
+    )
+
+
+def test_shared_store_follows_foot_traffic_commits(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(traffic_series, "base_dir", str(tmp_path / "series"))
+    traffic_series.clear_cache()
+
+    first = CommercialArea(area_code="10000", area_name="A", address="대전", latitude=36.33, longitude=127.43)
+    second = CommercialArea(area_code="20000", area_name="B", address="대전", latitude=36.35, longitude=127.43)
+    db.session.add_all([first, second])
+    db.session.commit()
+
+    january = _traffic(first, date(2026, 1, 5), 9, 100)
+    db.session.add_all([january, _traffic(first, date(2026, 1, 5), 10, 50)])
+    db.session.commit()
+    # 처음 조회할 때 DB에서 변환
+    assert traffic_series.monthly_totals("10000") == {"2026-01": 150}
+
+    db.session.add(_traffic(first, date(2026, 2, 1), 12, 70))
+    db.session.commit()
+    assert traffic_series.monthly_totals("10000") == {"2026-01": 150, "2026-02": 70}
+
+    # 다른 상권으로 이동하면 두 상권 모두 갱신
+    assert traffic_series.monthly_totals("20000") == {}
+    january.area_id = second.id
+    db.session.commit()
+    assert traffic_series.monthly_totals("10000") == {"2026-01": 50, "2026-02": 70}
+    assert traffic_series.monthly_totals("20000") == {"2026-01": 100}
+
+    # 월의 마지막 행을 삭제하면 월 파일도 삭제
+    db.session.delete(january)
+    db.session.commit()
+    assert traffic_series.monthly_totals("20000") == {}
+
+    # 롤백된 변경은 반영되지 않음
+    db.session.add(_traffic(first, date(2026, 3, 1), 8, 999))
+    db.session.flush()
+    db.session.rollback()
+    assert traffic_series.monthly_totals("10000") == {"2026-01": 50, "2026-02": 70}
+    traffic_series.clear_cache()
@@ -0,0 +1,129 @@
+"""
+유사 사용자 색인 검증 - 커밋 단위 증분 갱신(추가/수정/비활성화/삭제),
+재구성 중 커밋, 슬롯 압축 결과가 새로 재구성한 색인과 같은지 확인
+"""
+import pytest
+from sqlalchemy.orm import Session
+from extensions import db
+from models import User
+import services.user_similarity_service as similarity_module
+from services.user_similarity_service import UserSimilarityService, user_similarity
+
+QUERIES = [
+    {"userType": "ENTREPRENEUR", "preferences": {"interestedBusinessTypes": ["카페"], "preferredAreas": ["유성구"]}},
+    {"userType": "BUSINESS_OWNER", "businessStage": "OPERATING", "preferences": {"interestedBusinessTypes": ["음식점"]}},
+    {"businessStage": "PLANNING", "preferences": {"preferredAreas": ["중구", "서구"]}},
+]
+
+
+def _user(username: str, **fields) -> User:
+    return User(username=username, email=f"{username}@example.com", name=username, password_hash="x", **fields)
+
+
+def _assert_matches_fresh_index():
+    fresh = UserSimilarityService()
+    fresh.refresh()
+    assert user_similarity.stats()["users"] == fresh.stats()["users"]
+    for query in QUERIES:
+        assert user_similarity.find_similar(query, k=10) == fresh.find_similar(query, k=10)
+
+
+@pytest.fixture
+def users(app):
+    rows = [
+        _user("a", user_type="ENTREPRENEUR", business_stage="PLANNING",
+              interested_business_types=["카페"], preferred_areas=["유성구"]),
+        _user("b", user_type="BUSINESS_OWNER", business_stage="OPERATING",
+              interested_business_types=["음식점", "카페"], preferred_areas=["중구"]),
+        _user("c", user_type="ENTREPRENEUR", business_stage="STARTUP",
+              interested_business_types=["음식점"], preferred_areas=["서구"]),
+        _user("d", user_type="BUSINESS_OWNER", business_stage="PLANNING",
+              interested_business_types=["카페"], preferred_areas=["중구", "서구"], is_active=False),
+    ]
+    db.session.add_all(rows)
+    db.session.commit()
+    # 삽입 시 None은 기본값(True)으로 바뀌므로 is_active가 NULL인 기존 행은 직접 갱신해 만듦
+    db.session.execute(db.update(User).where(User.username == "c").values(is_active=None))
+    db.session.commit()
+    db.session.expire_all()
+    user_similarity.clear_cache()
+    yield {user.username: user for user in rows}
+    user_similarity.clear_cache()
+
+
+def test_null_is_active_counts_as_active(users):
+    ids = {result["user_id"] for result in user_similarity.find_similar(QUERIES[1], k=10)}
+    assert users["c"].id in ids
+    assert users["d"].id not in ids
+    _assert_matches_fresh_index()
+
+
+def test_incremental_commits_match_refresh(users):
+    user_similarity.find_similar(QUERIES[0])
+    assert user_similarity.stats()["users"] == 3
+
+    db.session.add(_user("e", user_type="ENTREPRENEUR", business_stage="PLANNING",
+                         interested_business_types=["카페"], preferred_areas=["중구"]))
+    db.session.commit()
+    _assert_matches_fresh_index()
+
+    users["a"].preferred_areas = ["중구", "서구"]
+    users["d"].is_active = True
+    users["b"].is_active = False
+    db.session.commit()
+    _assert_matches_fresh_index()
+
+    users["d"].is_active = None
+    db.session.delete(users["c"])
+    db.session.commit()
+    _assert_matches_fresh_index()
+
+    # 롤백된 변경은 반영되지 않음
+    users["a"].interested_business_types = ["음식점"]
+    db.session.flush()
+    db.session.rollback()
+    _assert_matches_fresh_index()
+
+
+def test_commit_during_refresh_is_applied_after_load(users, monkeypatch):
+    class CommitAfterQuery(Session):
+        """조회를 마친 직후(색인 반영 전) 다른 세션에서 사용자 변경을 커밋"""
+
+        def execute(self, *args, **kwargs):
+            frozen = super().execute(*args, **kwargs).freeze()
+            db.session.add(_user("late", user_type="ENTREPRENEUR", business_stage="PLANNING",
+                                 interested_business_types=["카페"], preferred_areas=["유성구"]))
+            users["b"].is_active = False
+            db.session.commit()
+            return frozen()
+
+    monkeypatch.setattr(similarity_module, "Session", CommitAfterQuery)
+    assert user_similarity.refresh() == 3
+    monkeypatch.undo()
+
+    ids = {result["user_id"] for result in user_similarity.find_similar(QUERIES[0], k=10)}
+    late = User.query.filter_by(username="late").one()
+    assert late.id in ids
+    assert users["b"].id not in ids
+    _assert_matches_fresh_index()
+
+
+def test_compaction_drops_dead_slots(users, monkeypatch):
+    monkeypatch.setattr(similarity_module, "COMPACT_MIN_DEAD_SLOTS", 3)
+    user_similarity.find_similar(QUERIES[0])
+    assert user_similarity.stats()["slots"] == 3
+
+    users["a"].business_stage = "STARTUP"
+    users["b"].business_stage = "PLANNING"
+    db.session.commit()
+    # 비활성 슬롯 2개 - 아직 압축 기준 미만
+    assert user_similarity.stats()["slots"] == 5
+    _assert_matches_fresh_index()
+
+    users["c"].business_stage = "OPERATING"
+    users["a"].preferred_areas = ["대덕구"]
+    db.session.commit()
+    # 비활성 슬롯 4개 > 활성 3개 - 압축 후 활성 슬롯만 남음
+    stats = user_similarity.stats()
+    assert (stats["users"], stats["slots"]) == (3, 3)
+    _assert_matches_fresh_index()
@@ -0,0 +1,207 @@
+"""
+벡터 타일 인코딩 검증 - 생성한 타일을 protobuf 수준에서 디코딩해
+지오메트리 명령, 링 방향, keys/values 테이블을 확인
+"""
+import os
+import struct
+import numpy as np
+from services.geo_utils import world_to_lnglat
+from services.vector_tile_service import VectorTileService, EXTENT, LAYER_NAME
+
+Z, X, Y = 14, 13987, 6428
+
+
+def _read_varint(data: bytes, pos: int):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _read_fields(data: bytes):
+    """(필드 번호, 값) 목록 - 길이 구분 필드는 bytes, 64비트 필드는 double"""
+    fields, pos = [], 0
+    while pos < len(data):
+        key, pos = _read_varint(data, pos)
+        field, wire_type = key >> 3, key & 0x7
+        if wire_type == 0:
+            value, pos = _read_varint(data, pos)
+        elif wire_type == 1:
+            value, pos = struct.unpack("<d", data[pos:pos + 8])[0], pos + 8
+        elif wire_type == 2:
+            length, pos = _read_varint(data, pos)
+            value, pos = data[pos:pos + length], pos + length
+        else:
+            raise AssertionError(f"예상하지 못한 wire type: {wire_type}")
+        fields.append((field, value))
+    return fields
+
+
+def _read_packed(data: bytes):
+    values, pos = [], 0
+    while pos < len(data):
+        value, pos = _read_varint(data, pos)
+        values.append(value)
+    return values
+
+
+def _unzigzag(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+
+def _decode_value(data: bytes):
+    (field, value), = _read_fields(data)
+    if field == 1:
+        return value.decode("utf-8")
+    if field == 6:
+        return _unzigzag(value)
+    if field == 7:
+        return bool(value)
+    return value
+
+
+def _decode_rings(commands):
+    """지오메트리 명령 → 링 목록 (명령 순서도 함께 검사)"""
+    rings, pos, x, y = [], 0, 0, 0
+    while pos < len(commands):
+        command, count = commands[pos] & 0x7, commands[pos] >> 3
+        assert (command, count) == (1, 1)
+        x += _unzigzag(commands[pos + 1])
+        y += _unzigzag(commands[pos + 2])
+        ring = [(x, y)]
+        pos += 3
+
+        command, count = commands[pos] & 0x7, commands[pos] >> 3
+        assert command == 2 and count >= 2
+        for i in range(count):
+            x += _unzigzag(commands[pos + 1 + 2 * i])
+            y += _unzigzag(commands[pos + 2 + 2 * i])
+            ring.append((x, y))
+        pos += 1 + 2 * count
+
+        assert commands[pos] == (7 | (1 << 3))
+        pos += 1
+        rings.append(ring)
+    return rings
+
+
+def _decode_tile(tile: bytes):
+    (field, layer_bytes), = _read_fields(tile)
+    assert field == 3
+
+    layer = {"features": [], "keys": [], "values": []}
+    for field, value in _read_fields(layer_bytes):
+        if field == 15:
+            layer["version"] = value
+        elif field == 1:
+            layer["name"] = value.decode("utf-8")
+        elif field == 2:
+            feature = {"tags": []}
+            for sub_field, sub_value in _read_fields(value):
+                if sub_field == 1:
+                    feature["id"] = sub_value
+                elif sub_field == 2:
+                    feature["tags"] = _read_packed(sub_value)
+                elif sub_field == 3:
+                    feature["type"] = sub_value
+                elif sub_field == 4:
+                    feature["geometry"] = _read_packed(sub_value)
+            layer["features"].append(feature)
+        elif field == 3:
+            layer["keys"].append(value.decode("utf-8"))
+        elif field == 4:
+            layer["values"].append(_decode_value(value))
+        elif field == 5:
+            layer["extent"] = value
+    return layer
+
+
+def _ring_area(ring) -> float:
+    """타일 좌표(y 아래 방향) 기준 면적 - MVT 외곽 링은 양수"""
+    points = np.asarray(ring, dtype=np.float64)
+    x, y = points[:, 0], points[:, 1]
+    return float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y)) / 2
+
+
+def _square(x0: float, y0: float, x1: float, y1: float, counter_clockwise: bool = False):
+    """타일 내부 비율 좌표 사각형 → (경도, 위도) 폴리곤"""
+    corners = [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
+    if counter_clockwise:
+        corners.reverse()
+    world = np.array([((X + cx) / (1 << Z), (Y + cy) / (1 << Z)) for cx, cy in corners])
+    lats, lngs = world_to_lnglat(world[:, 0], world[:, 1])
+    return [(float(lng), float(lat)) for lat, lng in zip(lats, lngs)]
+
+
+def _prepare(tmp_path, version="v1"):
+    service = VectorTileService(base_dir=str(tmp_path))
+    polygons = [
+        _square(0.25, 0.25, 0.5, 0.5),
+        _square(0.6, 0.6, 0.8, 0.8, counter_clockwise=True)
+    ]
+    properties = [
+        {"market_code": "10000", "district": "동구", "score": 72},
+        {"market_code": "20000", "district": "동구", "score": 72, "closed": None}
+    ]
+    service.prepare(version, polygons, properties)
+    return service
+
+
+def test_tile_decodes_to_layer_with_shared_keys_and_values(tmp_path):
+    layer = _decode_tile(_prepare(tmp_path).render_tile("v1", Z, X, Y))
+
+    assert layer["version"] == 2
+    assert layer["name"] == LAYER_NAME
+    assert layer["extent"] == EXTENT
+    # 같은 키/값은 한 번만 기록되고, None 속성은 제외
+    assert layer["keys"] == ["market_code", "district", "score"]
+    assert sorted(map(str, layer["values"])) == ["10000", "20000", "72", "동구"]
+
+    decoded = []
+    for feature in layer["features"]:
+        assert feature["type"] == 3
+        tags = feature["tags"]
+        decoded.append({layer["keys"][k]: layer["values"][v] for k, v in zip(tags[0::2], tags[1::2])})
+    assert decoded == [
+        {"market_code": "10000", "district": "동구", "score": 72},
+        {"market_code": "20000", "district": "동구", "score": 72}
+    ]
+
+
+def test_polygon_geometry_commands_and_winding(tmp_path):
+    layer = _decode_tile(_prepare(tmp_path).render_tile("v1", Z, X, Y))
+
+    expected = [(1024, 1024, 2048, 2048), (2458, 2458, 3277, 3277)]
+    for feature, (x0, y0, x1, y1) in zip(layer["features"], expected):
+        (ring,) = _decode_rings(feature["geometry"])
+        # 입력 방향과 관계없이 외곽 링은 양의 면적(타일 좌표 시계 방향)
+        assert _ring_area(ring) > 0
+        xs, ys = zip(*ring)
+        assert abs(min(xs) - x0) <= 1 and abs(max(xs) - x1) <= 1
+        assert abs(min(ys) - y0) <= 1 and abs(max(ys) - y1) <= 1
+
+
+def test_clipped_polygon_stays_within_buffer(tmp_path):
+    service = VectorTileService(base_dir=str(tmp_path))
+    service.prepare("v1", [_square(-0.5, 0.2, 0.5, 0.6)], [{"market_code": "10000"}])
+    layer = _decode_tile(service.render_tile("v1", Z, X, Y))
+
+    (ring,) = _decode_rings(layer["features"][0]["geometry"])
+    xs = [x for x, _ in ring]
+    assert min(xs) == -64
+    assert _ring_area(ring) > 0
+
+
+def test_prepare_drops_previous_version(tmp_path):
+    service = _prepare(tmp_path, "v1")
+    assert service.get_tile("v1", Z, X, Y)
+    assert os.path.isdir(tmp_path / "v1")
+
+    service.prepare("v2", [_square(0.25, 0.25, 0.5, 0.5)], [{"market_code": "10000"}])
+    assert service.has_layer("v2")
+    assert not service.has_layer("v1")
+    assert not os.path.exists(tmp_path / "v1")
@@ -0,0 +1,107 @@
+"""
+도보 상권 범위 검증 - 직접 구성한 소규모 도로망으로
+제한 거리 다익스트라 도달 범위와 분 단위 도달 면적을 확인
+"""
+import math
+import pandas as pd
+import pytest
+from services.geo_utils import EARTH_RADIUS_KM, haversine_km
+from services.accessibility_service import WALKING_SPEED_M_PER_MIN
+from services.walking_catchment_service import RoadGraph, WalkingCatchmentService, DETOUR_FACTOR
+
+BASE_LAT, BASE_LNG = 36.35, 127.38
+SPACING_M = 190  # 분 단위 경계(400m, 800m)와 겹치지 않는 간격
+GRID = 5
+
+DLAT = math.degrees(SPACING_M / 1000 / EARTH_RADIUS_KM)
+DLNG = DLAT / math.cos(math.radians(BASE_LAT))
+
+
+def _node(row: int, col: int) -> str:
+    return f"n{row}_{col}"
+
+
+def _write_grid(directory):
+    """5×5 격자 도로망 (간격 190m) - 간선 하나는 길이를 비워 직선거리로 채워지게 함"""
+    nodes = [
+        {"node_id": _node(r, c), "lat": BASE_LAT + r * DLAT, "lng": BASE_LNG + c * DLNG}
+        for r in range(GRID) for c in range(GRID)
+    ]
+    edges = []
+    for r in range(GRID):
+        for c in range(GRID):
+            if c + 1 < GRID:
+                edges.append({"from_node": _node(r, c), "to_node": _node(r, c + 1), "length_m": SPACING_M})
+            if r + 1 < GRID:
+                edges.append({"from_node": _node(r, c), "to_node": _node(r + 1, c), "length_m": SPACING_M})
+    edges[0]["length_m"] = None
+    # 존재하지 않는 노드를 가리키는 간선은 무시되어야 함
+    edges.append({"from_node": _node(0, 0), "to_node": "missing", "length_m": 1})
+    pd.DataFrame(nodes).to_csv(directory / "road_nodes.csv", index=False)
+    pd.DataFrame(edges).to_csv(directory / "road_edges.csv", index=False)
+
+
+def _market(code: str, row: float, col: float):
+    return {"market_code": code, "lat": BASE_LAT + row * DLAT, "lng": BASE_LNG + col * DLNG}
+
+
+def test_bounded_dijkstra_takes_shortest_path_within_limit():
+    # 0-1-2 경로(100m+100m)가 0-2 직접 간선(500m)보다 짧고, 3번 노드는 연결되지 않음
+    lats = [BASE_LAT, BASE_LAT, BASE_LAT, BASE_LAT + 0.01]
+    lngs = [BASE_LNG, BASE_LNG + 0.001, BASE_LNG + 0.002, BASE_LNG]
+    graph = RoadGraph(lats, lngs, [0, 1, 0], [1, 2, 2], [100.0, 100.0, 500.0])
+
+    assert graph.bounded_dijkstra(0, 10.0, 250.0) == {0: 10.0, 1: 110.0, 2: 210.0}
+    assert graph.bounded_dijkstra(0, 10.0, 150.0) == {0: 10.0, 1: 110.0}
+    # 간선이 양방향으로 적재되었는지 역방향 탐색으로 확인
+    assert graph.bounded_dijkstra(2, 0.0, 1000.0) == {2: 0.0, 1: 100.0, 0: 200.0}
+    assert graph.bounded_dijkstra(0, 300.0, 250.0) == {}
+
+
+def test_catchment_bands_follow_road_distance(tmp_path):
+    _write_grid(tmp_path)
+    service = WalkingCatchmentService(data_dir=str(tmp_path))
+    graph = service.load_graph()
+    assert graph is not None and graph.size == GRID * GRID
+    # 길이가 빠진 간선은 양 끝 직선거리(≈190m)로 채워짐
+    assert graph.weights.min() == pytest.approx(SPACING_M, rel=1e-3)
+
+    assert service.precompute([_market("10000", 2, 2)], "v1") == 1
+    catchment = service.get_catchment("10000")
+    assert catchment["method"] == "road_network"
+    assert catchment["snap_distance_m"] == pytest.approx(0, abs=0.1)
+
+    bands = {band["minutes"]: band for band in catchment["catchments"]}
+    assert 5 * WALKING_SPEED_M_PER_MIN == 400
+    # 5분(400m): 격자 거리 2칸(380m) 이내 13개 노드, 꼭짓점이 380m인 마름모
+    assert bands[5]["reachable_nodes"] == 13
+    assert bands[5]["area_km2"] == pytest.approx(2 * 0.38 ** 2, rel=0.02)
+    assert len(bands[5]["polygon"]) == 4
+    # 10분(800m) 이상은 격자 전체(최대 760m), 760m × 760m 정사각형
+    for minutes in (10, 15):
+        assert bands[minutes]["reachable_nodes"] == GRID * GRID
+        assert bands[minutes]["area_km2"] == pytest.approx(0.76 ** 2, rel=0.02)
+
+
+def test_walk_distances_use_network_and_fall_back_off_network(tmp_path):
+    _write_grid(tmp_path)
+    service = WalkingCatchmentService(data_dir=str(tmp_path))
+    markets = [
+        _market("corner", 0, 0),
+        _market("near", 2, 3),
+        _market("far", 2, 15)  # 도로망에서 2km 이상 떨어진 상권
+    ]
+    service.precompute(markets, "v1")
+    assert service.get_catchment("far")["method"] == "straight_line_estimate"
+
+    center_lat, center_lng = BASE_LAT + 2 * DLAT, BASE_LNG + 2 * DLNG
+    results = dict(service.walk_distances(center_lat, center_lng, markets, 5.0))
+
+    # 도로망 위에서는 격자 경로 거리(직선 × 우회 계수가 아님)
+    assert results[1] == pytest.approx(0.19, rel=1e-3)
+    assert results[0] == pytest.approx(0.76, rel=1e-3)
+    far_km = float(haversine_km(center_lat, center_lng, markets[2]["lat"], markets[2]["lng"])) * DETOUR_FACTOR
+    assert results[2] == pytest.approx(far_km)
+
+    # 제한 거리를 넘는 상권은 제외
+    assert [i for i, _ in service.walk_distances(center_lat, center_lng, markets, 0.5)] == [1]